@@ -16,7 +16,10 @@ WORKFLOW POSITION:
 import json
 import math
 import heapq
+import os
+import time
 from collections import defaultdict
+from multiprocessing import Pool, shared_memory
 
 # ======================================
 # PATHFINDING FUNCTIONS (A*)
@@ -392,6 +395,301 @@ def batch_expedition_orders(orders_list, grid):
     return all_results
 
 
+# ======================================
+# PARALLEL MULTI-ORDER BATCH (SHARED MEMORY)
+# ======================================
+#
+# The ground-floor grid is flattened into a walkable mask and the
+# rack-to-rack distance table is filled once; both live in
+# multiprocessing.shared_memory so every worker reads the same copy
+# instead of re-scanning the grid dict and re-running A* per order.
+
+_SQRT2 = math.sqrt(2)
+
+# Per-worker state, set by _init_worker()
+_shared = {}
+
+
+def _attach(name):
+    """Attach to a shared memory block created by the parent process."""
+    # Pool workers share the parent's resource tracker, which unlinks the
+    # block once the parent calls unlink(); nothing to unregister here
+    return shared_memory.SharedMemory(name=name)
+
+
+def _mask_neighbors(idx, mask, width, height):
+    x, y = idx % width, idx // width
+    for dx, dy in directions:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < width and 0 <= ny < height:
+            n = ny * width + nx
+            if mask[n]:
+                yield n, (_SQRT2 if dx and dy else 1.0)
+
+
+def _mask_dijkstra(sources, mask, width, height, targets=None):
+    """Dijkstra over the flat mask; returns {cell_index: (cost, source)}."""
+    pending = set(targets) if targets is not None else None
+    best = {s: 0.0 for s in sources}
+    settled = {}
+    heap = [(0.0, s, s) for s in sources]
+    heapq.heapify(heap)
+
+    while heap:
+        d, cur, src = heapq.heappop(heap)
+        if cur in settled:
+            continue
+        settled[cur] = (d, src)
+        if pending is not None:
+            pending.discard(cur)
+            if not pending:
+                break
+        for n, step in _mask_neighbors(cur, mask, width, height):
+            nd = d + step
+            if n not in settled and nd < best.get(n, float("inf")):
+                best[n] = nd
+                heapq.heappush(heap, (nd, n, src))
+
+    return settled
+
+
+def _mask_astar(start, goal, mask, width, height):
+    """A* over the flat mask; returns a path of (x, y, 0) tuples."""
+    def h(i):
+        dx = abs(i % width - goal % width)
+        dy = abs(i // width - goal // width)
+        return max(dx, dy) + (_SQRT2 - 1) * min(dx, dy)
+
+    g = {start: 0.0}
+    came_from = {}
+    heap = [(h(start), start)]
+    closed = set()
+
+    while heap:
+        _, cur = heapq.heappop(heap)
+        if cur == goal:
+            break
+        if cur in closed:
+            continue
+        closed.add(cur)
+        for n, step in _mask_neighbors(cur, mask, width, height):
+            tentative = g[cur] + step
+            if tentative < g.get(n, float("inf")):
+                g[n] = tentative
+                came_from[n] = cur
+                heapq.heappush(heap, (tentative + h(n), n))
+
+    if goal != start and goal not in came_from:
+        return []
+    path = [goal]
+    while path[-1] != start:
+        path.append(came_from[path[-1]])
+    path.reverse()
+    return [(i % width, i // width, 0) for i in path]
+
+
+def _init_worker(mask_name, dist_name, width, height, nodes, node_exit):
+    shm_mask = _attach(mask_name)
+    shm_dist = _attach(dist_name)
+    _shared.update({
+        "shm": (shm_mask, shm_dist),  # keep the mappings alive
+        "mask": shm_mask.buf,
+        "dist": shm_dist.buf.cast("d"),
+        "width": width,
+        "height": height,
+        "nodes": nodes,
+        "node_exit": node_exit,
+    })
+
+
+def _fill_distance_rows(rows):
+    """Worker task: write Dijkstra rows of the node distance table."""
+    mask, dist = _shared["mask"], _shared["dist"]
+    width, height, nodes = _shared["width"], _shared["height"], _shared["nodes"]
+    n = len(nodes)
+    for i in rows:
+        settled = _mask_dijkstra([nodes[i]], mask, width, height, targets=nodes)
+        for j, node in enumerate(nodes):
+            dist[i * n + j] = settled[node][0] if node in settled else float("inf")
+    return len(rows)
+
+
+def _solve_order(task):
+    """Worker task: greedy nearest-rack picking for one order."""
+    position, order_id, items, racks_by_product = task
+    t0 = time.perf_counter()
+
+    mask, dist = _shared["mask"], _shared["dist"]
+    width, height = _shared["width"], _shared["height"]
+    nodes, node_exit = _shared["nodes"], _shared["node_exit"]
+    n = len(nodes)
+
+    current = 0  # node 0 is the start expedition zone
+    picking_plan = []
+    total_distance = 0.0
+
+    for product_id, quantity_needed in items.items():
+        racks = list(racks_by_product.get(product_id, []))
+        if not racks:
+            # Product not found in any rack: skipped, as in batch_expedition_orders
+            continue
+        remaining = quantity_needed
+        product_stops = []
+
+        while remaining > 0 and racks:
+            best = min(racks, key=lambda r: (dist[current * n + r[0]], r[0]))
+            node, rack_location, available = best
+            distance = dist[current * n + node]
+            if distance == float("inf"):
+                break
+
+            pick_qty = min(available, remaining)
+            remaining -= pick_qty
+
+            product_stops.append({
+                'rack_location': rack_location,
+                'rack_level': rack_location[2],
+                'quantity_picked': pick_qty,
+                'quantity_remaining': remaining,
+                'path_to_rack': _mask_astar(nodes[current], nodes[node], mask, width, height),
+                'distance': distance
+            })
+
+            total_distance += distance
+            current = node
+            racks.remove(best)
+
+        picking_plan.append({
+            'product_id': product_id,
+            'quantity_requested': quantity_needed,
+            'quantity_collected': quantity_needed - remaining,
+            'stops': product_stops
+        })
+
+    exp_distance, zone = node_exit[current]
+    if zone is None:
+        return position, order_id, None, "Cannot find path to expedition zone", time.perf_counter() - t0
+
+    total_distance += exp_distance
+    result = {
+        'order_items': items,
+        'picking_plan': picking_plan,
+        'expedition_zone': (zone % width, zone // width),
+        'path_to_expedition': _mask_astar(nodes[current], zone, mask, width, height),
+        'expedition_distance': exp_distance,
+        'total_distance': total_distance,
+        'total_stops': sum(len(p['stops']) for p in picking_plan)
+    }
+    return position, order_id, result, None, time.perf_counter() - t0
+
+
+def batch_expedition_orders_parallel(orders_list, grid, workers=None):
+    """
+    Parallel version of batch_expedition_orders.
+
+    The ground floor is flattened into a walkable mask and the distance
+    table between the start expedition zone and every rack holding an
+    ordered product is computed once; both are placed in shared memory and
+    a worker pool solves the orders.  Results are merged in input order, so
+    the output does not depend on worker scheduling.
+
+    Args:
+        orders_list: same format as batch_expedition_orders
+        grid: warehouse grid (ground floor)
+        workers: pool size (default: os.cpu_count())
+
+    Returns:
+        (all_results, timings) where timings maps order_id to the seconds
+        spent solving that order in its worker.
+    """
+
+    print(f"\n{'='*70}")
+    print(f"  PARALLEL BATCH EXPEDITION OPTIMIZATION")
+    print(f"{'='*70}")
+    print(f"  Total Orders: {len(orders_list)}")
+
+    t_start = time.perf_counter()
+    ground = {k: c for k, c in grid.items() if k[2] == 0}
+    if not ground:
+        return {}, {}
+    width = max(x for x, _, _ in ground) + 1
+    height = max(y for _, y, _ in ground) + 1
+
+    mask_bytes = bytearray(width * height)
+    zones = []
+    racks_by_product = defaultdict(list)
+    ordered_products = {pid for order in orders_list for pid in order['items']}
+    for (x, y, _), cell in sorted(ground.items()):
+        i = y * width + x
+        mask_bytes[i] = 1 if is_walkable(cell) else 0
+        if cell.get('is_expedition_zone', False):
+            zones.append(i)
+        pid = cell.get('product_id')
+        if (cell.get('is_slot', False) and pid in ordered_products
+                and cell.get('quantity', 0) > 0):
+            racks_by_product[pid].append((i, (x, y, cell.get('z', 0)), cell['quantity']))
+
+    if not zones:
+        print("  ✗ ERROR: No expedition zone found on ground floor")
+        return {}, {}
+
+    # Node 0 is the start zone, then every candidate rack
+    nodes = [zones[0]]
+    for pid in sorted(racks_by_product):
+        entries = []
+        for cell_index, rack_location, qty in racks_by_product[pid]:
+            entries.append((len(nodes), rack_location, qty))
+            nodes.append(cell_index)
+        racks_by_product[pid] = entries
+    n = len(nodes)
+
+    # Distance (and zone) from every node to its nearest expedition zone
+    exits = _mask_dijkstra(zones, mask_bytes, width, height, targets=nodes)
+    node_exit = [exits.get(node, (float("inf"), None)) for node in nodes]
+
+    shm_mask = shared_memory.SharedMemory(create=True, size=len(mask_bytes))
+    shm_dist = shared_memory.SharedMemory(create=True, size=max(n * n, 1) * 8)
+    try:
+        shm_mask.buf[:len(mask_bytes)] = mask_bytes
+
+        workers = workers or os.cpu_count() or 1
+        with Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(shm_mask.name, shm_dist.name, width, height, nodes, node_exit),
+        ) as pool:
+            chunks = [list(range(i, n, workers)) for i in range(workers)]
+            pool.map(_fill_distance_rows, [c for c in chunks if c])
+            t_table = time.perf_counter() - t_start
+            print(f"  Distance table: {n}x{n} nodes in {t_table:.2f}s")
+
+            tasks = [
+                (position, order['order_id'], order['items'],
+                 {pid: racks_by_product.get(pid, []) for pid in order['items']})
+                for position, order in enumerate(orders_list)
+            ]
+            solved = pool.map(_solve_order, tasks)
+    finally:
+        shm_mask.close()
+        shm_mask.unlink()
+        shm_dist.close()
+        shm_dist.unlink()
+
+    all_results = {}
+    timings = {}
+    for position, order_id, result, error, elapsed in sorted(solved, key=lambda r: r[0]):
+        timings[order_id] = elapsed
+        if error:
+            print(f"  ✗ Order {order_id}: {error}")
+            continue
+        all_results[order_id] = result
+        print(f"  ✓ Order {order_id}: {result['total_stops']} stops, "
+              f"{result['total_distance']:.2f}m ({elapsed * 1000:.1f} ms)")
+
+    print(f"  Wall time: {time.perf_counter() - t_start:.2f}s with {workers} worker(s)")
+    return all_results, timings
+
+
 # ======================================
 # EXAMPLE USAGE
 # ======================================
@@ -456,4 +754,11 @@ if __name__ == "__main__":
     print(f"{'='*70}")
     print(f"  Orders Processed  : {len(batch_results)}")
     print(f"  Total Distance    : {sum(r['total_distance'] for r in batch_results.values()):.2f}m")
-    print(f"  Total Stops       : {sum(r['total_stops'] for r in batch_results.values())}")
\ No newline at end of file
+    print(f"  Total Stops       : {sum(r['total_stops'] for r in batch_results.values())}")
+
+    # ── EXAMPLE 3: Multiple Orders (Parallel, shared memory) ──
+
+    parallel_results, timings = batch_expedition_orders_parallel(orders, grid)
+
+    print(f"\n  Parallel Orders   : {len(parallel_results)}")
+    print(f"  Slowest Order     : {max(timings.values()) * 1000:.1f} ms" if timings else "")
\ No newline at end of file
@@ -4,12 +4,17 @@ AI package for warehouse optimization.
 Exports lazy singletons / factories so routes can import them directly:
 
     from app.ai import get_storage_optimizer, get_pathfinder, forecasting_engine
+
+Forecasting and the optimizers are exposed as proxies (see app.ai.lazy):
+importing this package does not load pandas, NumPy or scikit-learn.
 """
 
 from __future__ import annotations
 
 from typing import TYPE_CHECKING, Optional
 
+from app.ai.lazy import import_report, lazy, warm_up  # noqa: F401
+
 if TYPE_CHECKING:
     from app.ai.pathfinding import WarehousePathfinder
     from app.ai.storage_optimizer import StorageOptimizer
@@ -17,19 +22,18 @@ if TYPE_CHECKING:
 # Re-export pathfinder factory
 from app.ai.pathfinding import get_pathfinder  # noqa: F401
 
-# Forecasting singleton (may fail on import if repos import Firestore before init)
-try:
-    from app.ai.forecasting import forecasting_engine  # noqa: F401
-except Exception:
-    forecasting_engine = None  # type: ignore[assignment]
+# Forecasting (pandas / scikit-learn) – loaded on first use
+forecasting_engine = lazy("app.ai.forecasting.engine", "forecasting_engine")
+record_delivery = lazy("app.ai.forecasting.feature_store", "record_delivery")
 
 # Picking functions (no singleton needed – they're stateless)
-from app.ai.picking_optimizer import (  # noqa: F401
-    plan_product_route,
-    check_congestion,
-    batch_assign_products,
-    optimize_expedition_route,
-)
+plan_product_route = lazy("app.ai.picking_optimizer", "plan_product_route")
+check_congestion = lazy("app.ai.picking_optimizer", "check_congestion")
+batch_assign_products = lazy("app.ai.picking_optimizer", "batch_assign_products")
+optimize_expedition_route = lazy("app.ai.picking_optimizer", "optimize_expedition_route")
+sequence_stops = lazy("app.ai.route_sequencer", "sequence_stops")
+allocate_pick_lines = lazy("app.ai.wave_planner", "allocate_pick_lines")
+plan_wave = lazy("app.ai.wave_planner", "plan_wave")
 
 _storage_optimizer: Optional["StorageOptimizer"] = None
 
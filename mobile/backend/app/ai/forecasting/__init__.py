@@ -1,5 +1,6 @@
-from .data_loader import load_daily_demand
+from .data_loader import load_daily_demand, load_daily_demand_cached
 from .preprocessing import fill_missing_dates
-from .features import add_features, add_advanced_features
-from .models import HurdleModel
-from .generate import generate_orders_hurdle
\ No newline at end of file
+from .features import add_features, add_advanced_features, build_features
+from .models import HurdleModel, TieredModel
+from .generate import forecast_horizon, generate_orders_hurdle
+from .engine import ForecastingEngine, forecasting_engine
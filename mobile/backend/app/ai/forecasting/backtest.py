@@ -0,0 +1,223 @@
+"""
+Backtest à origine glissante du générateur d'ordres.
+
+Pour chaque origine, le modèle est entraîné sur l'historique jusqu'à cette
+date puis la prévision du lendemain est comparée à la demande réelle. Les
+fenêtres sont évaluées en parallèle dans des processus séparés.
+
+    python -m app.ai.forecasting.backtest --input historique_demande.csv \\
+        --windows 12 --step 7 --workers 4 --output backtest.json
+    python -m app.ai.forecasting.backtest --synthetic 200x400
+
+Le rapport JSON donne, par fenêtre, WAPE, biais relatif et durées
+(features, fit, predict), ainsi qu'un résumé comparable d'un run à l'autre.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import load_history
+from .generate import generate_orders_hurdle
+from .models import BACKENDS, MODELS, make_model_factory
+from .preprocessing import fill_missing_dates
+
+WAPE_TARGET = 0.5
+BIAS_TARGET = 0.05
+
+_daily: Optional[pd.DataFrame] = None  # historique partagé par les workers
+
+
+def rolling_origins(
+    daily: pd.DataFrame, windows: int, step_days: int, min_train_days: int = 60
+) -> List[pd.Timestamp]:
+    """Les `windows` dernières origines, espacées de `step_days`, la dernière laissant un jour à prévoir."""
+    first, last = daily['date'].min(), daily['date'].max()
+    origins = [last - pd.Timedelta(days=1 + i * step_days) for i in range(windows)]
+    earliest = first + pd.Timedelta(days=min_train_days)
+    return sorted(o for o in origins if o >= earliest)
+
+
+def wape_and_bias(actual: np.ndarray, forecast: np.ndarray) -> Dict[str, float]:
+    """WAPE = Σ|réel − prévu| / Σ réel ; biais = (Σ prévu − Σ réel) / Σ réel."""
+    total = float(actual.sum())
+    if total == 0:
+        return {'wape': None, 'bias': None}
+    return {
+        'wape': float(np.abs(actual - forecast).sum()) / total,
+        'bias': float(forecast.sum() - total) / total,
+    }
+
+
+def _single_threaded(make: Callable):
+    """Construit le modèle avec n_jobs=1 (évite la sur-souscription entre workers)."""
+    model = make()
+    pending = [model]
+    while pending:
+        for part in vars(pending.pop()).values():
+            if hasattr(part, 'get_params'):
+                if 'n_jobs' in part.get_params():
+                    part.set_params(n_jobs=1)
+            elif hasattr(part, '__dict__'):
+                pending.append(part)  # sous-modèle (ex. forêts de TieredModel)
+    return model
+
+
+def _init_worker(daily: pd.DataFrame) -> None:
+    global _daily
+    _daily = daily
+
+
+def evaluate_window(
+    origin: pd.Timestamp, model_name: str, single_threaded: bool = False, backend: str = 'forest',
+) -> Dict:
+    """Entraîne jusqu'à `origin`, prévoit origin + 1 jour et mesure l'erreur."""
+    factory = make_model_factory(model_name, backend)
+    if single_threaded:
+        factory = partial(_single_threaded, factory)
+
+    train = _daily[_daily['date'] <= origin]
+    target = origin + pd.Timedelta(days=1)
+    actual = (
+        _daily[_daily['date'] == target]
+        .groupby('product_id', observed=True)['quantity'].sum()
+    )
+
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    orders = generate_orders_hurdle(train, model_factory=factory, timings=timings)
+    total_s = time.perf_counter() - start
+
+    products = train['product_id'].astype(str).unique()
+    actual = actual.rename(index=str).reindex(products, fill_value=0).to_numpy(dtype=float)
+    forecast = np.zeros(len(products))
+    if len(orders):
+        forecast = (
+            orders.groupby('product_id')['quantity'].sum()
+            .reindex(products, fill_value=0).to_numpy(dtype=float)
+        )
+
+    return {
+        'origin': origin.strftime('%Y-%m-%d'),
+        'target_date': target.strftime('%Y-%m-%d'),
+        'train_rows': int(len(train)),
+        'products': int(len(products)),
+        'actual_total': float(actual.sum()),
+        'forecast_total': float(forecast.sum()),
+        **wape_and_bias(actual, forecast),
+        **{k: round(v, 4) for k, v in timings.items()},
+        'total_s': round(total_s, 4),
+    }
+
+
+def summarize(windows: List[Dict]) -> Dict:
+    """Agrégats sur les fenêtres ayant une demande réelle non nulle."""
+    scored = [w for w in windows if w['wape'] is not None]
+    if not scored:
+        return {'windows': len(windows), 'scored_windows': 0}
+    wape = np.array([w['wape'] for w in scored])
+    bias = np.array([w['bias'] for w in scored])
+    return {
+        'windows': len(windows),
+        'scored_windows': len(scored),
+        'wape_mean': float(wape.mean()),
+        'wape_median': float(np.median(wape)),
+        'share_wape_below_target': float((wape < WAPE_TARGET).mean()),
+        'bias_mean': float(bias.mean()),
+        'share_abs_bias_below_target': float((np.abs(bias) < BIAS_TARGET).mean()),
+        'fit_s_mean': float(np.mean([w.get('fit_s', 0.0) for w in scored])),
+        'predict_s_mean': float(np.mean([w.get('predict_s', 0.0) for w in scored])),
+        'total_s_sum': float(sum(w['total_s'] for w in windows)),
+    }
+
+
+def run_backtest(
+    daily: pd.DataFrame,
+    model_name: str = 'hurdle',
+    windows: int = 12,
+    step_days: int = 7,
+    workers: Optional[int] = None,
+    backend: str = 'forest',
+) -> Dict:
+    """
+    Évalue `model_name` sur des origines glissantes.
+
+    Args:
+        daily: historique complet (sortie de fill_missing_dates).
+        model_name: clé de MODELS.
+        windows: nombre d'origines.
+        step_days: écart entre deux origines.
+        workers: processus parallèles (défaut : nombre de CPU).
+        backend: famille des estimateurs (clé de BACKENDS).
+
+    Returns:
+        Rapport : paramètres, résultats par fenêtre et résumé.
+    """
+    make_model_factory(model_name, backend)  # valide les noms avant de lancer les workers
+    origins = rolling_origins(daily, windows, step_days)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(origins) or 1))
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(daily)
+        results = [evaluate_window(o, model_name, False, backend) for o in origins]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(daily,)) as pool:
+            results = list(pool.map(
+                evaluate_window, origins, [model_name] * len(origins), [True] * len(origins),
+                [backend] * len(origins),
+            ))
+    wall_s = time.perf_counter() - start
+
+    return {
+        'model': model_name,
+        'backend': backend,
+        'step_days': step_days,
+        'workers': workers,
+        'wall_s': round(wall_s, 3),
+        'summary': summarize(results),
+        'windows': results,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help='historique CSV (date, product_id, quantity) ou classeur DataPack')
+    source.add_argument('--synthetic', help='données synthétiques PRODUITSxJOURS, ex. 200x400')
+    parser.add_argument('--cache-dir', default=None, help='cache Parquet pour les classeurs Excel')
+    parser.add_argument('--model', default='hurdle', choices=sorted(MODELS))
+    parser.add_argument('--backend', default='forest', choices=sorted(BACKENDS))
+    parser.add_argument('--windows', type=int, default=12)
+    parser.add_argument('--step', type=int, default=7)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help='fichier JSON (sinon stdout)')
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        from .benchmark import synthetic_demand
+        n_products, n_days = (int(v) for v in args.synthetic.lower().split('x'))
+        raw = synthetic_demand(n_products, n_days)
+    else:
+        raw = load_history(args.input, args.cache_dir)
+
+    report = run_backtest(
+        fill_missing_dates(raw), args.model, args.windows, args.step, args.workers, args.backend,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,27 @@
+import hashlib
+import os
+import re
+import shutil
+from typing import List, Optional
+
 import pandas as pd
 
+# Colonnes réellement utilisées dans chaque feuille du DataPack
+TRANSACTION_COLS = ['id_transaction', 'type_transaction', 'cree_le']
+LINE_COLS = ['id_transaction', 'id_produit', 'quantite']
+
+_READY_MARKER = '_SUCCESS'
+
+
 def load_daily_demand(excel_path: str) -> pd.DataFrame:
     """
     Charge les données depuis le fichier Excel fourni par le hackathon.
     Retourne un DataFrame avec colonnes ['date', 'product_id', 'quantity'].
     """
-    trans = pd.read_excel(excel_path, sheet_name="transactions", skiprows=[1, 2])
-    lignes = pd.read_excel(excel_path, sheet_name="lignes_transaction", skiprows=[1, 2])
+    trans = pd.read_excel(excel_path, sheet_name="transactions", skiprows=[1, 2],
+                          usecols=TRANSACTION_COLS)
+    lignes = pd.read_excel(excel_path, sheet_name="lignes_transaction", skiprows=[1, 2],
+                           usecols=LINE_COLS)
 
     # Conversion de la date
     trans['cree_le'] = pd.to_datetime(trans['cree_le'], errors='coerce')
@@ -28,4 +43,101 @@ def load_daily_demand(excel_path: str) -> pd.DataFrame:
     daily.columns = ['date', 'product_id', 'quantity']
     daily = daily.sort_values(['product_id', 'date']).reset_index(drop=True)
 
-    return daily
\ No newline at end of file
+    return daily
+
+
+# ── Cache Parquet ────────────────────────────────────────────────
+
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 du fichier source."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ingest_datapack(excel_path: str, cache_dir: str) -> str:
+    """
+    Convertit une fois le classeur en Parquet partitionné par mois.
+
+    Le dossier produit est nommé d'après la somme de contrôle du classeur :
+    tant que le fichier ne change pas, l'Excel n'est plus relu. Les versions
+    précédentes du même classeur sont supprimées.
+
+    Returns:
+        Chemin du jeu de données Parquet.
+    """
+    stem = os.path.splitext(os.path.basename(excel_path))[0]
+    target = os.path.join(cache_dir, f"{stem}-{file_checksum(excel_path)[:16]}")
+    if os.path.isfile(os.path.join(target, _READY_MARKER)):
+        return target
+
+    daily = load_daily_demand(excel_path)
+    tmp = f"{target}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    daily.assign(month=daily['date'].dt.strftime('%Y-%m')).to_parquet(
+        tmp, partition_cols=['month'], index=False,
+    )
+    open(os.path.join(tmp, _READY_MARKER), 'w').close()
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+
+    # Seulement les versions de ce classeur (pas DataPack-v2-…, ni les .tmp<pid> en cours)
+    version = re.compile(rf"{re.escape(stem)}-[0-9a-f]{{16}}")
+    for name in os.listdir(cache_dir):
+        old = os.path.join(cache_dir, name)
+        if old != target and version.fullmatch(name) and os.path.isdir(old):
+            shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def load_daily_demand_cached(
+    excel_path: str,
+    cache_dir: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Même résultat que load_daily_demand, lu depuis le cache Parquet.
+
+    Seules les partitions mensuelles couvrant [start, end] et les colonnes
+    demandées sont lues.
+    """
+    dataset = ingest_datapack(excel_path, cache_dir)
+    columns = columns or ['date', 'product_id', 'quantity']
+    read_cols = list(dict.fromkeys(columns + (['date'] if start or end else [])))
+
+    filters = []
+    if start:
+        filters.append(('month', '>=', pd.Timestamp(start).strftime('%Y-%m')))
+    if end:
+        filters.append(('month', '<=', pd.Timestamp(end).strftime('%Y-%m')))
+    daily = pd.read_parquet(dataset, columns=read_cols, filters=filters or None)
+
+    if start:
+        daily = daily[daily['date'] >= pd.Timestamp(start)]
+    if end:
+        daily = daily[daily['date'] <= pd.Timestamp(end)]
+    if 'product_id' in daily.columns:
+        daily['product_id'] = daily['product_id'].astype(str)
+    sort_cols = [c for c in ['product_id', 'date'] if c in daily.columns]
+    if sort_cols:
+        daily = daily.sort_values(sort_cols)
+    return daily[columns].reset_index(drop=True)
+
+
+def load_history(path: str, cache_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Historique (date, product_id, quantity) depuis un CSV ou le classeur du
+    DataPack (via le cache Parquet si `cache_dir` est donné).
+    """
+    if path.lower().endswith(('.xlsx', '.xls')):
+        if cache_dir:
+            return load_daily_demand_cached(path, cache_dir)
+        return load_daily_demand(path)
+    daily = pd.read_csv(path, parse_dates=['date'])
+    daily['product_id'] = daily['product_id'].astype(str)
+    return daily[['date', 'product_id', 'quantity']]
@@ -0,0 +1,98 @@
+"""
+Service de prévision utilisé par les routes (génération des ordres de
+préparation).
+
+Le pipeline Hurdle tourne dans le processus de prévision (ForecastWorker),
+hors de la boucle d'événements. Les prévisions sont mises en cache par
+(date du jour, version des données, fenêtre de fréquence) : les appels
+répétés dans la journée sur le même historique sont servis sans recalcul.
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.forecast_worker import get_forecast_worker
+from app.utils.logger import logger
+
+CACHE_SIZE = 8
+
+
+def data_version(path: str) -> str:
+    """Version de l'historique : taille et date de modification du fichier."""
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+class ForecastingEngine:
+    """Prévisions du lendemain, calculées une fois par jour et par version des données."""
+
+    def __init__(self, history_path: Optional[str] = None, worker=None):
+        self.history_path = history_path or settings.FORECAST_HISTORY_PATH
+        self._worker = worker
+        self._cache: "OrderedDict[Tuple[str, str, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    @property
+    def worker(self):
+        if self._worker is None:
+            self._worker = get_forecast_worker()
+        return self._worker
+
+    def invalidate(self) -> None:
+        """Vide le cache (ex. après import d'un nouvel historique au même chemin)."""
+        self._cache.clear()
+
+    async def _forecast(self, days: int) -> List[Dict[str, Any]]:
+        if not os.path.isfile(self.history_path):
+            raise FileNotFoundError(f"Demand history not found at {self.history_path}")
+        key = (date.today().isoformat(), data_version(self.history_path), days)
+
+        async with self._lock:  # une seule prévision à la fois, les suivantes lisent le cache
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            records = await self.worker.forecast(self.history_path, frequency_days=days)
+            self._cache[key] = records
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+            logger.info(f"Forecast computed for {key}: {len(records)} products")
+            return records
+
+    async def predict_preparation_orders(
+        self,
+        days: Optional[int] = None,
+        min_demand_frequency: float = 0.5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Produits à préparer pour le lendemain.
+
+        Args:
+            days: fenêtre (jours) de calcul de la fréquence de demande
+                (défaut : FORECASTING_DAYS).
+            min_demand_frequency: part minimale des jours de la fenêtre avec
+                une demande pour qu'un produit soit retenu.
+
+        Returns:
+            Une entrée par produit : product_id, predicted_quantity,
+            demand_frequency, order_date, source.
+        """
+        days = days or settings.FORECASTING_DAYS
+        records = await self._forecast(days)
+        return [
+            {
+                "product_id": r["product_id"],
+                "predicted_quantity": r["quantity"],
+                "demand_frequency": r["demand_frequency"],
+                "order_date": r["order_date"],
+                "source": r["source"],
+            }
+            for r in records
+            if r["quantity"] > 0 and r["demand_frequency"] >= min_demand_frequency
+        ]
+
+
+forecasting_engine = ForecastingEngine()
@@ -0,0 +1,256 @@
+"""
+Magasin incrémental des features de demande.
+
+Pour chaque produit, seul l'état nécessaire aux features du modèle est
+conservé : les 30 derniers jours de demande (lags ≤ 28 j, fenêtres ≤ 30 j)
+et l'EWMA arrêtée à la veille du dernier jour. Chaque livraison validée met
+à jour cet état ; la ligne de features du lendemain s'obtient alors en
+O(produits), sans relire ni recalculer l'historique. Les valeurs sont
+identiques à celles de build_features sur l'historique complet.
+"""
+
+import asyncio
+import os
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import settings
+from app.utils.logger import logger
+
+from .data_loader import load_history
+from .features import EWMA_SPAN, LAGS, _past_ewma
+from .preprocessing import fill_missing_dates
+
+WINDOW_DAYS = max(LAGS + [28, 30])
+
+
+class DemandFeatureStore:
+    """
+    État glissant par produit :
+      - `days` : demande des WINDOW_DAYS derniers jours (dernière colonne =
+        `last_date`, NaN avant le début de l'historique) ;
+      - `ewma_prev` : EWMA jusqu'à la veille de `last_date` (NaN si aucun jour) ;
+      - `n_days` : nombre de jours couverts depuis le début de l'historique.
+    """
+
+    def __init__(self):
+        self.products: list = []
+        self._index: Dict[str, int] = {}
+        self.days = np.full((0, WINDOW_DAYS), np.nan)
+        self.ewma_prev = np.full(0, np.nan)
+        self.last_date: Optional[pd.Timestamp] = None
+        self.n_days = 0
+        self.alpha = 2.0 / (EWMA_SPAN + 1)
+
+    # ── initialisation ───────────────────────────────────────────
+
+    @classmethod
+    def from_history(cls, daily: pd.DataFrame) -> 'DemandFeatureStore':
+        """État à la dernière date d'un historique (sortie de fill_missing_dates)."""
+        store = cls()
+        if len(daily) == 0:
+            return store
+        daily = daily.sort_values(['product_id', 'date'])
+        codes, products = pd.factorize(daily['product_id'].astype(str), sort=True)
+        start = daily['date'].min()
+        day = (daily['date'] - start).dt.days.to_numpy()
+        n_days = int(day.max()) + 1
+        m = np.full((len(products), n_days), np.nan)
+        m[codes, day] = daily['quantity'].to_numpy(dtype=float)
+
+        store.products = list(products)
+        store._index = {p: i for i, p in enumerate(store.products)}
+        window = np.full((len(products), WINDOW_DAYS), np.nan)
+        kept = min(n_days, WINDOW_DAYS)
+        window[:, -kept:] = m[:, -kept:]
+        store.days = window
+        store.ewma_prev = _past_ewma(m, EWMA_SPAN)[:, -1] if n_days > 1 else np.full(len(products), np.nan)
+        store.last_date = daily['date'].max()
+        store.n_days = n_days
+        return store
+
+    def _add_product(self, product_id: str) -> int:
+        # Comme fill_missing_dates : 0 sur les jours couverts, NaN avant l'historique
+        row = np.full((1, WINDOW_DAYS), np.nan)
+        row[0, WINDOW_DAYS - min(self.n_days, WINDOW_DAYS):] = 0.0
+        self.days = np.vstack([self.days, row])
+        self.ewma_prev = np.append(self.ewma_prev, 0.0 if self.n_days > 1 else np.nan)
+        self.products.append(product_id)
+        self._index[product_id] = len(self.products) - 1
+        return self._index[product_id]
+
+    def _advance(self, day: pd.Timestamp) -> None:
+        """Clôt les jours jusqu'à la veille de `day` ; `day` devient le dernier jour."""
+        if self.last_date is None:
+            self.days[:, -1] = 0.0
+            self.last_date, self.n_days = day, 1
+            return
+        for _ in range((day - self.last_date).days):
+            last = self.days[:, -1]
+            self.ewma_prev = np.where(
+                np.isnan(self.ewma_prev), last,
+                (1 - self.alpha) * self.ewma_prev + self.alpha * last,
+            )
+            self.days = np.roll(self.days, -1, axis=1)
+            self.days[:, -1] = 0.0
+        self.n_days += (day - self.last_date).days
+        self.last_date = day
+
+    # ── mise à jour ──────────────────────────────────────────────
+
+    def record(self, product_id: str, quantity: float, when=None) -> None:
+        """
+        Ajoute une demande (livraison validée) au jour `when` (défaut :
+        aujourd'hui). Un jour postérieur fait avancer la fenêtre ; un jour
+        antérieur encore dans la fenêtre est corrigé en place (l'EWMA étant
+        linéaire, sa contribution est ajoutée directement).
+        """
+        day = pd.Timestamp(when or date.today()).normalize()
+        if self.last_date is None or day > self.last_date:
+            self._advance(day)
+        row = self._index.get(str(product_id))
+        if row is None:
+            row = self._add_product(str(product_id))
+
+        age = (self.last_date - day).days
+        if age >= WINDOW_DAYS:
+            return  # trop ancien pour les features
+        col = WINDOW_DAYS - 1 - age
+        self.days[row, col] = np.nan_to_num(self.days[row, col]) + quantity
+        if age >= 1 and not np.isnan(self.ewma_prev[row]):
+            self.ewma_prev[row] += self.alpha * (1 - self.alpha) ** (age - 1) * quantity
+
+    def push_day(self, quantities: pd.Series) -> None:
+        """
+        Ajoute un jour complet (quantités indexées par produit, 0 pour les
+        absents) : chemin vectorisé de la prévision multi-horizon.
+        """
+        self._advance(self.last_date + pd.Timedelta(days=1))
+        self.days[:, -1] = quantities.reindex(self.products, fill_value=0.0).to_numpy(dtype=float)
+
+    # ── features du lendemain ────────────────────────────────────
+
+    def next_features(self) -> pd.DataFrame:
+        """Une ligne par produit : features pour le jour suivant `last_date`."""
+        if self.last_date is None or not self.products:
+            return pd.DataFrame()
+        m = self.days
+        valid = ~np.isnan(m)
+        positive = np.where(m > 0, m, np.nan)
+
+        def past_mean(values: np.ndarray, window: int) -> np.ndarray:
+            values = values[:, -window:]
+            count = (~np.isnan(values)).sum(axis=1)
+            total = np.nansum(values, axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+        target = self.last_date + pd.Timedelta(days=1)
+        products = np.array(self.products, dtype=object)
+        order = np.argsort(products, kind='stable')
+        enc = np.empty(len(products), dtype=np.int32)
+        enc[order] = np.arange(len(products))
+        last = m[:, -1]
+        ewma = np.where(
+            np.isnan(self.ewma_prev), last,
+            (1 - self.alpha) * self.ewma_prev + self.alpha * last,
+        )
+        week = target.isocalendar()[1]
+
+        columns = {'date': target, 'product_id': products}
+        for lag in LAGS:
+            columns[f'lag_{lag}'] = m[:, -lag]
+        columns['rolling_mean_7'] = past_mean(m, 7)
+        columns['rolling_mean_28'] = past_mean(m, 28)
+        columns['dayofweek'] = target.dayofweek
+        columns['month'] = target.month
+        columns['quarter'] = target.quarter
+        columns['product_enc'] = enc
+        binary = np.where(valid, (m > 0).astype(float), np.nan)
+        for window in [7, 30]:
+            columns[f'prop_demand_{window}'] = past_mean(binary, window)
+        for window in [7, 30]:
+            columns[f'avg_quantity_{window}'] = past_mean(positive, window)
+        columns['week_sin'] = np.sin(2 * np.pi * week / 52)
+        columns['week_cos'] = np.cos(2 * np.pi * week / 52)
+        columns['ewma_7'] = ewma
+        return pd.DataFrame(columns).iloc[order].reset_index(drop=True)
+
+    # ── persistance ──────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            products=np.array(self.products, dtype=str),
+            days=self.days,
+            ewma_prev=self.ewma_prev,
+            n_days=np.array(self.n_days),
+            last_date=np.array(
+                '' if self.last_date is None else self.last_date.isoformat()
+            ),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'DemandFeatureStore':
+        store = cls()
+        with np.load(path, allow_pickle=False) as data:
+            store.products = [str(p) for p in data['products']]
+            store.days = data['days']
+            store.ewma_prev = data['ewma_prev']
+            store.n_days = int(data['n_days'])
+            last_date = str(data['last_date'])
+        store._index = {p: i for i, p in enumerate(store.products)}
+        store.last_date = pd.Timestamp(last_date) if last_date else None
+        return store
+
+
+# ── Instance de l'application ────────────────────────────────────
+
+_store: Optional[DemandFeatureStore] = None
+_store_lock = asyncio.Lock()
+
+
+def _open_store() -> DemandFeatureStore:
+    """Dernier état sauvegardé, sinon calculé depuis l'historique, sinon vide."""
+    path = settings.FORECAST_FEATURE_STORE_PATH
+    if os.path.isfile(path):
+        return DemandFeatureStore.load(path)
+    history = settings.FORECAST_HISTORY_PATH
+    if os.path.isfile(history):
+        store = DemandFeatureStore.from_history(
+            fill_missing_dates(load_history(history, settings.FORECAST_CACHE_DIR))
+        )
+        logger.info(f"Feature store seeded from {history}: {len(store.products)} products")
+        return store
+    return DemandFeatureStore()
+
+
+async def get_feature_store() -> DemandFeatureStore:
+    """Magasin partagé ; la première ouverture se fait hors de la boucle d'événements."""
+    global _store
+    if _store is None:
+        async with _store_lock:
+            if _store is None:
+                _store = await asyncio.get_running_loop().run_in_executor(None, _open_store)
+    return _store
+
+
+async def record_delivery(product_id: str, quantity: float, when: Optional[datetime] = None) -> None:
+    """Enregistre une livraison validée ; l'état est sauvegardé à chaque changement de jour."""
+    store = await get_feature_store()
+    previous = store.last_date
+    store.record(product_id, quantity, when)
+    if previous is not None and store.last_date != previous:
+        store.save(settings.FORECAST_FEATURE_STORE_PATH)
+
+
+def save_feature_store() -> None:
+    """Sauvegarde l'état (arrêt de l'application) s'il a été ouvert."""
+    if _store is not None:
+        _store.save(settings.FORECAST_FEATURE_STORE_PATH)
@@ -55,4 +55,167 @@ def add_advanced_features(df: pd.DataFrame) -> pd.DataFrame:
         lambda x: x.ewm(span=7, adjust=False).mean().shift(1)
     )
 
-    return df
\ No newline at end of file
+    return df
+
+# ── Construction vectorisée (matrice dense produits × jours) ─────
+
+LAGS = [1, 2, 3, 7, 14, 28]
+EWMA_SPAN = 7
+
+
+def _dense_layout(df: pd.DataFrame):
+    """
+    Position (ligne, colonne) de chaque observation dans la matrice
+    produits × jours. `df` doit être trié par (product_id, date) ; la colonne
+    est le rang de l'observation dans son produit (= le jour après
+    fill_missing_dates), ce qui reproduit exactement groupby().shift().
+    """
+    codes, uniques = pd.factorize(df['product_id'], sort=True)
+    starts = np.searchsorted(codes, codes, side='left')
+    pos = np.arange(len(codes)) - starts
+    return codes, pos, len(uniques), int(pos.max()) + 1 if len(pos) else 0
+
+
+def _lag(m: np.ndarray, k: int) -> np.ndarray:
+    out = np.full_like(m, np.nan)
+    if k < m.shape[1]:
+        out[:, k:] = m[:, :-k]
+    return out
+
+
+def _past_window_mean(m: np.ndarray, window: int) -> np.ndarray:
+    """
+    Moyenne des valeurs non manquantes sur les `window` jours précédents
+    (équivalent de rolling(window, min_periods=1).mean().shift(1)), par
+    différences de sommes cumulées.
+    """
+    valid = ~np.isnan(m)
+    zeros = np.zeros((m.shape[0], 1))
+    csum = np.concatenate([zeros, np.cumsum(np.where(valid, m, 0.0), axis=1)], axis=1)
+    ccnt = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+    t = np.arange(m.shape[1])
+    lo = np.maximum(t - window, 0)
+    total = csum[:, t] - csum[:, lo]
+    count = ccnt[:, t] - ccnt[:, lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _past_ewma(m: np.ndarray, span: int) -> np.ndarray:
+    """ewm(span, adjust=False).mean().shift(1) : une itération par jour, vectorisée sur les produits."""
+    alpha = 2.0 / (span + 1)
+    ewma = np.empty_like(m)
+    if m.shape[1]:
+        ewma[:, 0] = m[:, 0]
+    for t in range(1, m.shape[1]):
+        ewma[:, t] = (1 - alpha) * ewma[:, t - 1] + alpha * m[:, t]
+    return _lag(ewma, 1)
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Équivalent vectorisé de add_advanced_features(add_features(df)).
+
+    La demande est pivotée en une matrice dense produits × jours ; lags,
+    moyennes glissantes, proportions de demande et EWMA sont calculés par
+    décalages et sommes cumulées sur cette matrice, sans rappel Python par
+    produit. Mêmes colonnes, même ordre de lignes et même index.
+    """
+    df = df.sort_values(['product_id', 'date'])
+    if len(df) == 0:
+        return add_advanced_features(add_features(df))
+
+    codes, pos, n_products, n_days = _dense_layout(df)
+    qty = np.full((n_products, n_days), np.nan)
+    qty[codes, pos] = df['quantity'].to_numpy(dtype=float)
+    binary = np.where(np.isnan(qty), np.nan, (qty > 0).astype(float))
+    positive = np.where(qty > 0, qty, np.nan)
+
+    def at_rows(m: np.ndarray) -> np.ndarray:
+        return m[codes, pos]
+
+    columns = {}
+    for lag in LAGS:
+        columns[f'lag_{lag}'] = at_rows(_lag(qty, lag))
+    columns['rolling_mean_7'] = at_rows(_past_window_mean(qty, 7))
+    columns['rolling_mean_28'] = at_rows(_past_window_mean(qty, 28))
+    columns['dayofweek'] = df['date'].dt.dayofweek
+    columns['month'] = df['date'].dt.month
+    columns['quarter'] = df['date'].dt.quarter
+    columns['product_enc'] = codes.astype(np.int16 if n_products < 2 ** 15 else np.int32)
+
+    columns['demand_binary'] = (df['quantity'] > 0).astype(int)
+    for window in [7, 30]:
+        columns[f'prop_demand_{window}'] = at_rows(_past_window_mean(binary, window))
+    for window in [7, 30]:
+        columns[f'avg_quantity_{window}'] = at_rows(_past_window_mean(positive, window))
+
+    week = df['date'].dt.isocalendar().week
+    columns['week_of_year'] = week
+    columns['week_sin'] = np.sin(2 * np.pi * week / 52)
+    columns['week_cos'] = np.cos(2 * np.pi * week / 52)
+    columns['ewma_7'] = at_rows(_past_ewma(qty, EWMA_SPAN))
+
+    return df.assign(**columns)
+
+
+# ── Mode économe en mémoire (blocs de produits, float32) ─────────
+
+BLOCK_PRODUCTS = 500
+
+
+def build_training_matrix(
+    df: pd.DataFrame,
+    columns: list,
+    block_products: int = BLOCK_PRODUCTS,
+    dtype=np.float32,
+):
+    """
+    Features d'entraînement construites par blocs de produits.
+
+    build_features n'est appliqué qu'à `block_products` produits à la fois
+    (les matrices intermédiaires restent bornées) et seules les colonnes
+    `columns` des lignes ayant un lag_1 sont copiées, en `dtype`, dans une
+    matrice préallouée. product_enc garde la numérotation globale.
+
+    Returns:
+        (X, y, product_id, last_rows) : X la matrice préallouée elle-même
+        (ndarray `dtype` inscriptible, colonnes `columns` ; une vue DataFrame
+        serait en lecture seule avec pandas 3, ce que les forêts scikit-learn
+        refusent à l'entraînement), y quantités, product_id catégoriel aligné sur X, last_rows
+        features complètes du dernier jour (pour la prédiction).
+    """
+    if not df['product_id'].is_monotonic_increasing or not isinstance(df['product_id'].dtype, pd.CategoricalDtype):
+        df = df.sort_values(['product_id', 'date'])
+    codes, uniques = pd.factorize(df['product_id'], sort=True)
+    bounds = np.searchsorted(codes, np.arange(0, len(uniques) + block_products, block_products))
+    bounds = np.unique(np.minimum(bounds, len(codes)))
+
+    # Une ligne par produit n'a pas de lag_1 (son premier jour)
+    n_rows = len(codes) - len(uniques)
+    X = np.empty((n_rows, len(columns)), dtype=dtype)
+    y = np.empty(n_rows, dtype=np.float32)
+    row_codes = np.empty(n_rows, dtype=np.int32)
+    last_date = df['date'].max()
+    last_rows = []
+
+    pos = 0
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        block = build_features(df.iloc[lo:hi])
+        block['product_enc'] = block['product_enc'].astype(np.int32) + int(codes[lo])
+        keep = block['lag_1'].notna().to_numpy()
+        m = int(keep.sum())
+        X[pos:pos + m] = block.loc[keep, columns].to_numpy(dtype=dtype)
+        y[pos:pos + m] = block.loc[keep, 'quantity'].to_numpy(dtype=np.float32)
+        row_codes[pos:pos + m] = codes[lo:hi][keep]
+        last_rows.append(block[keep & (block['date'] == last_date).to_numpy()])
+        pos += m
+
+    X, y, row_codes = X[:pos], y[:pos], row_codes[:pos]
+    product_id = pd.Series(pd.Categorical.from_codes(row_codes, categories=pd.Index(uniques).astype(str)))
+    return (
+        X,
+        pd.Series(y, name='quantity'),
+        product_id,
+        pd.concat(last_rows, ignore_index=True) if last_rows else pd.DataFrame(),
+    )
@@ -0,0 +1,95 @@
+"""
+Inférence compacte des forêts scikit-learn.
+
+Les arbres d'une forêt entraînée sont mis à plat dans des tableaux NumPy
+contigus (un nœud par case, tous les arbres bout à bout). La prédiction
+descend tous les arbres pour toutes les lignes à la fois : une itération
+par niveau de profondeur, sans objet Python par arbre.
+"""
+
+import numpy as np
+
+# Lignes traitées par bloc (lignes × arbres indices de nœuds en mémoire)
+CHUNK_ROWS = 4096
+
+
+class FlatForest:
+    """
+    Forêt aplatie : moyenne des feuilles atteintes dans chaque arbre.
+
+    Pour un classifieur binaire, la valeur d'une feuille est la proportion
+    de la classe 1 ; predict() retourne alors la classe majoritaire comme
+    RandomForestClassifier.predict.
+    """
+
+    def __init__(self, forest):
+        trees = [est.tree_ for est in forest.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        self.roots = offsets.astype(np.int32)
+        self.n_features = forest.n_features_in_
+        self.is_classifier = hasattr(forest, 'classes_')
+        self.classes = getattr(forest, 'classes_', None)
+
+        feature, threshold, left, right, missing_left, value = [], [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            leaf = tree.children_left == -1
+            idx = np.arange(tree.node_count)
+            # Une feuille pointe sur elle-même : la descente s'y arrête
+            left.append(np.where(leaf, idx, tree.children_left) + offset)
+            right.append(np.where(leaf, idx, tree.children_right) + offset)
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            missing_left.append(tree.missing_go_to_left.astype(bool))
+            value.append(self._leaf_values(tree.value[:, 0, :]))
+
+        self.feature = np.concatenate(feature).astype(np.int16 if self.n_features < 2 ** 15 else np.int32)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.int32)
+        self.right = np.concatenate(right).astype(np.int32)
+        self.missing_left = np.concatenate(missing_left)
+        self.value = np.concatenate(value)
+        self.max_depth = max(t.max_depth for t in trees)
+
+    def _leaf_values(self, value: np.ndarray) -> np.ndarray:
+        if not self.is_classifier:
+            return value[:, 0].astype(np.float64)
+        if 1 not in self.classes:
+            return np.zeros(len(value))
+        counts = value.sum(axis=1)
+        return value[:, list(self.classes).index(1)] / np.where(counts > 0, counts, 1)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (
+            self.roots, self.feature, self.threshold, self.left,
+            self.right, self.missing_left, self.value,
+        ))
+
+    def _mean_leaf_value(self, X: np.ndarray) -> np.ndarray:
+        out = np.empty(len(X))
+        for start in range(0, len(X), CHUNK_ROWS):
+            block = X[start:start + CHUNK_ROWS]
+            rows = np.arange(len(block))[:, None]
+            node = np.broadcast_to(self.roots, (len(block), len(self.roots))).copy()
+            for _ in range(self.max_depth):
+                x = block[rows, self.feature[node]]
+                go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+                node = np.where(go_left, self.left[node], self.right[node])
+            out[start:start + len(block)] = self.value[node].mean(axis=1)
+        return out
+
+    def predict_value(self, X) -> np.ndarray:
+        """Moyenne des feuilles (proportion de la classe 1 pour un classifieur)."""
+        # Comme scikit-learn : comparaison des features en float32 aux seuils float64
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) == 0:
+            return np.zeros(0)
+        return self._mean_leaf_value(X)
+
+    def predict(self, X) -> np.ndarray:
+        values = self.predict_value(X)
+        if self.is_classifier:
+            # argmax de [1 - p, p] : égalité → classe 0, comme scikit-learn
+            return (values > 0.5).astype(int)
+        return values
@@ -1,58 +1,236 @@
+import logging
+import time
+from typing import Callable, Dict, Optional
+
 import numpy as np
 import pandas as pd
-from .features import FEATURE_COLS, add_features, add_advanced_features
-from .models import HurdleModel
+from .features import BLOCK_PRODUCTS, FEATURE_COLS, build_features, build_training_matrix
+from .models import HurdleModel, TieredModel
+from .model_store import encode_products, load_model, needs_retrain, product_encoding, save_model
+
+logger = logging.getLogger(__name__)
+
+MODEL_FEATURES = FEATURE_COLS + ['prop_demand_7', 'prop_demand_30', 'avg_quantity_7', 'avg_quantity_30',
+                                 'week_sin', 'week_cos', 'ewma_7']
 
-def generate_orders_hurdle(daily_full: pd.DataFrame, cap_quantile: float = 0.99) -> pd.DataFrame:
+# Historique suffisant pour les features du dernier jour (fenêtres ≤ 30 j ;
+# le poids résiduel de l'EWMA au-delà de 120 j est < 1e-14)
+PREDICT_HISTORY_DAYS = 120
+
+
+def _prepare_model(daily_full, model_path, retrain_policy, model_factory, timings, lean=False):
     """
-    Entraîne le modèle Hurdle sur tout l'historique et génère les ordres pour le lendemain.
-    Applique un plafonnement optionnel par le 99e percentile de chaque produit.
+    Modèle prêt à prédire et features de l'historique : l'artefact sauvegardé
+    s'il est réutilisable (features des derniers jours seulement), sinon un
+    modèle entraîné sur tout l'historique. Retourne (modèle, produits,
+    features, colonnes), `produits` étant la numérotation product_enc vue à
+    l'entraînement.
+
+    Avec `lean`, l'entraînement passe par build_training_matrix (blocs de
+    produits, float32) et seules les features du dernier jour sont retournées.
     """
-    # Ajout des features
-    daily_feat = add_features(daily_full)
-    daily_feat = add_advanced_features(daily_feat)
-    daily_feat = daily_feat.dropna(subset=['lag_1']).copy()
+    start = time.perf_counter()
+    last_date = daily_full['date'].max()
 
-    if len(daily_feat) == 0:
-        return pd.DataFrame()
+    model = None
+    if model_path:
+        artefact = load_model(model_path)
+        reason = needs_retrain(artefact, daily_full, MODEL_FEATURES, retrain_policy)
+        if reason is None:
+            wanted, saved = model_factory(), artefact['model']
+            if (type(wanted), getattr(wanted, 'backend', None)) != \
+                    (type(saved), getattr(saved, 'backend', None)):
+                reason = f"model changed to {type(wanted).__name__}/{getattr(wanted, 'backend', None)}"
+        if reason is None:
+            model, products = artefact['model'], artefact['products']
+            history = daily_full[daily_full['date'] > last_date - pd.Timedelta(days=PREDICT_HISTORY_DAYS)]
+            daily_feat = build_features(history)
+        else:
+            logger.info(f"Ré-entraînement du modèle Hurdle : {reason}")
+
+    if model is None:
+        products = product_encoding(daily_full)
+
+    if model is None and lean:
+        X, y, product_id, daily_feat = build_training_matrix(daily_full, MODEL_FEATURES, BLOCK_PRODUCTS)
+        timings['features_s'] = time.perf_counter() - start
+        if len(X) == 0:
+            timings['fit_s'] = 0.0
+            return None, products, daily_feat, MODEL_FEATURES
+        return _fit(model_factory, X, y, product_id, daily_full, model_path, timings, MODEL_FEATURES), \
+            products, daily_feat, MODEL_FEATURES
+
+    if model is None:
+        # Ajout des features
+        daily_feat = build_features(daily_full)
+    daily_feat = daily_feat.dropna(subset=['lag_1'])
+    timings['features_s'] = time.perf_counter() - start
+    timings['fit_s'] = 0.0
 
     # Features disponibles (les colonnes effectivement présentes)
-    base_features = FEATURE_COLS + ['prop_demand_7', 'prop_demand_30', 'avg_quantity_7', 'avg_quantity_30',
-                                     'week_sin', 'week_cos', 'ewma_7']
-    available = [f for f in base_features if f in daily_feat.columns]
+    available = [f for f in MODEL_FEATURES if f in daily_feat.columns]
+    if len(daily_feat) == 0 or model is not None:
+        return model, products, daily_feat, available
+
+    model = _fit(model_factory, daily_feat[available], daily_feat['quantity'],
+                 daily_feat['product_id'], daily_full, model_path, timings, available)
+    return model, products, daily_feat, available
 
-    X_all = daily_feat[available]
-    y_all = daily_feat['quantity']
 
-    # Entraînement du modèle Hurdle
-    model = HurdleModel()
-    model.fit(X_all, y_all)
+def _fit(model_factory, X, y, product_id, daily_full, model_path, timings, features):
+    """Entraînement du modèle Hurdle sur X (colonnes `features`), sauvegardé si `model_path`."""
+    start = time.perf_counter()
+    model = model_factory()
+    if isinstance(model, TieredModel):
+        model.fit(X, y, product_id, daily_full)
+    else:
+        model.fit(X, y)
+    timings['fit_s'] = time.perf_counter() - start
+    if model_path:
+        save_model(model_path, model, features, daily_full)
+    return model
 
-    # Dernière date disponible
+
+def _predict(model, rows: pd.DataFrame, available, recent: pd.DataFrame, products) -> np.ndarray:
+    """
+    Prédictions pour `rows` ; TieredModel estime la longue traîne sur `recent`.
+    product_enc est recodé selon la numérotation `products` de l'entraînement :
+    celle de build_features / next_features dépend des produits présents.
+    """
+    if 'product_enc' in available:
+        rows = rows.assign(product_enc=encode_products(rows['product_id'], products))
+    if isinstance(model, TieredModel):
+        return model.predict(rows[available], rows['product_id'], recent)
+    return model.predict(rows[available])
+
+
+def _product_caps(daily_full: pd.DataFrame, product_ids: pd.Series, cap_quantile: float) -> np.ndarray:
+    """Plafond de chaque produit : quantile `cap_quantile` de sa demande journalière."""
+    caps = daily_full.groupby('product_id', observed=True)['quantity'].quantile(cap_quantile)
+    return product_ids.astype(object).map(caps).fillna(caps.max()).values.astype(float)
+
+
+def generate_orders_hurdle(
+    daily_full: pd.DataFrame,
+    cap_quantile: float = 0.99,
+    model_path: Optional[str] = None,
+    retrain_policy: str = 'nightly',
+    model_factory: Callable = HurdleModel,
+    timings: Optional[Dict[str, float]] = None,
+    lean: bool = False,
+) -> pd.DataFrame:
+    """
+    Entraîne le modèle Hurdle sur tout l'historique et génère les ordres pour le lendemain.
+    Applique un plafonnement optionnel par le 99e percentile de chaque produit.
+
+    Avec `model_path`, le modèle sauvegardé est réutilisé tant que la
+    politique `retrain_policy` (nightly, weekly, drift) ne demande pas de
+    ré-entraînement : seules les features des derniers jours sont alors
+    calculées et aucun entraînement n'a lieu.
+
+    `model_factory` construit le modèle (fit/predict) à entraîner — avec
+    TieredModel, seuls les produits à fort volume passent par les forêts ; si
+    `timings` est fourni, il reçoit les durées 'features_s', 'fit_s' et
+    'predict_s' en secondes. `lean` active le mode économe en mémoire
+    (features par blocs de produits, en float32).
+    """
+    timings = timings if timings is not None else {}
     last_date = daily_full['date'].max()
     forecast_date = last_date + pd.Timedelta(days=1)
 
+    model, products, daily_feat, available = _prepare_model(
+        daily_full, model_path, retrain_policy, model_factory, timings, lean,
+    )
+    if len(daily_feat) == 0 or model is None:
+        return pd.DataFrame()
+
     # Lignes correspondant à cette dernière date
     last_rows = daily_feat[daily_feat['date'] == last_date]
     if len(last_rows) == 0:
         return pd.DataFrame()
 
-    X_last = last_rows[available]
-    preds = model.predict(X_last)
+    start = time.perf_counter()
+    recent = daily_full[daily_full['date'] > last_date - pd.Timedelta(days=PREDICT_HISTORY_DAYS)]
+    preds = _predict(model, last_rows, available, recent, products)
+    timings['predict_s'] = time.perf_counter() - start
 
     # Plafonnement par le 99e percentile de chaque produit
-    caps = daily_full.groupby('product_id')['quantity'].quantile(cap_quantile)
-    caps_aligned = last_rows['product_id'].map(caps).fillna(caps.max()).values
-    preds = np.minimum(preds, caps_aligned)
+    preds = np.minimum(preds, _product_caps(daily_full, last_rows['product_id'], cap_quantile))
+
+    source = 'Hurdle_RF'
+    if isinstance(model, TieredModel):
+        head = last_rows['product_id'].astype(str).isin(model.head_products).to_numpy()
+        source = np.where(head, 'Hurdle_RF', model.method.upper())
 
     # Construction du DataFrame des ordres
     orders = pd.DataFrame({
-        'product_id': last_rows['product_id'].values,
+        'product_id': last_rows['product_id'].astype(str).values,
         'quantity': np.maximum(0, np.round(preds)).astype(int),
         'order_date': forecast_date,
         'generated_at': pd.Timestamp.now(),
         'status': 'to_validate',
-        'source': 'Hurdle_RF'
+        'source': source,
     })
     orders = orders[orders['quantity'] > 0].reset_index(drop=True)
-    return orders
\ No newline at end of file
+    return orders
+
+
+def forecast_horizon(
+    daily_full: pd.DataFrame,
+    horizon: int = 7,
+    cap_quantile: float = 0.99,
+    model_path: Optional[str] = None,
+    retrain_policy: str = 'nightly',
+    model_factory: Callable = HurdleModel,
+    timings: Optional[Dict] = None,
+    lean: bool = False,
+) -> pd.DataFrame:
+    """
+    Prévision sur `horizon` jours en un seul appel (stratégie récursive).
+
+    Le modèle est entraîné ou chargé une fois. Les features de chaque jour
+    sont produites par le DemandFeatureStore, qui avance d'un jour avec les
+    quantités prévues la veille : le coût d'un pas est O(produits), sans
+    recalcul de l'historique. Contrairement à generate_orders_hurdle, le
+    jour J+h est prédit à partir de ses propres features (lag_1 = J+h-1).
+
+    Returns:
+        Matrice produits × jours (index product_id, une colonne par date
+        prévue, quantités entières plafonnées). `timings` reçoit en plus
+        'horizon_s', la durée de chaque pas.
+    """
+    from .feature_store import DemandFeatureStore
+
+    timings = timings if timings is not None else {}
+    model, products, daily_feat, available = _prepare_model(
+        daily_full, model_path, retrain_policy, model_factory, timings, lean,
+    )
+    if len(daily_feat) == 0 or model is None:
+        return pd.DataFrame()
+
+    last_date = daily_full['date'].max()
+    recent = daily_full[daily_full['date'] > last_date - pd.Timedelta(days=PREDICT_HISTORY_DAYS)]
+    recent = recent[['date', 'product_id', 'quantity']].astype({'product_id': str})
+    store = DemandFeatureStore.from_history(recent)
+    caps = None
+
+    columns = {}
+    timings['horizon_s'] = []
+    for _ in range(horizon):
+        start = time.perf_counter()
+        rows = store.next_features()
+        if caps is None:
+            caps = _product_caps(daily_full, rows['product_id'], cap_quantile)
+        preds = np.maximum(0, np.minimum(_predict(model, rows, available, recent, products), caps))
+        day = rows['date'].iloc[0]
+        columns[day] = np.round(preds).astype(int)
+
+        # Le jour prévu devient le dernier jour connu
+        store.push_day(pd.Series(preds, index=rows['product_id']))
+        if isinstance(model, TieredModel):
+            recent = pd.concat([recent, pd.DataFrame(
+                {'date': day, 'product_id': rows['product_id'], 'quantity': preds}
+            )], ignore_index=True)
+        timings['horizon_s'].append(time.perf_counter() - start)
+
+    return pd.DataFrame(columns, index=pd.Index(rows['product_id'], name='product_id'))
@@ -0,0 +1,111 @@
+"""
+Demande intermittente : classification des produits et estimateurs de
+Croston / TSB (Teunter-Syntetos-Babai).
+
+Les estimateurs sont des lissages exponentiels calculés pour tous les
+produits à la fois sur la matrice produits × jours : une boucle sur les
+jours, vectorisée sur les produits.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# Seuil de Syntetos-Boylan : au-delà, la demande est dite intermittente
+ADI_CUTOFF = 1.32
+# Produits couvrant cette part du volume total = produits « à fort volume »
+HEAD_VOLUME_SHARE = 0.9
+
+
+def demand_matrix(daily: pd.DataFrame) -> Tuple[np.ndarray, pd.Index]:
+    """Matrice produits × jours (float64, jours manquants = 0) et index des produits."""
+    codes, products = pd.factorize(daily['product_id'], sort=True)
+    dates = daily['date'].to_numpy(dtype='datetime64[D]')
+    day = (dates - dates.min()).astype(np.int64) if len(dates) else dates.astype(np.int64)
+    m = np.zeros((len(products), int(day.max()) + 1 if len(day) else 0))
+    np.add.at(m, (codes, day), daily['quantity'].to_numpy(dtype=float))
+    return m, pd.Index(products).astype(str)
+
+
+def classify_products(
+    daily: pd.DataFrame,
+    adi_cutoff: float = ADI_CUTOFF,
+    head_share: float = HEAD_VOLUME_SHARE,
+) -> pd.DataFrame:
+    """
+    Volume et intermittence de chaque produit.
+
+    Colonnes : volume (demande totale), adi (intervalle moyen entre deux
+    jours de demande), cv2 (carré du coefficient de variation des tailles
+    non nulles) et head (True si le produit est à fort volume — parmi ceux
+    qui couvrent `head_share` du volume — ou à demande régulière).
+    """
+    m, products = demand_matrix(daily)
+    nonzero = (m > 0).sum(axis=1)
+    volume = m.sum(axis=1)
+    adi = np.where(nonzero > 0, m.shape[1] / np.maximum(nonzero, 1), np.inf)
+
+    sizes = np.where(m > 0, m, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_size = np.nanmean(sizes, axis=1) if m.size else np.zeros(len(products))
+        cv2 = np.nan_to_num(np.nanvar(sizes, axis=1) / mean_size ** 2) if m.size else mean_size
+
+    order = np.argsort(-volume, kind='stable')
+    share = np.cumsum(volume[order]) / max(volume.sum(), 1.0)
+    top = np.zeros(len(products), dtype=bool)
+    # produits nécessaires pour atteindre head_share, celui qui franchit le seuil inclus
+    top[order[:int(np.searchsorted(share, head_share)) + 1]] = True
+
+    return pd.DataFrame({
+        'volume': volume,
+        'adi': adi,
+        'cv2': cv2,
+        'head': (top | (adi < adi_cutoff)) & (volume > 0),
+    }, index=products.rename('product_id'))
+
+
+def croston(m: np.ndarray, alpha: float = 0.1, sba: bool = True) -> np.ndarray:
+    """
+    Prévision de Croston (demande moyenne par jour) après le dernier jour de `m`.
+
+    Taille et intervalle entre demandes sont lissés séparément ; la
+    correction de Syntetos-Boylan (1 - alpha/2) est appliquée si `sba`.
+    """
+    n = m.shape[0]
+    size = np.full(n, np.nan)
+    interval = np.full(n, np.nan)
+    since = np.ones(n)
+    for t in range(m.shape[1]):
+        y = m[:, t]
+        hit = y > 0
+        first = hit & np.isnan(size)
+        size[first], interval[first] = y[first], since[first]
+        again = hit & ~first
+        size[again] += alpha * (y[again] - size[again])
+        interval[again] += alpha * (since[again] - interval[again])
+        since = np.where(hit, 1.0, since + 1.0)
+    forecast = np.nan_to_num(size / interval)
+    return forecast * (1 - alpha / 2) if sba else forecast
+
+
+def tsb(m: np.ndarray, alpha: float = 0.1, beta: float = 0.1) -> np.ndarray:
+    """
+    Prévision TSB (demande moyenne par jour) après le dernier jour de `m`.
+
+    La probabilité de demande est mise à jour chaque jour (elle décroît
+    pendant les périodes sans vente, contrairement à Croston) et la taille
+    seulement les jours de demande.
+    """
+    hits = m > 0
+    prob = hits.mean(axis=1) if m.shape[1] else np.zeros(m.shape[0])
+    with np.errstate(invalid='ignore'):
+        size = np.nan_to_num(m.sum(axis=1) / hits.sum(axis=1))
+    for t in range(m.shape[1]):
+        hit = hits[:, t]
+        prob += beta * (hit - prob)
+        size[hit] += alpha * (m[hit, t] - size[hit])
+    return prob * size
+
+
+ESTIMATORS = {'croston': croston, 'tsb': tsb}
@@ -0,0 +1,157 @@
+"""
+Persistance du modèle Hurdle et politique de ré-entraînement.
+
+L'artefact (joblib) contient le modèle, la version du format, les features
+utilisées, la numérotation product_enc de l'entraînement, l'empreinte des
+données d'entraînement et un profil de la demande récente servant à
+détecter une dérive.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+# À incrémenter dès que le format de l'artefact ou les features changent
+MODEL_VERSION = 3
+
+RETRAIN_POLICIES = ('nightly', 'weekly', 'drift')
+PROFILE_DAYS = 28
+DRIFT_THRESHOLD = 0.25
+DRIFT_MAX_AGE_DAYS = 30
+
+# Artefacts déjà chargés : chemin → (mtime, artefact)
+_loaded: Dict[str, tuple] = {}
+
+
+def data_fingerprint(daily: pd.DataFrame) -> str:
+    """Empreinte SHA-1 des colonnes (date, product_id, quantity)."""
+    hashed = pd.util.hash_pandas_object(
+        daily[['date', 'product_id', 'quantity']].astype({'product_id': str}),
+        index=False,
+    )
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def product_encoding(daily: pd.DataFrame) -> List[str]:
+    """Produits dans l'ordre des codes product_enc de build_features."""
+    return [str(p) for p in pd.factorize(daily['product_id'], sort=True)[1]]
+
+
+def encode_products(product_ids: pd.Series, products: List[str]) -> np.ndarray:
+    """
+    Codes product_enc de l'entraînement pour `product_ids` ; -1 pour un
+    produit inconnu du modèle (apparu depuis).
+    """
+    index = {p: i for i, p in enumerate(products)}
+    return product_ids.astype(str).map(index).fillna(-1).to_numpy(dtype=np.int32)
+
+
+def demand_profile(daily: pd.DataFrame, days: int = PROFILE_DAYS) -> Dict[str, float]:
+    """Demande totale moyenne par jour et part de jours-produits sans demande sur les derniers jours."""
+    last_date = daily['date'].max()
+    recent = daily[daily['date'] > last_date - pd.Timedelta(days=days)]
+    if len(recent) == 0:
+        return {'mean_daily': 0.0, 'zero_rate': 1.0}
+    n_days = recent['date'].nunique()
+    return {
+        'mean_daily': float(recent['quantity'].sum()) / n_days,
+        'zero_rate': float((recent['quantity'] == 0).mean()),
+    }
+
+
+def save_model(path: str, model, features: List[str], daily: pd.DataFrame) -> Dict:
+    """Sauvegarde le modèle et ses métadonnées ; retourne les métadonnées."""
+    meta = {
+        'version': MODEL_VERSION,
+        'sklearn_version': sklearn.__version__,
+        'features': list(features),
+        'products': product_encoding(daily),
+        'fingerprint': data_fingerprint(daily),
+        'trained_at': datetime.now().isoformat(),
+        'trained_until': pd.Timestamp(daily['date'].max()).isoformat(),
+        'train_rows': int(len(daily)),
+        'profile': demand_profile(daily),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    joblib.dump({**meta, 'model': model}, tmp_path)
+    os.replace(tmp_path, path)
+    return meta
+
+
+def load_model(path: str) -> Optional[Dict]:
+    """
+    Charge un artefact ; None s'il est absent ou illisible. L'artefact reste
+    en mémoire tant que le fichier n'est pas modifié.
+    """
+    if not path or not os.path.isfile(path):
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        artefact = joblib.load(path)
+    except Exception:
+        return None
+    _loaded[path] = (mtime, artefact)
+    return artefact
+
+
+def needs_retrain(
+    artefact: Optional[Dict],
+    daily: pd.DataFrame,
+    features: List[str],
+    policy: str = 'nightly',
+    drift_threshold: float = DRIFT_THRESHOLD,
+    now: Optional[datetime] = None,
+) -> Optional[str]:
+    """
+    Indique pourquoi le modèle doit être ré-entraîné (None = réutilisable).
+
+    Politiques :
+      - nightly : au plus un entraînement par jour calendaire ;
+      - weekly  : quand le modèle a 7 jours ou plus ;
+      - drift   : quand la demande récente s'écarte du profil d'entraînement
+                  de plus de `drift_threshold` (ou après 30 jours).
+    Un artefact absent, d'une autre version ou entraîné sur d'autres
+    features est toujours ré-entraîné ; des données identiques jamais.
+    """
+    if policy not in RETRAIN_POLICIES:
+        raise ValueError(f"Unknown retrain policy '{policy}', expected one of {RETRAIN_POLICIES}")
+    if artefact is None:
+        return 'no saved model'
+    if artefact.get('version') != MODEL_VERSION:
+        return f"model version {artefact.get('version')} != {MODEL_VERSION}"
+    if artefact.get('sklearn_version') != sklearn.__version__:
+        return f"scikit-learn {artefact.get('sklearn_version')} != {sklearn.__version__}"
+    if artefact.get('features') != list(features):
+        return 'feature set changed'
+    if artefact.get('fingerprint') == data_fingerprint(daily):
+        return None
+
+    now = now or datetime.now()
+    age = now - datetime.fromisoformat(artefact['trained_at'])
+    if policy == 'nightly':
+        if datetime.fromisoformat(artefact['trained_at']).date() < now.date():
+            return 'nightly retrain due'
+        return None
+    if policy == 'weekly':
+        return 'weekly retrain due' if age >= timedelta(days=7) else None
+
+    if age >= timedelta(days=DRIFT_MAX_AGE_DAYS):
+        return f"model older than {DRIFT_MAX_AGE_DAYS} days"
+    before, current = artefact.get('profile') or {}, demand_profile(daily)
+    base = before.get('mean_daily', 0.0)
+    change = abs(current['mean_daily'] - base) / base if base else np.inf
+    if change > drift_threshold:
+        return f"demand drift {change:.0%}"
+    if abs(current['zero_rate'] - before.get('zero_rate', 0.0)) > drift_threshold:
+        return 'intermittency drift'
+    return None
@@ -1,17 +1,71 @@
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+import pandas as pd
+from sklearn.ensemble import (
+    HistGradientBoostingClassifier,
+    HistGradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression, PoissonRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .flat_forest import FlatForest
+from .intermittent import ESTIMATORS, classify_products, croston, demand_matrix, tsb
+
+
+def _linear(estimator):
+    # Les modèles linéaires ne gèrent ni les NaN (lags du début) ni les échelles
+    return make_pipeline(SimpleImputer(), StandardScaler(), estimator)
+
+
+# Backends des deux étapes : nom → (classifieur, régresseur), paramètres surchargeables
+BACKENDS = {
+    'forest': (
+        lambda **p: RandomForestClassifier(**{'n_estimators': 200, 'max_depth': 10,
+                                              'random_state': 42, 'n_jobs': -1, **p}),
+        lambda **p: RandomForestRegressor(**{'n_estimators': 200, 'max_depth': 10,
+                                             'random_state': 42, 'n_jobs': -1, **p}),
+    ),
+    'hgb': (
+        lambda **p: HistGradientBoostingClassifier(**{'max_iter': 200, 'random_state': 42, **p}),
+        lambda **p: HistGradientBoostingRegressor(**{'loss': 'poisson', 'max_iter': 200,
+                                                     'random_state': 42, **p}),
+    ),
+    'linear': (
+        lambda **p: _linear(LogisticRegression(**{'max_iter': 1000, **p})),
+        lambda **p: _linear(PoissonRegressor(**{'max_iter': 1000, **p})),
+    ),
+}
+
+
+# Au-delà, les forêts scikit-learn (multi-cœurs) sont plus rapides que FlatForest
+FLAT_MAX_ROWS = 2048
+
 
 class HurdleModel:
     """
     Modèle en deux étapes :
       - classifieur pour prédire si demande > 0
       - régresseur pour prédire la quantité quand demande > 0
+    `backend` choisit la famille des deux étapes (voir BACKENDS).
+
+    Le régresseur n'est évalué que sur les lignes où le classifieur prévoit
+    une demande. Avec le backend 'forest', les forêts entraînées sont en
+    outre aplaties (FlatForest) : seules les versions aplaties sont
+    sérialisées, et elles servent aux prédictions de moins de
+    FLAT_MAX_ROWS lignes (au-delà, les forêts scikit-learn si présentes).
     """
-    def __init__(self, clf_params=None, reg_params=None):
-        self.clf = RandomForestClassifier(n_estimators=200, max_depth=10,
-                                          random_state=42, n_jobs=-1)
-        self.reg = RandomForestRegressor(n_estimators=200, max_depth=10,
-                                         random_state=42, n_jobs=-1)
+    def __init__(self, clf_params=None, reg_params=None, backend='forest'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown model backend '{backend}', expected one of {sorted(BACKENDS)}")
+        make_clf, make_reg = BACKENDS[backend]
+        self.backend = backend
+        self.clf = make_clf(**(clf_params or {}))
+        self.reg = make_reg(**(reg_params or {}))
+        self.flat = None
+        self.has_reg = False
 
     def fit(self, X, y):
         pos_mask = y > 0
@@ -19,12 +73,103 @@ class HurdleModel:
         y_pos = y[pos_mask]
 
         self.clf.fit(X, (y > 0).astype(int))
-        if len(X_pos) > 0:
+        self.has_reg = len(X_pos) > 0
+        if self.has_reg:
             self.reg.fit(X_pos, y_pos)
+        if self.backend == 'forest':
+            self.flat = (FlatForest(self.clf), FlatForest(self.reg) if self.has_reg else None)
         return self
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if state.get('flat') is not None:
+            state['clf'] = state['reg'] = None  # les tableaux aplatis suffisent à prédire
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('flat', None)
+        self.__dict__.setdefault('has_reg', True)
+
     def predict(self, X):
-        pred_bin = self.clf.predict(X)
-        pred_quant = self.reg.predict(X)
-        pred_quant[pred_bin == 0] = 0
-        return pred_quant
\ No newline at end of file
+        if self.flat is not None and (self.clf is None or len(X) <= FLAT_MAX_ROWS):
+            clf, reg = self.flat
+            X = np.asarray(X, dtype=np.float32)
+        else:
+            clf, reg = self.clf, self.reg if self.has_reg else None
+            if not hasattr(clf, 'feature_names_in_'):
+                X = np.asarray(X)  # entraîné sur une matrice (mode économe)
+        pred_quant = np.zeros(len(X))
+        demand = clf.predict(X) == 1
+        if reg is not None and demand.any():
+            pred_quant[demand] = reg.predict(X[demand])
+        return pred_quant
+
+
+class TieredModel:
+    """
+    Modèle par segments de produits :
+      - produits à fort volume et demande régulière : HurdleModel
+      - longue traîne (faible volume ou demande intermittente) : estimateur
+        de Croston ou TSB, sans entraînement
+    Les forêts ne sont entraînées que sur les lignes des produits à fort volume.
+    """
+    def __init__(self, method='tsb', alpha=0.1, beta=0.1, forest_factory=HurdleModel):
+        if method not in ESTIMATORS:
+            raise ValueError(f"Unknown intermittent method '{method}', expected one of {sorted(ESTIMATORS)}")
+        self.method = method
+        self.alpha = alpha
+        self.beta = beta
+        self.forest = forest_factory()
+        self.head_products = frozenset()
+
+    @property
+    def backend(self):
+        return getattr(self.forest, 'backend', None)
+
+    def fit(self, X, y, product_id, history):
+        """`product_id` aligne X sur les produits ; `history` sert à la classification."""
+        tiers = classify_products(history)
+        self.head_products = frozenset(tiers.index[tiers['head']])
+        head = np.asarray(product_id.isin(self.head_products))
+        if head.any():
+            self.forest.fit(X[head], y[head])
+        return self
+
+    def _intermittent(self, history):
+        m, products = demand_matrix(history)
+        if self.method == 'tsb':
+            rate = tsb(m, self.alpha, self.beta)
+        else:
+            rate = croston(m, self.alpha)
+        return pd.Series(rate, index=products)
+
+    def predict(self, X, product_id, history):
+        """Prévisions alignées sur X ; la longue traîne est estimée sur `history`."""
+        product_id = product_id.astype(str)
+        head = np.asarray(product_id.isin(self.head_products))
+        preds = np.zeros(len(X))
+        if head.any():
+            preds[head] = self.forest.predict(X[head])
+        if (~head).any():
+            tail = product_id[~head]
+            recent = history[history['product_id'].astype(str).isin(set(tail))]
+            preds[~head] = tail.map(self._intermittent(recent)).fillna(0).to_numpy()
+        return preds
+
+
+MODELS = {
+    'hurdle': HurdleModel,
+    'tiered': TieredModel,
+}
+
+
+def make_model_factory(name='hurdle', backend='forest'):
+    """Constructeur sans argument du modèle `name` avec le backend `backend`."""
+    if name not in MODELS:
+        raise ValueError(f"Unknown model '{name}', expected one of {sorted(MODELS)}")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {sorted(BACKENDS)}")
+    if name == 'tiered':
+        return lambda: TieredModel(forest_factory=lambda: HurdleModel(backend=backend))
+    return lambda: HurdleModel(backend=backend)
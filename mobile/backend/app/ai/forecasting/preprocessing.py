@@ -1,14 +1,32 @@
+import numpy as np
 import pandas as pd
 
 def fill_missing_dates(df: pd.DataFrame) -> pd.DataFrame:
     """
     Pour chaque produit, ajoute les dates manquantes avec quantity = 0.
+
+    L'index complet (produit, date) est construit une seule fois et la
+    table est réindexée en une passe. product_id devient catégoriel et
+    quantity prend le plus petit type numérique qui la contient.
     """
     all_dates = pd.date_range(start=df['date'].min(), end=df['date'].max(), freq='D')
-    filled = []
-    for pid, group in df.groupby('product_id'):
-        group = group.set_index('date').reindex(all_dates, fill_value=0)
-        group['product_id'] = pid
-        group = group.reset_index().rename(columns={'index': 'date'})
-        filled.append(group)
-    return pd.concat(filled, ignore_index=True)
\ No newline at end of file
+    products = pd.Categorical(df['product_id'])
+    index = pd.MultiIndex.from_product(
+        [products.categories, all_dates], names=['product_id', 'date']
+    )
+    filled = (
+        df.assign(product_id=products)
+        .set_index(['product_id', 'date'])
+        .reindex(index, fill_value=0)
+        .reset_index()
+    )
+    filled['product_id'] = pd.Categorical(filled['product_id'], categories=products.categories)
+    filled['quantity'] = _compact(filled['quantity'])
+    return filled[['date', 'product_id'] + [c for c in filled.columns if c not in ('date', 'product_id')]]
+
+
+def _compact(values: pd.Series) -> pd.Series:
+    """Entiers réduits au plus petit type, flottants en float32."""
+    if np.issubdtype(values.dtype, np.integer) or (values % 1 == 0).all():
+        return pd.to_numeric(values, downcast='integer')
+    return values.astype(np.float32)
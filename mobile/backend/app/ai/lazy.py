@@ -0,0 +1,94 @@
+"""
+Deferred imports for the AI package.
+
+Forecasting pulls in pandas, NumPy and scikit-learn (over a second and
+~100 MB per process).  Routes import lightweight proxies instead; the real
+object is imported on first attribute access or call, or ahead of time by
+``warm_up()``.  Every resolution is timed so ``import_report()`` shows what
+a worker actually loaded and what it cost.
+"""
+
+import importlib
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.utils.logger import logger
+
+_proxies: List["LazyObject"] = []
+
+
+class LazyObject:
+    """Stand-in for ``module.attribute``, imported on first use."""
+
+    def __init__(self, module: str, attribute: str):
+        self._module = module
+        self._attribute = attribute
+        self._target: Any = None
+        self._loaded = False
+        self._seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        _proxies.append(self)
+
+    @property
+    def name(self) -> str:
+        return f"{self._module}.{self._attribute}"
+
+    def resolve(self) -> Any:
+        """Import the target (once) and return it."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._module)
+                    self._target = getattr(module, self._attribute)
+                    self._seconds = time.perf_counter() - start
+                    self._loaded = True
+                    logger.info(f"Loaded {self.name} in {self._seconds:.2f}s")
+        return self._target
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.resolve(), item)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._loaded else "not loaded"
+        return f"<LazyObject {self.name} ({state})>"
+
+
+def lazy(module: str, attribute: str) -> LazyObject:
+    """Proxy for *attribute* of *module*."""
+    return LazyObject(module, attribute)
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Resolve every proxy now (e.g. at startup of a worker that serves AI
+    routes) instead of on the first request.  Failures are logged, not raised.
+    """
+    for proxy in _proxies:
+        try:
+            proxy.resolve()
+        except Exception as e:
+            logger.warning(f"Warm-up could not load {proxy.name}: {e}")
+    report = import_report()
+    logger.info(f"AI warm-up done: {report['loaded']}/{len(report['proxies'])} modules")
+    return report
+
+
+def import_report() -> Dict[str, Any]:
+    """Which proxies are loaded, their import time, and whether heavy libraries are in memory."""
+    return {
+        "loaded": sum(p._loaded for p in _proxies),
+        "proxies": {
+            p.name: None if p._seconds is None else round(p._seconds, 3)
+            for p in _proxies
+        },
+        "heavy_modules": {
+            name: name in sys.modules for name in ("numpy", "pandas", "sklearn")
+        },
+    }
+
@@ -7,13 +7,23 @@ Includes:
 - Rack assignment (batch_assign_products)
 - Expedition routing (optimize_expedition_route)
 
-Shared A* pathfinding engine used everywhere.
+Shared A* pathfinding engine used everywhere.  Multi-stop tours are ordered
+by the route sequencer (distance matrix + 2-opt / Or-opt).
 """
 
 import math
 import heapq
 from collections import defaultdict
 
+from app.ai.route_sequencer import (
+    DEFAULT_TIME_BUDGET,
+    build_distance_matrix,
+    improve_tour,
+    nearest_source_costs,
+    single_source_costs,
+    tour_cost,
+)
+
 
 # ============================================================
 # SHARED PATHFINDING (A*)
@@ -157,7 +167,39 @@ def get_floor_elevator(floor, elevators):
     return None
 
 
-def plan_product_route(product_id, quantity, start, elevators, grid):
+def leg_path(from_cell, to_cell, elevators, grid):
+    """A* path between two cells, riding the best elevator if floors differ."""
+    if from_cell["floor"] == to_cell["floor"]:
+        return astar(from_cell, to_cell, grid)
+
+    best, best_cost = [], float("inf")
+    for e in elevators:
+        if e["floor"] != from_cell["floor"]:
+            continue
+        target = grid.get((e["x"], e["y"], to_cell["floor"]))
+        if not target or not target.get("is_elevator"):
+            continue
+        down = astar(from_cell, e, grid)
+        up = astar(target, to_cell, grid) if down else []
+        if not up:
+            continue
+        path = down + up
+        cost = path_cost(path)
+        if cost < best_cost:
+            best, best_cost = path, cost
+    return best
+
+
+def _sequencing_stats(greedy_cost, cost):
+    return {
+        "greedy_cost": greedy_cost,
+        "cost": cost,
+        "improvement": greedy_cost - cost,
+    }
+
+
+def plan_product_route(product_id, quantity, start, elevators, grid,
+                       time_budget=DEFAULT_TIME_BUDGET):
 
     slots = find_all_product_slots(product_id, grid)
 
@@ -168,60 +210,62 @@ def plan_product_route(product_id, quantity, start, elevators, grid):
     if available < quantity:
         return None, f"Only {available} available"
 
+    # One distance matrix for the whole tour (index 0 is the start)
+    cells = [start] + slots
+    keys = [(c["x"], c["y"], c["floor"]) for c in cells]
+    matrix = build_distance_matrix(keys, grid)
+
+    # Nearest-first slot selection until the quantity is covered
     remaining = quantity
-    visited = set()
-    current = start
-    stops = []
+    current = 0
+    taken = {}
 
     while remaining > 0:
 
-        scored = []
+        candidates = [
+            i for i in range(1, len(cells))
+            if i not in taken and matrix[current][i] < float("inf")
+        ]
 
-        for slot in slots:
-            key = (slot["x"], slot["y"], slot["floor"])
-            if key in visited:
-                continue
+        if not candidates:
+            return None, "Unreachable slots"
 
-            eff_start = (
-                get_floor_elevator(slot["floor"], elevators)
-                if slot["floor"] != current["floor"]
-                else current
-            )
+        nxt = min(candidates, key=lambda i: matrix[current][i])
 
-            if not eff_start:
-                continue
+        take = min(cells[nxt]["quantity"], remaining)
+        remaining -= take
+        taken[nxt] = take
+        current = nxt
 
-            path = astar(eff_start, slot, grid)
-            if path:
-                scored.append((path_cost(path), slot, path))
+    # Re-order the selected slots (greedy order is the starting tour)
+    tour = [0] + list(taken)
+    greedy_cost = tour_cost(tour, matrix)
+    improve_tour(tour, matrix, time_budget=time_budget)
 
-        if not scored:
-            return None, "Unreachable slots"
+    stops = []
 
-        cost, slot, path = min(scored, key=lambda x: x[0])
+    for prev, idx in zip(tour, tour[1:]):
 
-        take = min(slot["quantity"], remaining)
-        remaining -= take
-        visited.add((slot["x"], slot["y"], slot["floor"]))
+        slot = cells[idx]
+        path = leg_path(cells[prev], slot, elevators, grid)
 
         elev_path, elev_cost, elev = best_elevator_path(slot, elevators, grid)
 
         stops.append({
             "slot": slot,
-            "qty_taken": take,
+            "qty_taken": taken[idx],
             "path_to_slot": path,
             "path_to_elevator": elev_path,
-            "cost": cost + elev_cost
+            "cost": matrix[prev][idx] + elev_cost
         })
 
-        current = slot
-
     total_cost = sum(s["cost"] for s in stops)
 
     return {
         "mode": "multi",
         "stops": stops,
-        "total_cost": total_cost
+        "total_cost": total_cost,
+        "sequencing": _sequencing_stats(greedy_cost, tour_cost(tour, matrix))
     }, None
 
 
@@ -370,24 +414,26 @@ def find_product_in_racks(pid, grid):
 
 def find_nearest_expedition(start, grid):
 
-    zones = [
-        c for c in grid.values()
+    zones = {
+        k: c for k, c in grid.items()
         if c.get("is_expedition_zone") and c.get("floor") == 0
-    ]
+    }
 
-    best = (None, None, float("inf"))
+    # One Dijkstra sweep to every zone, then a single A* for the path
+    costs = single_source_costs(
+        (start["x"], start["y"], start["floor"]), grid, zones
+    )
 
-    for z in zones:
-        p = astar(start, z, grid)
-        if p:
-            d = path_cost(p)
-            if d < best[2]:
-                best = (z, p, d)
+    if not costs:
+        return None, None, float("inf")
 
-    return best
+    key = min(costs, key=costs.get)
+    zone = zones[key]
+
+    return zone, astar(start, zone, grid), costs[key]
 
 
-def optimize_expedition_route(order, grid):
+def optimize_expedition_route(order, grid, time_budget=DEFAULT_TIME_BUDGET):
 
     zones = [
         c for c in grid.values()
@@ -397,54 +443,87 @@ def optimize_expedition_route(order, grid):
     if not zones:
         return None, "No expedition zone"
 
-    current = zones[0]
-    plan = []
-    total = 0
+    # One distance matrix over the start zone and every candidate rack
+    cells = [zones[0]]
+    candidates = {}
+    for pid in order:
+        racks = find_product_in_racks(pid, grid)
+        candidates[pid] = list(range(len(cells), len(cells) + len(racks)))
+        cells.extend(racks)
+
+    keys = [(c["x"], c["y"], c["floor"]) for c in cells]
+    matrix = build_distance_matrix(keys, grid)
+
+    # Nearest-first rack selection, product by product
+    current = 0
+    picks = {}
 
     for pid, qty in order.items():
 
-        racks = find_product_in_racks(pid, grid)
+        racks = candidates[pid]
         remaining = qty
-        stops = []
 
         while remaining and racks:
 
-            best = None
-            best_p = None
-            best_d = float("inf")
-
-            for r in racks:
-                p = astar(current, r, grid)
-                if p:
-                    d = path_cost(p)
-                    if d < best_d:
-                        best, best_p, best_d = r, p, d
-
-            if not best:
+            reachable = [r for r in racks if matrix[current][r] < float("inf")]
+            if not reachable:
                 break
 
-            take = min(best.get("quantity", 0), remaining)
-            remaining -= take
+            best = min(reachable, key=lambda r: matrix[current][r])
 
-            stops.append({
-                "rack": best,
-                "qty": take,
-                "path": best_p,
-                "distance": best_d
-            })
+            take = min(cells[best].get("quantity", 0), remaining)
+            remaining -= take
 
-            total += best_d
+            picks[best] = (pid, take)
             current = best
             racks.remove(best)
 
-        plan.append({"product": pid, "stops": stops})
+    # Virtual end node: walking cost back to the closest expedition zone
+    to_zone = nearest_source_costs(
+        [(z["x"], z["y"], z["floor"]) for z in zones], grid, keys
+    )
+    end = len(keys)
+    for i, row in enumerate(matrix):
+        row.append(to_zone.get(keys[i], float("inf")))
+    matrix.append([row[end] for row in matrix] + [0.0])
+
+    # Sequence all picks of the order as a single tour ending at a zone
+    tour = [0] + list(picks) + [end]
+    greedy_cost = tour_cost(tour, matrix)
+    improve_tour(tour, matrix, fixed_end=True, time_budget=time_budget)
+    sequencing = _sequencing_stats(greedy_cost, tour_cost(tour, matrix))
+    tour.pop()
+
+    stops_by_product = {pid: [] for pid in order}
+    total = 0
+
+    for prev, idx in zip(tour, tour[1:]):
+
+        pid, take = picks[idx]
+        d = matrix[prev][idx]
+
+        stops_by_product[pid].append({
+            "rack": cells[idx],
+            "qty": take,
+            "path": astar(cells[prev], cells[idx], grid),
+            "distance": d
+        })
+
+        total += d
+
+    plan = [
+        {"product": pid, "stops": stops}
+        for pid, stops in stops_by_product.items()
+    ]
 
-    zone, path, d = find_nearest_expedition(current, grid)
+    zone, path, d = find_nearest_expedition(cells[tour[-1]], grid)
 
     total += d
 
     return {
         "plan": plan,
+        "sequence": [keys[i] for i in tour[1:]],
         "return_path": path,
-        "total_distance": total
+        "total_distance": total,
+        "sequencing": sequencing
     }, None
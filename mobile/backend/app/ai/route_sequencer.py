@@ -0,0 +1,403 @@
+"""
+Stop sequencing for multi-stop warehouse tours.
+
+Builds a k×k walking-distance matrix between all stops of a tour with one
+Dijkstra sweep per stop (instead of one A* search per pair), then orders the
+stops with a nearest-neighbour construction refined by 2-opt and Or-opt
+moves until a time budget runs out.
+
+Grids use the same format as the rest of the AI package:
+``{(x, y, floor): cell_dict}``.
+"""
+
+import heapq
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Key = Tuple[int, int, int]
+
+# 8-directional movement (same costs as the A* pathfinders)
+DIRECTIONS = [
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)),
+    (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2)),
+]
+
+# Cost of riding an elevator between two floors (matches WarehousePathfinder)
+ELEVATOR_COST = 1.0
+
+# Default wall-clock budget (seconds) for the local-search improvement phase
+DEFAULT_TIME_BUDGET = 0.1
+
+_EPS = 1e-9
+
+
+def _is_walkable(cell: dict) -> bool:
+    if cell.get("is_obstacle"):
+        return False
+    return bool(
+        cell.get("is_road")
+        or cell.get("is_slot")
+        or cell.get("is_elevator")
+        or cell.get("is_expedition_zone")
+    )
+
+
+# ── Distances ────────────────────────────────────────────────────
+
+
+def _elevators_by_floor(grid: Dict[Key, dict]) -> Dict[int, List[Key]]:
+    elevators: Dict[int, List[Key]] = {}
+    for key, cell in grid.items():
+        if cell.get("is_elevator") and not cell.get("is_obstacle"):
+            elevators.setdefault(key[2], []).append(key)
+    return elevators
+
+
+def _dijkstra(
+    seeds: Dict[Key, float],
+    grid: Dict[Key, dict],
+    targets: Optional[Iterable[Key]],
+    parents: Optional[Dict[Key, Optional[Key]]] = None,
+) -> Dict[Key, float]:
+    """
+    Dijkstra sweep on the seeds' floor, optionally stopping at targets.
+
+    *seeds* maps start cells to their initial cost (0 for plain sources).
+    If *parents* is given it receives the predecessor of every cell reached
+    (see :func:`trace_path`); seeds already in it keep their entry.
+    """
+    floor = next(iter(seeds))[2]
+    pending = None
+    if targets is not None:
+        targets = list(targets)
+        pending = {t for t in targets if t[2] == floor}
+        if not pending:
+            return {}
+
+    dist: Dict[Key, float] = dict(seeds)
+    settled: Dict[Key, float] = {}
+    heap: List[Tuple[float, Key]] = [(d, s) for s, d in seeds.items()]
+    heapq.heapify(heap)
+
+    while heap:
+        d, current = heapq.heappop(heap)
+        if current in settled:
+            continue
+        settled[current] = d
+        if pending is not None:
+            pending.discard(current)
+            if not pending:
+                break
+
+        x, y, _ = current
+        for dx, dy, step in DIRECTIONS:
+            key = (x + dx, y + dy, floor)
+            if key in settled:
+                continue
+            cell = grid.get(key)
+            if cell is None or not _is_walkable(cell):
+                continue
+            nd = d + step
+            if nd < dist.get(key, math.inf):
+                dist[key] = nd
+                if parents is not None:
+                    parents[key] = current
+                heapq.heappush(heap, (nd, key))
+
+    if targets is None:
+        return settled
+    return {t: settled[t] for t in targets if t in settled}
+
+
+def single_source_costs(
+    source: Key,
+    grid: Dict[Key, dict],
+    targets: Optional[Iterable[Key]] = None,
+) -> Dict[Key, float]:
+    """
+    Walking cost from *source* to every reachable cell on the same floor.
+
+    Runs a single Dijkstra sweep.  If *targets* is given, the sweep stops as
+    soon as all of them have been settled and only their costs are returned
+    (unreachable targets are omitted).
+    """
+    return _dijkstra({source: 0.0}, grid, targets)
+
+
+def nearest_source_costs(
+    sources: Iterable[Key],
+    grid: Dict[Key, dict],
+    targets: Optional[Iterable[Key]] = None,
+) -> Dict[Key, float]:
+    """
+    Walking cost from the nearest of *sources* (all on one floor) to each
+    cell, in one multi-source Dijkstra sweep.  Useful for "distance to the
+    closest expedition zone" lookups.
+    """
+    sources = list(sources)
+    if not sources:
+        return {}
+    return _dijkstra({s: 0.0 for s in sources}, grid, targets)
+
+
+def one_to_many_costs(
+    source: Key,
+    targets: Iterable[Key],
+    grid: Dict[Key, dict],
+    parents: Optional[Dict[Key, Optional[Key]]] = None,
+) -> Dict[Key, float]:
+    """
+    Walking cost from *source* to each of *targets*, on any floor.
+
+    One sweep covers the source floor (its targets and elevators); each other
+    floor holding targets gets one sweep seeded from its elevators with the
+    cost of reaching them.  Unreachable targets are omitted.  Pass a
+    *parents* dict to recover the routes with :func:`trace_path`.
+    """
+    targets = list(targets)
+    elevators = _elevators_by_floor(grid)
+    floor = source[2]
+
+    if parents is not None:
+        parents[source] = None
+    first = _dijkstra(
+        {source: 0.0}, grid,
+        [t for t in targets if t[2] == floor] + elevators.get(floor, []),
+        parents,
+    )
+    costs = {t: first[t] for t in targets if t in first}
+
+    for other in sorted({t[2] for t in targets} - {floor}):
+        landing = set(elevators.get(other, []))
+        seeds: Dict[Key, float] = {}
+        for ex, ey, _ in elevators.get(floor, []):
+            reached = first.get((ex, ey, floor))
+            if reached is not None and (ex, ey, other) in landing:
+                seeds[(ex, ey, other)] = reached + ELEVATOR_COST
+                if parents is not None:
+                    parents[(ex, ey, other)] = (ex, ey, floor)
+        if seeds:
+            costs.update(_dijkstra(
+                seeds, grid, [t for t in targets if t[2] == other], parents
+            ))
+    return costs
+
+
+def trace_path(
+    parents: Dict[Key, Optional[Key]], target: Key
+) -> Optional[List[Key]]:
+    """Rebuild the route to *target* from a *parents* map (None if unreached)."""
+    if target not in parents:
+        return None
+    path = [target]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path
+
+
+def build_distance_matrix(
+    points: List[Key], grid: Dict[Key, dict]
+) -> List[List[float]]:
+    """
+    Walking-distance matrix between *points* (``math.inf`` if unreachable).
+
+    One Dijkstra sweep is run per point, stopping once every point and every
+    elevator on its floor is settled.  Cross-floor distances go through the
+    elevator column (same x, y on both floors) that minimises
+    ``a → elevator → elevator → b``.
+    """
+    elevators_by_floor = _elevators_by_floor(grid)
+    columns = sorted({(x, y) for keys in elevators_by_floor.values()
+                      for x, y, _ in keys})
+
+    sweeps: List[Dict[Key, float]] = []
+    via: List[List[float]] = []  # cost from each point to every elevator column
+    for p in points:
+        targets = [q for q in points if q[2] == p[2]]
+        targets += elevators_by_floor.get(p[2], [])
+        sweep = single_source_costs(p, grid, targets)
+        sweeps.append(sweep)
+        via.append([sweep.get((x, y, p[2]), math.inf) for x, y in columns])
+
+    k = len(points)
+    matrix = [[math.inf] * k for _ in range(k)]
+    for i, p in enumerate(points):
+        matrix[i][i] = 0.0
+        for j in range(i + 1, k):
+            q = points[j]
+            if p[2] == q[2]:
+                d = sweeps[i].get(q, math.inf)
+            elif columns:
+                d = min(a + b for a, b in zip(via[i], via[j])) + ELEVATOR_COST
+            else:
+                d = math.inf
+            matrix[i][j] = matrix[j][i] = d
+    return matrix
+
+
+# ── Tour construction & improvement ──────────────────────────────
+
+
+def tour_cost(tour: List[int], matrix: List[List[float]]) -> float:
+    """Total cost of walking *tour* (a list of matrix indices) in order."""
+    return sum(matrix[a][b] for a, b in zip(tour, tour[1:]))
+
+
+def nearest_neighbour_tour(
+    matrix: List[List[float]], start: int, nodes: Iterable[int]
+) -> Tuple[List[int], List[int]]:
+    """
+    Greedy nearest-neighbour tour from *start* over *nodes*.
+
+    Returns:
+        (tour, unreachable) – the tour starts with *start*; nodes that
+        cannot be reached from the tour are returned separately.
+    """
+    remaining = set(nodes)
+    remaining.discard(start)
+    tour = [start]
+    current = start
+    while remaining:
+        nxt = min(remaining, key=lambda n: (matrix[current][n], n))
+        if matrix[current][nxt] == math.inf:
+            break
+        tour.append(nxt)
+        remaining.remove(nxt)
+        current = nxt
+    return tour, sorted(remaining)
+
+
+def _two_opt_pass(
+    tour: List[int], matrix: List[List[float]], last: int, deadline: float
+) -> bool:
+    """Apply the first improving 2-opt move on positions ``1..last-1``."""
+    n = len(tour)
+    for i in range(1, last - 1):
+        if time.perf_counter() > deadline:
+            return False
+        a, b = tour[i - 1], tour[i]
+        for j in range(i + 1, last):
+            c = tour[j]
+            if j + 1 < n:
+                d = tour[j + 1]
+                delta = matrix[a][c] + matrix[b][d] - matrix[a][b] - matrix[c][d]
+            else:
+                delta = matrix[a][c] - matrix[a][b]
+            if delta < -_EPS:
+                tour[i:j + 1] = reversed(tour[i:j + 1])
+                return True
+    return False
+
+
+def _or_opt_pass(
+    tour: List[int], matrix: List[List[float]], last: int, deadline: float
+) -> bool:
+    """Relocate the first segment of 1–3 stops whose move shortens the tour."""
+    n = len(tour)
+    fixed_end = last < n
+    for length in (1, 2, 3):
+        for i in range(1, last - length + 1):
+            if time.perf_counter() > deadline:
+                return False
+            first, end = tour[i], tour[i + length - 1]
+            prev = tour[i - 1]
+            nxt = tour[i + length] if i + length < n else None
+            removal = matrix[prev][first]
+            if nxt is not None:
+                removal += matrix[end][nxt] - matrix[prev][nxt]
+
+            rest = tour[:i] + tour[i + length:]
+            for j in range(len(rest)):
+                if j == i - 1 or (fixed_end and j == len(rest) - 1):
+                    continue
+                u = rest[j]
+                v = rest[j + 1] if j + 1 < len(rest) else None
+                insertion = matrix[u][first]
+                if v is not None:
+                    insertion += matrix[end][v] - matrix[u][v]
+                if insertion - removal < -_EPS:
+                    tour[:] = rest[:j + 1] + tour[i:i + length] + rest[j + 1:]
+                    return True
+    return False
+
+
+def improve_tour(
+    tour: List[int],
+    matrix: List[List[float]],
+    fixed_end: bool = False,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> List[int]:
+    """
+    Improve *tour* in place with 2-opt and Or-opt until no move helps or the
+    time budget is spent.  ``tour[0]`` (and ``tour[-1]`` if *fixed_end*) never
+    move.
+    """
+    deadline = time.perf_counter() + time_budget
+    last = len(tour) - 1 if fixed_end else len(tour)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = (
+            _two_opt_pass(tour, matrix, last, deadline)
+            or _or_opt_pass(tour, matrix, last, deadline)
+        )
+    return tour
+
+
+def sequence_stops(
+    start: Key,
+    stops: List[Key],
+    grid: Dict[Key, dict],
+    end: Optional[Key] = None,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> Dict:
+    """
+    Order *stops* into a short walking tour.
+
+    Args:
+        start: (x, y, floor) where the tour begins.
+        stops: (x, y, floor) positions to visit (order is irrelevant).
+        grid: warehouse grid ``{(x, y, floor): cell}``.
+        end: optional fixed final position (e.g. an expedition zone, or
+             *start* for a closed tour).
+        time_budget: seconds allowed for 2-opt / Or-opt improvement.
+
+    Returns:
+        Dict with 'order' (indices into *stops* in visit order), 'stops'
+        (positions in visit order), 'unreachable' (positions that could not
+        be reached), 'matrix' (walking distances, index 0 is *start*, then
+        *stops*, then *end* if it is a distinct point), 'cost',
+        'greedy_cost' and 'improvement' (greedy_cost - cost).
+    """
+    points = [start] + list(stops)
+    end_index = None
+    if end is not None:
+        end_index = 0 if end == start else len(points)
+        if end_index:
+            points.append(end)
+
+    matrix = build_distance_matrix(points, grid)
+    tour, unreachable = nearest_neighbour_tour(
+        matrix, 0, range(1, len(stops) + 1)
+    )
+    if end_index is not None:
+        tour.append(end_index)
+
+    greedy_cost = tour_cost(tour, matrix)
+    improve_tour(
+        tour, matrix, fixed_end=end_index is not None, time_budget=time_budget
+    )
+    cost = tour_cost(tour, matrix)
+
+    visit = tour[1:-1] if end_index is not None else tour[1:]
+    return {
+        "order": [i - 1 for i in visit],
+        "stops": [points[i] for i in visit],
+        "unreachable": [points[i] for i in unreachable],
+        "matrix": matrix,
+        "cost": cost,
+        "greedy_cost": greedy_cost,
+        "improvement": greedy_cost - cost,
+    }
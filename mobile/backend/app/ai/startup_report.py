@@ -0,0 +1,43 @@
+"""
+Start-up cost of the API, measured in fresh interpreters:
+
+    python -m app.ai.startup_report
+
+"cold" imports the application only (what a CRUD-only worker pays);
+"warm" also runs the AI warm-up (deferred modules and the AI agent).
+"""
+
+import json
+import subprocess
+import sys
+
+
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import main
+report = {"import_s": time.perf_counter() - start}
+if sys.argv[1] == "warm":
+    start = time.perf_counter()
+    main._warm_up_ai()
+    report["warm_up_s"] = time.perf_counter() - start
+report["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+report["heavy_modules"] = [m for m in ("numpy", "pandas", "sklearn") if m in sys.modules]
+print(json.dumps(report))
+"""
+
+
+def main() -> None:
+    """Print import time, warm-up time and peak RSS for both modes as JSON."""
+    report = {}
+    for mode in ("cold", "warm"):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE, mode],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        report[mode] = json.loads(out.strip().splitlines()[-1])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
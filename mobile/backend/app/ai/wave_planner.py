@@ -0,0 +1,235 @@
+"""
+Wave picking planner.
+
+Takes the pick lines of many preparation orders and groups them into
+chariot tours under a capacity limit (a capacitated vehicle-routing
+problem).  Tours are built with the Clarke–Wright savings heuristic on a
+walking-distance matrix and each tour is then re-sequenced with
+2-opt / Or-opt.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from app.ai.route_sequencer import (
+    DEFAULT_TIME_BUDGET,
+    Key,
+    build_distance_matrix,
+    improve_tour,
+    single_source_costs,
+    tour_cost,
+)
+
+
+# ── Stock allocation ─────────────────────────────────────────────
+
+
+def allocate_pick_lines(
+    orders: List[Dict],
+    locations_by_product: Dict[str, List[Dict]],
+    depot: Key,
+    grid: Dict[Key, dict],
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Split each order's quantity over the stock locations of its product.
+
+    Locations closest to the depot (by walking cost) are used first and
+    stock is shared across orders of the same product.
+
+    Args:
+        orders: order dicts with 'id', 'product_id' and 'quantity'.
+        locations_by_product: product_id → emplacement dicts
+            ('id', 'x', 'y', 'floor', 'quantity').
+        depot: (x, y, floor) where every tour starts and ends.
+        grid: warehouse grid ``{(x, y, floor): cell}``.
+
+    Returns:
+        (lines, shortfalls) – pick lines with 'order_id', 'product_id',
+        'quantity', 'location' and 'emplacement_id'; shortfalls list the
+        orders (and missing quantity) that could not be fully covered.
+    """
+    stock: Dict[str, int] = {}
+    keys: Dict[str, Key] = {}
+    for locations in locations_by_product.values():
+        for loc in locations:
+            stock[loc["id"]] = loc.get("quantity", 0)
+            keys[loc["id"]] = (loc.get("x", 0), loc.get("y", 0), loc.get("floor", 0))
+
+    # Locations on other floors are ranked after every same-floor location
+    costs = single_source_costs(depot, grid, set(keys.values()))
+
+    lines: List[Dict] = []
+    shortfalls: List[Dict] = []
+    for order in orders:
+        product_id = order.get("product_id")
+        remaining = order.get("quantity", 0)
+        candidates = sorted(
+            locations_by_product.get(product_id, []),
+            key=lambda loc: (
+                costs.get(keys[loc["id"]], math.inf),
+                -stock[loc["id"]],
+            ),
+        )
+        for loc in candidates:
+            if remaining <= 0:
+                break
+            take = min(remaining, stock[loc["id"]])
+            if take <= 0:
+                continue
+            stock[loc["id"]] -= take
+            remaining -= take
+            lines.append({
+                "order_id": order["id"],
+                "product_id": product_id,
+                "quantity": take,
+                "location": keys[loc["id"]],
+                "emplacement_id": loc["id"],
+            })
+        if remaining > 0:
+            shortfalls.append({
+                "order_id": order["id"],
+                "product_id": product_id,
+                "missing": remaining,
+            })
+    return lines, shortfalls
+
+
+# ── Tour building ────────────────────────────────────────────────
+
+
+def _build_stops(lines: List[Dict], capacity: int) -> List[Dict]:
+    """Group lines by location, splitting stops heavier than *capacity*."""
+    by_location: Dict[Key, List[Dict]] = {}
+    for line in lines:
+        by_location.setdefault(line["location"], []).append(line)
+
+    stops: List[Dict] = []
+    for location, group in by_location.items():
+        current: List[Dict] = []
+        load = 0
+        for line in group:
+            qty = line["quantity"]
+            while qty > 0:
+                take = min(qty, capacity - load)
+                current.append({**line, "quantity": take})
+                load += take
+                qty -= take
+                if load == capacity:
+                    stops.append({"location": location, "lines": current, "load": load})
+                    current, load = [], 0
+        if current:
+            stops.append({"location": location, "lines": current, "load": load})
+    return stops
+
+
+def _savings_routes(
+    dist: List[List[float]], loads: List[int], capacity: int
+) -> List[List[int]]:
+    """
+    Clarke–Wright savings on nodes ``1..n`` with depot 0.
+
+    Returns routes as lists of node indices (depot excluded).
+    """
+    n = len(loads) - 1
+    routes: Dict[int, List[int]] = {i: [i] for i in range(1, n + 1)}
+    route_of = {i: i for i in range(1, n + 1)}
+    route_load = {i: loads[i] for i in range(1, n + 1)}
+
+    savings = []
+    for i in range(1, n + 1):
+        for j in range(i + 1, n + 1):
+            s = dist[0][i] + dist[0][j] - dist[i][j]
+            if s > 0 and s < math.inf:
+                savings.append((s, i, j))
+    savings.sort(key=lambda t: (-t[0], t[1], t[2]))
+
+    for _, i, j in savings:
+        ri, rj = route_of[i], route_of[j]
+        if ri == rj or route_load[ri] + route_load[rj] > capacity:
+            continue
+        a, b = routes[ri], routes[rj]
+        # i and j must be route endpoints so the merge keeps both routes intact
+        if a[-1] != i:
+            if a[0] != i:
+                continue
+            a.reverse()
+        if b[0] != j:
+            if b[-1] != j:
+                continue
+            b.reverse()
+        a.extend(b)
+        route_load[ri] += route_load.pop(rj)
+        del routes[rj]
+        for node in b:
+            route_of[node] = ri
+
+    return list(routes.values())
+
+
+def plan_wave(
+    lines: List[Dict],
+    depot: Key,
+    grid: Dict[Key, dict],
+    capacity: int,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> Dict:
+    """
+    Cluster pick lines into capacity-feasible chariot tours.
+
+    Args:
+        lines: pick lines from :func:`allocate_pick_lines`.
+        depot: (x, y, floor) where tours start and end (expedition zone).
+        grid: warehouse grid ``{(x, y, floor): cell}``.
+        capacity: maximum units a chariot carries per tour.
+        time_budget: seconds of 2-opt / Or-opt per tour.
+
+    Returns:
+        Dict with 'tours' (each with 'stops', 'load' and 'distance'),
+        'unassigned' (lines whose location cannot be reached), 'trips',
+        'distance', and the one-trip-per-line baseline ('baseline_trips',
+        'baseline_distance') for comparison.
+    """
+    if capacity <= 0:
+        raise ValueError("capacity must be positive")
+
+    stops = _build_stops(lines, capacity)
+    locations = [depot] + sorted({s["location"] for s in stops})
+    loc_index = {loc: i for i, loc in enumerate(locations)}
+    loc_matrix = build_distance_matrix(locations, grid)
+
+    unassigned: List[Dict] = []
+    reachable: List[Dict] = []
+    for stop in stops:
+        if loc_matrix[0][loc_index[stop["location"]]] == math.inf:
+            unassigned.extend(stop["lines"])
+        else:
+            reachable.append(stop)
+
+    # Node 0 is the depot, node i (1-based) is reachable[i - 1]
+    node_loc = [0] + [loc_index[s["location"]] for s in reachable]
+    dist = [[loc_matrix[a][b] for b in node_loc] for a in node_loc]
+    loads = [0] + [s["load"] for s in reachable]
+
+    tours = []
+    for route in _savings_routes(dist, loads, capacity):
+        tour = [0] + route + [0]
+        improve_tour(tour, dist, fixed_end=True, time_budget=time_budget)
+        tours.append({
+            "stops": [reachable[i - 1] for i in tour[1:-1]],
+            "load": sum(loads[i] for i in route),
+            "distance": tour_cost(tour, dist),
+        })
+    tours.sort(key=lambda t: t["stops"][0]["location"])
+
+    baseline = [
+        2 * loc_matrix[0][loc_index[line["location"]]]
+        for stop in reachable for line in stop["lines"]
+    ]
+    return {
+        "tours": tours,
+        "unassigned": unassigned,
+        "trips": len(tours),
+        "distance": sum(t["distance"] for t in tours),
+        "baseline_trips": len(baseline),
+        "baseline_distance": sum(baseline),
+    }
@@ -2,9 +2,12 @@
 Firebase initialization and Firestore client access.
 """
 
+import asyncio
 import os
+import weakref
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.cloud.firestore import AsyncClient
 from google.cloud.firestore_v1.client import Client as FirestoreClient
 
 from app.config.settings import settings
@@ -12,6 +15,9 @@ from app.utils.logger import logger
 
 _db: FirestoreClient | None = None
 _firebase_enabled = False
+# gRPC asyncio channels belong to the event loop that created them
+_local_db = None  # LocalClient when DATABASE_BACKEND is sqlite/memory
+_async_dbs: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
 
 
 def initialize_firebase() -> None:
@@ -67,6 +73,34 @@ def get_db() -> FirestoreClient:
     return _db
 
 
+def get_async_db() -> AsyncClient:
+    """
+    Return the async Firestore client of the running event loop, or the
+    local SQLite stand-in when DATABASE_BACKEND is "sqlite" or "memory".
+    """
+    global _local_db
+    if settings.DATABASE_BACKEND in ("sqlite", "memory"):
+        if _local_db is None:
+            from app.config.local_db import LocalClient
+
+            path = settings.SQLITE_PATH if settings.DATABASE_BACKEND == "sqlite" else ":memory:"
+            _local_db = LocalClient(path)
+            logger.info(f"Using local {settings.DATABASE_BACKEND} database ({path})")
+        return _local_db  # type: ignore[return-value]
+    if not _firebase_enabled:
+        get_db()  # raises the "not configured" error
+    loop = asyncio.get_running_loop()
+    client = _async_dbs.get(loop)
+    if client is None:
+        app = firebase_admin.get_app()
+        client = AsyncClient(
+            project=app.project_id,
+            credentials=app.credential.get_credential(),
+        )
+        _async_dbs[loop] = client
+    return client
+
+
 def is_firebase_enabled() -> bool:
     """Check if Firebase is properly configured and enabled."""
     return _firebase_enabled
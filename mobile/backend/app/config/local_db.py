@@ -0,0 +1,404 @@
+"""
+Local stand-in for the async Firestore client, backed by SQLite.
+
+Implements the subset of ``google.cloud.firestore.AsyncClient`` used by
+``BaseRepository`` (documents, where/order_by/limit/start_after/select
+queries, streaming, count/sum/avg aggregations, write batches, updates
+preconditioned on ``last_update_time``) so
+repositories run without Firebase credentials, e.g. for offline runs and
+load tests.  Selected by DATABASE_BACKEND:
+
+  - ``sqlite``: file at SQLITE_PATH, kept between runs;
+  - ``memory``: in-memory SQLite database, empty at each start.
+
+Each collection is a table of JSON documents.  Commonly filtered fields get
+expression indexes (``INDEXED_FIELDS``).  Calls run synchronously on the
+event loop: local SQLite statements take microseconds, well below the cost
+of a thread hop.
+"""
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import string
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+
+# Fields filtered by the repositories, indexed in each collection
+INDEXED_FIELDS: Dict[str, List[str]] = {
+    "products": ["sku", "categorie", "actif"],
+    "users": ["email", "role"],
+    "chariots": ["is_active"],
+    "emplacements": ["floor", "is_slot", "is_occupied", "is_expedition", "product_id", "x", "y"],
+    "operations": ["status", "type", "employee_id", "order_id", "validated_at"],
+    "operation_logs": ["operation_id", "employee_id"],
+    "orders": ["status", "type", "generated_by_ai"],
+    "order_logs": ["order_id", "action"],
+    "stock_ledger": ["product_id", "operation_id", "recorded_at"],
+    "reports": ["operation_id", "physical_damage", "supervisor_id"],
+}
+
+_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+_COMPARISONS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+_ID_CHARS = string.ascii_letters + string.digits
+
+
+def _path(field: str) -> str:
+    """JSON path literal of a field (literal so expression indexes apply)."""
+    if not _FIELD.match(field):
+        raise ValueError(f"Invalid field name: {field!r}")
+    return f"json_extract(data, '$.{field}')"
+
+
+def _param(value: Any) -> Any:
+    return int(value) if isinstance(value, bool) else value
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=str)
+
+
+class LocalSnapshot:
+    def __init__(self, doc_id: str, data: Optional[Dict[str, Any]], update_time: Optional[str] = None):
+        self.id = doc_id
+        self._data = data
+        # Opaque version for write preconditions: the stored JSON text
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return None if self._data is None else dict(self._data)
+
+
+class LocalDocument:
+    def __init__(self, collection: "LocalCollection", doc_id: str):
+        self._collection = collection
+        self.id = doc_id
+
+    async def get(self) -> LocalSnapshot:
+        raw = self._collection._read_raw(self.id)
+        return LocalSnapshot(self.id, None if raw is None else json.loads(raw), raw)
+
+    async def set(self, data: Dict[str, Any]) -> None:
+        self._collection._write(self.id, data)
+
+    async def update(self, data: Dict[str, Any], option: Optional["LocalWriteOption"] = None) -> None:
+        self._collection._update(self.id, data, option.last_update_time if option else None)
+
+    async def delete(self) -> None:
+        self._collection._delete(self.id)
+
+
+class LocalQuery:
+    """Immutable query: each builder call returns a new query."""
+
+    def __init__(
+        self, collection: "LocalCollection", where=(), order=(), limit=None, after=None, fields=None,
+    ):
+        self._collection = collection
+        self._where: Tuple[Tuple[str, List[Any]], ...] = tuple(where)
+        self._order: Tuple[Tuple[str, str], ...] = tuple(order)
+        self._limit: Optional[int] = limit
+        self._after: Optional[LocalSnapshot] = after
+        self._fields: Optional[Tuple[str, ...]] = fields
+
+    def _copy(self, **changes) -> "LocalQuery":
+        state = {
+            "where": self._where, "order": self._order, "limit": self._limit,
+            "after": self._after, "fields": self._fields,
+        }
+        state.update(changes)
+        return LocalQuery(self._collection, **state)
+
+    def where(self, field: str, op: str, value: Any) -> "LocalQuery":
+        path = _path(field)
+        if op in _COMPARISONS:
+            if value is None and op in ("==", "!="):
+                clause = (f"{path} IS {'NOT ' if op == '!=' else ''}NULL", [])
+            else:
+                clause = (f"{path} {_COMPARISONS[op]} ?", [_param(value)])
+        elif op in ("in", "not-in"):
+            values = [_param(v) for v in value]
+            marks = ", ".join("?" * len(values)) or "NULL"
+            clause = (f"{path} {'NOT ' if op == 'not-in' else ''}IN ({marks})", values)
+        elif op == "array-contains":
+            clause = (
+                f"EXISTS (SELECT 1 FROM json_each(data, '$.{field}') WHERE value = ?)",
+                [_param(value)],
+            )
+        else:
+            raise ValueError(f"Unsupported operator: {op!r}")
+        return self._copy(where=self._where + (clause,))
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "LocalQuery":
+        # Like Firestore, ordering on a field excludes documents without it
+        path = _path(field)
+        return self._copy(
+            where=self._where + ((f"{path} IS NOT NULL", []),),
+            order=self._order + ((field, "DESC" if direction == "DESCENDING" else "ASC"),),
+        )
+
+    def limit(self, count: int) -> "LocalQuery":
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot: "LocalSnapshot") -> "LocalQuery":
+        return self._copy(after=snapshot)
+
+    def select(self, field_paths: Iterable[str]) -> "LocalQuery":
+        fields = tuple(field_paths)
+        for field in fields:
+            _path(field)  # validates the name
+        return self._copy(fields=fields)
+
+    def _cursor_clause(self) -> Tuple[str, List[Any]]:
+        """Rows strictly after the cursor in (order fields..., id) order."""
+        keys = [(_path(field), direction) for field, direction in self._order] + [("id", "ASC")]
+        values = []
+        for field, _ in self._order:
+            value: Any = self._after._data or {}
+            for part in field.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            values.append(_param(value))
+        values.append(self._after.id)
+
+        alternatives, params = [], []
+        for i, (key, direction) in enumerate(keys):
+            terms = [f"{k} = ?" for k, _ in keys[:i]] + [f"{key} {'<' if direction == 'DESC' else '>'} ?"]
+            alternatives.append("(" + " AND ".join(terms) + ")")
+            params.extend(values[:i + 1])
+        return "(" + " OR ".join(alternatives) + ")", params
+
+    def _sql(self, project: bool = True) -> Tuple[str, List[Any]]:
+        columns = "id, data"
+        if project and self._fields is not None:
+            # (JSON type, value) per field: only the selected values are decoded
+            columns = ", ".join(
+                ["id"] + [f"json_type(data, '$.{f}'), {_path(f)}" for f in self._fields]
+            )
+        sql = f'SELECT {columns} FROM "{self._collection.name}"'
+        params: List[Any] = []
+        where = list(self._where)
+        if self._after is not None:
+            where.append(self._cursor_clause())
+        if where:
+            sql += " WHERE " + " AND ".join(clause for clause, _ in where)
+            for _, values in where:
+                params.extend(values)
+        order = [f"{_path(field)} {direction}" for field, direction in self._order] + ["id"]
+        sql += " ORDER BY " + ", ".join(order)
+        if self._limit is not None:
+            sql += " LIMIT ?"
+            params.append(self._limit)
+        return sql, params
+
+    def count(self, alias: Optional[str] = None) -> "LocalAggregation":
+        return LocalAggregation(self).count(alias)
+
+    def sum(self, field: str, alias: Optional[str] = None) -> "LocalAggregation":
+        return LocalAggregation(self).sum(field, alias)
+
+    def avg(self, field: str, alias: Optional[str] = None) -> "LocalAggregation":
+        return LocalAggregation(self).avg(field, alias)
+
+    def _projected(self, row: tuple) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for i, field in enumerate(self._fields):
+            kind, value = row[1 + 2 * i], row[2 + 2 * i]
+            if kind is None:
+                continue  # field absent, as with a Firestore projection
+            if kind in ("true", "false"):
+                value = kind == "true"
+            elif kind in ("object", "array"):
+                value = json.loads(value)
+            *parents, leaf = field.split(".")
+            target = data
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = value
+        return data
+
+    async def stream(self):
+        sql, params = self._sql()
+        for row in self._collection._db._fetch(sql, params):
+            data = json.loads(row[1]) if self._fields is None else self._projected(row)
+            yield LocalSnapshot(row[0], data)
+
+
+class LocalAggregationResult:
+    def __init__(self, alias: str, value: Any):
+        self.alias = alias
+        self.value = value
+
+
+class LocalAggregation:
+    """COUNT / SUM / AVG over a query, computed in one SQL statement."""
+
+    def __init__(self, query: LocalQuery):
+        self._query = query
+        self._columns: List[Tuple[str, str]] = []
+
+    def _add(self, expression: str, alias: Optional[str]) -> "LocalAggregation":
+        self._columns.append((alias or f"field_{len(self._columns) + 1}", expression))
+        return self
+
+    def count(self, alias: Optional[str] = None) -> "LocalAggregation":
+        return self._add("COUNT(*)", alias)
+
+    @staticmethod
+    def _numeric(field: str) -> str:
+        # Like Firestore, non-numeric values are ignored
+        return f"CASE WHEN json_type(data, '$.{field}') IN ('integer', 'real') THEN {_path(field)} END"
+
+    def sum(self, field: str, alias: Optional[str] = None) -> "LocalAggregation":
+        return self._add(f"TOTAL({self._numeric(field)})", alias)
+
+    def avg(self, field: str, alias: Optional[str] = None) -> "LocalAggregation":
+        return self._add(f"AVG({self._numeric(field)})", alias)
+
+    async def get(self) -> List[List[LocalAggregationResult]]:
+        sql, params = self._query._sql(project=False)
+        columns = ", ".join(expression for _, expression in self._columns)
+        row = self._query._collection._db._fetch(f"SELECT {columns} FROM ({sql})", params)[0]
+        results = []
+        for (alias, expression), value in zip(self._columns, row):
+            if expression.startswith("TOTAL") and float(value).is_integer():
+                value = int(value)
+            results.append(LocalAggregationResult(alias, value))
+        return [results]
+
+
+class LocalCollection(LocalQuery):
+    def __init__(self, db: "LocalClient", name: str):
+        super().__init__(self)
+        self._db = db
+        self.name = name
+        db._ensure_table(name)
+
+    def document(self, doc_id: Optional[str] = None) -> LocalDocument:
+        return LocalDocument(self, doc_id or "".join(secrets.choice(_ID_CHARS) for _ in range(20)))
+
+    def _read_raw(self, doc_id: str) -> Optional[str]:
+        rows = self._db._fetch(f'SELECT data FROM "{self.name}" WHERE id = ?', [doc_id])
+        return rows[0][0] if rows else None
+
+    def _read(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._read_raw(doc_id)
+        return None if raw is None else json.loads(raw)
+
+    def _write(self, doc_id: str, data: Dict[str, Any]) -> None:
+        self._db._execute(
+            f'INSERT OR REPLACE INTO "{self.name}" (id, data) VALUES (?, ?)',
+            [doc_id, _dumps(data)],
+        )
+
+    def _update(self, doc_id: str, changes: Dict[str, Any], version: Optional[str] = None) -> None:
+        """Apply *changes*; with *version*, only if the stored document is still that version."""
+        with self._db._lock:
+            raw = self._read_raw(doc_id)
+            if raw is None:
+                raise NotFound(f"No document to update: {self.name}/{doc_id}")
+            if version is not None and raw != version:
+                raise FailedPrecondition(f"Document changed since read: {self.name}/{doc_id}")
+            data = json.loads(raw)
+            for key, value in changes.items():
+                *parents, leaf = key.split(".")
+                target = data
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[leaf] = value
+            if version is None:
+                self._write(doc_id, data)
+                return
+            # Compare-and-swap: another process may share the database file
+            cursor = self._db._conn.execute(
+                f'UPDATE "{self.name}" SET data = ? WHERE id = ? AND data = ?',
+                [_dumps(data), doc_id, version],
+            )
+            if cursor.rowcount == 0:
+                raise FailedPrecondition(f"Document changed since read: {self.name}/{doc_id}")
+
+    def _delete(self, doc_id: str) -> None:
+        self._db._execute(f'DELETE FROM "{self.name}" WHERE id = ?', [doc_id])
+
+
+class LocalWriteOption:
+    """Precondition of a conditional update (``LocalClient.write_option``)."""
+
+    def __init__(self, last_update_time: str):
+        self.last_update_time = last_update_time
+
+
+class LocalBatch:
+    def __init__(self, db: "LocalClient"):
+        self._db = db
+        self._ops: List[Tuple[str, LocalDocument, Dict[str, Any]]] = []
+
+    def set(self, ref: LocalDocument, data: Dict[str, Any]) -> None:
+        self._ops.append(("set", ref, dict(data)))
+
+    def update(self, ref: LocalDocument, data: Dict[str, Any]) -> None:
+        self._ops.append(("update", ref, dict(data)))
+
+    async def commit(self) -> None:
+        with self._db._lock:  # one transaction for the whole batch
+            self._db._conn.execute("BEGIN")
+            try:
+                for kind, ref, data in self._ops:
+                    if kind == "set":
+                        ref._collection._write(ref.id, data)
+                    else:
+                        ref._collection._update(ref.id, data)
+                self._db._conn.execute("COMMIT")
+            except Exception:
+                self._db._conn.execute("ROLLBACK")
+                raise
+
+
+class LocalClient:
+    """SQLite database with the async Firestore client interface."""
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.RLock()
+        self._tables: set = set()
+
+    def _ensure_table(self, name: str) -> None:
+        if name in self._tables:
+            return
+        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", name):
+            raise ValueError(f"Invalid collection name: {name!r}")
+        with self._lock:
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" (id TEXT PRIMARY KEY, data TEXT NOT NULL)')
+            for field in INDEXED_FIELDS.get(name, []):
+                self._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{name}_{field}" ON "{name}" ({_path(field)})'
+                )
+        self._tables.add(name)
+
+    def _execute(self, sql: str, params: Iterable[Any]) -> None:
+        with self._lock:
+            self._conn.execute(sql, list(params))
+
+    def _fetch(self, sql: str, params: Iterable[Any]) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, list(params)).fetchall()
+
+    def collection(self, name: str) -> LocalCollection:
+        return LocalCollection(self, name)
+
+    def batch(self) -> LocalBatch:
+        return LocalBatch(self)
+
+    def write_option(self, last_update_time: str) -> LocalWriteOption:
+        return LocalWriteOption(last_update_time)
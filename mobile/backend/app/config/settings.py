@@ -2,7 +2,7 @@
 Application settings loaded from environment variables.
 """
 
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -19,18 +19,45 @@ class Settings(BaseSettings):
     # Firebase
     FIREBASE_CREDENTIALS_PATH: str = "./app/serviceAccountKey.json"
     FIREBASE_PROJECT_ID: str = "mobai-wms"
+    FIRESTORE_MAX_CONCURRENCY: int = 64  # in-flight Firestore calls per event loop
+    DATABASE_BACKEND: str = "firestore"  # firestore | sqlite | memory (repositories only)
+    SQLITE_PATH: str = "./data/warehouse.db"
 
     # JWT
     JWT_SECRET_KEY: str = "change-me-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 480
 
+    # Repository read cache (see app/repositories/cache.py)
+    REPOSITORY_CACHE_ENABLED: bool = False
+    REPOSITORY_CACHE_BACKEND: str = "memory"  # memory | redis
+    REPOSITORY_CACHE_URL: str = "redis://localhost:6379/0"
+    REPOSITORY_CACHE_MAX_ENTRIES: int = 10_000
+    REPOSITORY_CACHE_TTL: Dict[str, float] = {}  # per-collection TTL override, 0 = off
+
     # CORS
     CORS_ORIGINS: List[str] = ["*"]
 
     # AI Settings
     FORECASTING_DAYS: int = 30
     LOW_STOCK_THRESHOLD: int = 10
+    FORECAST_MODEL_PATH: str = "./models/hurdle.joblib"
+    FORECAST_MODEL: str = "tiered"  # hurdle | tiered (forests on high-volume SKUs only)
+    FORECAST_BACKEND: str = "forest"  # forest | hgb | linear (estimators of the hurdle stages)
+    FORECAST_LEAN_MEMORY: bool = False  # float32 features built by product block
+    FORECAST_RETRAIN_POLICY: str = "nightly"  # nightly | weekly | drift
+    FORECAST_WORKER_PRELOAD: bool = False  # start the forecast worker at boot
+    FORECAST_TIMEOUT_SECONDS: float = 300  # a slower forecast restarts the worker
+    AI_WARMUP: bool = False  # import forecasting/optimizers and build the AI agent at boot
+    FORECAST_CACHE_DIR: str = "./data/demand_cache"  # Parquet copy of the DataPack
+    FORECAST_HISTORY_PATH: str = "./historique_demande.csv"  # CSV or DataPack workbook
+    FORECAST_FEATURE_STORE_PATH: str = "./data/feature_store.npz"  # rolling demand state
+
+    # Wave picking
+    WAVE_PICKING_ENABLED: bool = False  # defer picking creation to waves
+    WAVE_WINDOW_MINUTES: Optional[int] = None  # only plan orders this recent (None: all queued)
+    CHARIOT_CAPACITY: int = 50  # units a chariot carries per tour
+    CHARIOT_INDEX_TTL_SECONDS: int = 300  # refresh of the in-memory fleet index
 
     class Config:
         env_file = ".env"
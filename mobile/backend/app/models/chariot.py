@@ -13,3 +13,6 @@ class Chariot(BaseModel):
 
     is_active: bool = Field(default=True, description="Whether chariot is operational")
     assigned_to_operation_id: Optional[str] = Field(default=None, description="Currently assigned operation ID")
+    last_x: Optional[int] = Field(default=None, description="Last known X coordinate")
+    last_y: Optional[int] = Field(default=None, description="Last known Y coordinate")
+    last_floor: Optional[int] = Field(default=None, description="Last known floor")
@@ -25,6 +25,8 @@ class Operation(BaseModel):
     emplacement_id: Optional[str] = Field(default=None, description="Destination emplacement ID")
     source_emplacement_id: Optional[str] = Field(default=None, description="Source emplacement ID")
     suggested_route: Optional[list] = Field(default=None, description="AI-suggested route coordinates")
+    wave_id: Optional[str] = Field(default=None, description="Picking wave this operation belongs to")
+    picks: Optional[list] = Field(default=None, description="Grouped pick lines (wave picking)")
 
     def to_firestore(self) -> dict:
         """Convert to Firestore-compatible dict."""
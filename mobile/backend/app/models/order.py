@@ -20,6 +20,7 @@ class Order(BaseModel):
     validated_at: Optional[datetime] = Field(default=None, description="Validation timestamp")
     product_id: Optional[str] = Field(default=None, description="Product ID")
     quantity: int = Field(default=0, ge=0, description="Ordered quantity")
+    wave_id: Optional[str] = Field(default=None, description="Picking wave the order was planned in")
 
     def to_firestore(self) -> dict:
         """Convert to Firestore-compatible dict."""
@@ -1,36 +1,115 @@
 """
 Base repository providing generic Firestore CRUD operations.
+
+Calls go through the async Firestore client (gRPC asyncio) directly on the
+event loop; the number of in-flight calls per event loop is capped by
+FIRESTORE_MAX_CONCURRENCY.  Multi-document reads are fetched in pages of
+PAGE_SIZE chained with ``start_after`` cursors: ``stream()`` yields them in
+bounded memory, ``query()`` / ``get_all()`` return every match unless a
+limit is given.
 """
 
 from datetime import datetime
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar,
+)
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import weakref
 
+from google.api_core.exceptions import FailedPrecondition
 from google.cloud.firestore import Query
-from app.config.firebase import get_db
-from app.core.exceptions import NotFoundError
+from app.config.firebase import get_async_db
+from app.config.settings import settings
+from app.core.exceptions import NotFoundError, ValidationError
+from app.repositories.cache import _MISSING, CachePolicy, CollectionCache, collection_cache
 from app.utils.logger import logger
 
 T = TypeVar("T")
 
-# Thread pool for running sync Firebase operations
-_executor = ThreadPoolExecutor(max_workers=10)
+# Documents fetched per request when reading many
+PAGE_SIZE = 500
+
+# Filter operators that make Firestore order results by the filtered field
+_INEQUALITIES = frozenset({"<", "<=", ">", ">=", "!=", "not-in"})
+
+# In-flight Firestore calls allowed per event loop
+_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _concurrency_limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limit = _limits.get(loop)
+    if limit is None:
+        limit = _limits[loop] = asyncio.Semaphore(settings.FIRESTORE_MAX_CONCURRENCY)
+    return limit
+
+
+def _to_dict(doc) -> Dict[str, Any]:
+    data = doc.to_dict()
+    data["id"] = doc.id
+    return data
 
 
 class BaseRepository:
     """
     Generic Firestore CRUD repository.
     All entity repositories should inherit from this class.
+
+    Subclasses holding reference data set ``cache_policy`` to serve reads
+    from the read-through cache (see ``app.repositories.cache``); every
+    write through the repository invalidates the collection's cached reads.
     """
 
+    cache_policy: Optional[CachePolicy] = None
+
     def __init__(self, collection_name: str):
         self.collection_name = collection_name
+        self._cache_state: Any = _MISSING
 
     @property
     def _collection(self):
         """Return Firestore collection reference."""
-        return get_db().collection(self.collection_name)
+        return get_async_db().collection(self.collection_name)
+
+    @property
+    def cache(self) -> Optional[CollectionCache]:
+        """Read cache of this collection, or None if not cached."""
+        if self._cache_state is _MISSING:
+            self._cache_state = collection_cache(self.collection_name, self.cache_policy)
+        return self._cache_state
+
+    def _filtered(self, filters: Optional[List[tuple]] = None):
+        """Collection query restricted by (field, operator, value) filters."""
+        query_ref = self._collection
+        for field, op, value in filters or ():
+            query_ref = query_ref.where(field, op, value)
+        return query_ref
+
+    async def _run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run one Firestore call under the concurrency limit."""
+        async with _concurrency_limit():
+            return await call()
+
+    async def _cached(self, key: tuple, read: Callable[[], Awaitable[T]], is_query: bool = False) -> T:
+        """Serve *read* (which applies the concurrency limit) from the cache."""
+        cache = self.cache
+        if cache is None or (is_query and not cache.policy.cache_queries):
+            return await read()
+        value, full_key = cache.lookup(*key)
+        if value is _MISSING:
+            value = await read()
+            cache.store(full_key, value)
+        return value
+
+    async def _write(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run a write, then invalidate the collection's cached reads."""
+        try:
+            return await self._run(call)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate()
 
     # ── CREATE ───────────────────────────────────────────────────
 
@@ -44,34 +123,32 @@ class BaseRepository:
         Returns:
             The created document data with its generated ID.
         """
-        def _create():
+        async def _create():
             now = datetime.utcnow().isoformat()
             data["created_at"] = data.get("created_at", now)
             data["updated_at"] = now
 
             doc_ref = self._collection.document()
-            doc_ref.set(data)
+            await doc_ref.set(data)
             data["id"] = doc_ref.id
             logger.debug(f"Created document in '{self.collection_name}': {doc_ref.id}")
             return data
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _create)
+
+        return await self._write(_create)
 
     async def create_with_id(self, doc_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a document with a specific ID."""
-        def _create_with_id():
+        async def _create_with_id():
             now = datetime.utcnow().isoformat()
             data["created_at"] = data.get("created_at", now)
             data["updated_at"] = now
 
             doc_ref = self._collection.document(doc_id)
-            doc_ref.set(data)
+            await doc_ref.set(data)
             data["id"] = doc_id
             return data
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _create_with_id)
+
+        return await self._write(_create_with_id)
 
     # ── READ ─────────────────────────────────────────────────────
 
@@ -85,16 +162,11 @@ class BaseRepository:
         Returns:
             Document data dict with 'id' field, or None if not found.
         """
-        def _get_by_id():
-            doc = self._collection.document(doc_id).get()
-            if doc.exists:  # type: ignore
-                data = doc.to_dict()  # type: ignore
-                data["id"] = doc.id  # type: ignore
-                return data
-            return None
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _get_by_id)
+        async def _get_by_id():
+            doc = await self._collection.document(doc_id).get()
+            return _to_dict(doc) if doc.exists else None
+
+        return await self._cached(("id", doc_id), lambda: self._run(_get_by_id))
 
     async def get_by_id_or_raise(self, doc_id: str) -> Dict[str, Any]:
         """Get a document by ID or raise NotFoundError."""
@@ -103,26 +175,23 @@ class BaseRepository:
             raise NotFoundError(self.collection_name, doc_id)
         return result
 
-    async def get_all(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        """Get all documents in the collection."""
-        def _get_all():
-            docs = self._collection.limit(limit).stream()
-            results = []
-            for doc in docs:
-                data = doc.to_dict()  # type: ignore
-                data["id"] = doc.id  # type: ignore
-                results.append(data)
-            return results
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _get_all)
+    async def get_all(
+        self,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get all documents in the collection (up to *limit* if given)."""
+        return await self.query(limit=limit, start_after=start_after, fields=fields)
 
     async def query(
         self,
         filters: Optional[List[tuple]] = None,
         order_by: Optional[str] = None,
         direction: str = "ASCENDING",
-        limit: int = 1000,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Query documents with optional filters and ordering.
@@ -132,80 +201,177 @@ class BaseRepository:
                      e.g. [("status", "==", "active"), ("floor", ">=", 2)]
             order_by: Field name to order by.
             direction: "ASCENDING" or "DESCENDING".
-            limit: Max results.
+            limit: Max results (default: all matches).
+            start_after: ID of the document to resume after (page cursor).
+            fields: Only return these fields (plus 'id', the order_by field
+                    and inequality-filtered fields, needed by page cursors);
+                    the projection is applied by Firestore.
 
         Returns:
             List of matching document dicts.
         """
-        def _query():
-            query_ref = self._collection
+        async def _query():
+            return [
+                doc async for doc in self.stream(
+                    filters, order_by, direction,
+                    limit=limit, start_after=start_after, fields=fields,
+                )
+            ]
 
-            if filters:
-                for field, op, value in filters:
-                    query_ref = query_ref.where(field, op, value)
+        key = ("query", repr(filters), order_by, direction, limit, start_after,
+               tuple(fields) if fields is not None else None)
+        return await self._cached(key, _query, is_query=True)
 
-            if order_by:
-                dir_const = (
-                    Query.DESCENDING if direction == "DESCENDING" else Query.ASCENDING
-                )
-                query_ref = query_ref.order_by(order_by, direction=dir_const)
+    async def stream(
+        self,
+        filters: Optional[List[tuple]] = None,
+        order_by: Optional[str] = None,
+        direction: str = "ASCENDING",
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        page_size: int = PAGE_SIZE,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield matching documents page by page (same arguments as query()).
 
-            query_ref = query_ref.limit(limit)
-            results = []
-            for doc in query_ref.stream():
-                data = doc.to_dict()  # type: ignore
-                data["id"] = doc.id  # type: ignore
-                results.append(data)
-            return results
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _query)
+        At most *page_size* documents are held at a time; each page resumes
+        after the last document of the previous one.  The concurrency slot is
+        released between pages, so the consumer may await other calls.
+        """
+        query_ref = self._filtered(filters)
+        if order_by:
+            dir_const = (
+                Query.DESCENDING if direction == "DESCENDING" else Query.ASCENDING
+            )
+            query_ref = query_ref.order_by(order_by, direction=dir_const)
+        if fields is not None:
+            # Page cursors need the last document's value of every field the
+            # query orders by: order_by, and on Firestore, implicitly, each
+            # inequality-filtered field
+            ordered = [field for field, op, _ in filters or () if op in _INEQUALITIES]
+            projection = list(dict.fromkeys([*fields, *ordered, *([order_by] if order_by else [])]))
+            query_ref = query_ref.select(projection)
+
+        after = None
+        if start_after:
+            after = await self._run(lambda: self._collection.document(start_after).get())
+            if not after.exists:
+                raise ValidationError(f"Invalid cursor: '{start_after}'")
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page_ref = (query_ref.start_after(after) if after is not None else query_ref).limit(size)
+
+            async def _page():
+                return [doc async for doc in page_ref.stream()]
+
+            page = await self._run(_page)
+            for doc in page:
+                yield _to_dict(doc)
+            if len(page) < size:
+                return
+            after = page[-1]
+            if remaining is not None:
+                remaining -= len(page)
 
     async def find_one(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
         """Find a single document where field equals value."""
-        def _find_one():
-            docs = self._collection.where(field, "==", value).limit(1).stream()
-            for doc in docs:
-                data = doc.to_dict()  # type: ignore
-                data["id"] = doc.id  # type: ignore
-                return data
+        async def _find_one():
+            async for doc in self._collection.where(field, "==", value).limit(1).stream():
+                return _to_dict(doc)
             return None
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _find_one)
+
+        return await self._cached(("find_one", field, value), lambda: self._run(_find_one))
 
     # ── UPDATE ───────────────────────────────────────────────────
 
-    async def update(self, doc_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def update(
+        self,
+        doc_id: str,
+        data: Dict[str, Any],
+        nullable: Iterable[str] = (),
+    ) -> Dict[str, Any]:
         """
         Update an existing document.
 
         Args:
             doc_id: Document ID.
-            data: Fields to update.
+            data: Fields to update. None values are skipped…
+            nullable: …except for these fields, which are cleared to None.
 
         Returns:
             Updated document data.
         """
-        def _update():
-            # Remove None values
-            update_data = {k: v for k, v in data.items() if v is not None}
+        async def _update():
+            # Remove None values (unless explicitly nullable)
+            keep = set(nullable)
+            update_data = {
+                k: v for k, v in data.items() if v is not None or k in keep
+            }
             update_data["updated_at"] = datetime.utcnow().isoformat()
 
             doc_ref = self._collection.document(doc_id)
-            doc = doc_ref.get()
-            if not doc.exists:  # type: ignore
+            doc = await doc_ref.get()
+            if not doc.exists:
                 raise NotFoundError(self.collection_name, doc_id)
 
-            doc_ref.update(update_data)
-            updated_doc = doc_ref.get().to_dict()  # type: ignore
+            await doc_ref.update(update_data)
+            updated_doc = (await doc_ref.get()).to_dict()
             assert updated_doc is not None, "Document should exist after update"
-            updated_doc["id"] = doc_id  # type: ignore
+            updated_doc["id"] = doc_id
             logger.debug(f"Updated document in '{self.collection_name}': {doc_id}")
             return updated_doc
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _update)
+
+        return await self._write(_update)
+
+    async def update_if(
+        self,
+        doc_id: str,
+        data: Dict[str, Any],
+        expected: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update a document only if its fields still equal *expected*.
+
+        The write is preconditioned on the update time of the document read,
+        so it fails if another writer (e.g. another worker process) changed
+        the document in between.
+
+        Args:
+            doc_id: Document ID.
+            data: Fields to update (None values are written as None).
+            expected: Field values the current document must have; a missing
+                field counts as None.
+
+        Returns:
+            Updated document data, or None if the condition does not hold.
+
+        Raises:
+            NotFoundError if document doesn't exist.
+        """
+        async def _update_if():
+            doc_ref = self._collection.document(doc_id)
+            doc = await doc_ref.get()
+            if not doc.exists:
+                raise NotFoundError(self.collection_name, doc_id)
+            current = doc.to_dict()
+            if any(current.get(k) != v for k, v in expected.items()):
+                return None
+
+            update_data = {**data, "updated_at": datetime.utcnow().isoformat()}
+            option = get_async_db().write_option(last_update_time=doc.update_time)
+            try:
+                await doc_ref.update(update_data, option=option)
+            except FailedPrecondition:
+                logger.debug(f"Conditional update lost in '{self.collection_name}': {doc_id}")
+                return None
+            current.update(update_data)
+            current["id"] = doc_id
+            return current
+
+        return await self._write(_update_if)
 
     # ── DELETE ───────────────────────────────────────────────────
 
@@ -222,26 +388,24 @@ class BaseRepository:
         Raises:
             NotFoundError if document doesn't exist.
         """
-        def _delete():
+        async def _delete():
             doc_ref = self._collection.document(doc_id)
-            doc = doc_ref.get()
-            if not doc.exists:  # type: ignore
+            doc = await doc_ref.get()
+            if not doc.exists:
                 raise NotFoundError(self.collection_name, doc_id)
 
-            doc_ref.delete()
+            await doc_ref.delete()
             logger.debug(f"Deleted document from '{self.collection_name}': {doc_id}")
             return True
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _delete)
+
+        return await self._write(_delete)
 
     # ── BATCH ────────────────────────────────────────────────────
 
     async def batch_create(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Create multiple documents in a batch."""
-        def _batch_create():
-            db = get_db()
-            batch = db.batch()
+        async def _batch_create():
+            batch = get_async_db().batch()
             now = datetime.utcnow().isoformat()
             results = []
 
@@ -253,22 +417,80 @@ class BaseRepository:
                 item["id"] = doc_ref.id
                 results.append(item)
 
-            batch.commit()
+            await batch.commit()
             logger.debug(f"Batch created {len(items)} documents in '{self.collection_name}'")
             return results
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _batch_create)
+
+        return await self._write(_batch_create)
+
+    async def batch_update(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Update multiple documents in a single batch commit.
+
+        Args:
+            updates: Mapping of document ID to the fields to update.
+
+        Returns:
+            Number of documents updated.
+        """
+        async def _batch_update():
+            batch = get_async_db().batch()
+            now = datetime.utcnow().isoformat()
+
+            for doc_id, data in updates.items():
+                update_data = {k: v for k, v in data.items() if v is not None}
+                update_data["updated_at"] = now
+                batch.update(self._collection.document(doc_id), update_data)
+
+            await batch.commit()
+            logger.debug(f"Batch updated {len(updates)} documents in '{self.collection_name}'")
+            return len(updates)
+
+        return await self._write(_batch_update)
+
+    # ── AGGREGATION ──────────────────────────────────────────────
+
+    async def aggregate(
+        self,
+        aggregations: Dict[str, Tuple[str, ...]],
+        filters: Optional[List[tuple]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute aggregations server-side in a single request (documents are
+        not transferred; Firestore bills one read per 1000 index entries).
+
+        Args:
+            aggregations: Alias → ("count",), ("sum", field) or ("avg", field).
+            filters: Same as in query().
+
+        Returns:
+            Alias → value (sum of no documents is 0, avg is None).
+        """
+        async def _aggregate():
+            agg = self._filtered(filters)
+            for alias, (kind, *field) in aggregations.items():
+                if kind == "count":
+                    agg = agg.count(alias=alias)
+                elif kind in ("sum", "avg"):
+                    agg = getattr(agg, kind)(field[0], alias=alias)
+                else:
+                    raise ValueError(f"Unknown aggregation: {kind!r}")
+            results = await agg.get()
+            return {result.alias: result.value for result in results[0]}
+
+        return await self._run(_aggregate)
 
     async def count(self, filters: Optional[List[tuple]] = None) -> int:
         """Count documents matching optional filters."""
-        def _count():
-            query_ref = self._collection
-            if filters:
-                for field, op, value in filters:
-                    query_ref = query_ref.where(field, op, value)
-            # Stream and count
-            return sum(1 for _ in query_ref.stream())
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, _count)
+        result = await self.aggregate({"count": ("count",)}, filters)
+        return int(result["count"])
+
+    async def sum(self, field: str, filters: Optional[List[tuple]] = None) -> float:
+        """Sum of a numeric field over matching documents."""
+        result = await self.aggregate({"sum": ("sum", field)}, filters)
+        return result["sum"]
+
+    async def avg(self, field: str, filters: Optional[List[tuple]] = None) -> Optional[float]:
+        """Average of a numeric field over matching documents (None if none)."""
+        result = await self.aggregate({"avg": ("avg", field)}, filters)
+        return result["avg"]
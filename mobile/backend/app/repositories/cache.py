@@ -0,0 +1,207 @@
+"""
+Read-through cache for repository reads.
+
+Repositories opt in with a ``CachePolicy`` (class attribute); results of
+``get_by_id``, ``find_one``, ``query`` and ``get_all`` are then kept for the
+policy's TTL.  Each collection has a generation number that is part of every
+key: a write through any repository instance of the collection bumps it, so
+all cached reads of that collection are dropped at once (query results can
+contain any document, so per-document invalidation would not be enough).
+
+Two backends:
+  - ``MemoryCacheBackend``: in-process LRU with TTL (default);
+  - ``RedisCacheBackend``: a local Redis server shared by all workers (needs
+    the optional ``redis`` package); generations live in Redis too, so a
+    write in one worker invalidates the others.
+"""
+
+import copy
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.config.settings import settings
+from app.utils.logger import logger
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long a collection's reads may be served from cache."""
+
+    ttl_seconds: float = 60.0
+    cache_queries: bool = True  # False: only get_by_id / find_one
+
+
+# ── Backends ─────────────────────────────────────────────────────
+
+class MemoryCacheBackend:
+    """Thread-safe LRU of (expiry, value) entries."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def bump(self, namespace: str) -> None:
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            # Entries of older generations can never be read again
+            stale = [k for k in self._entries if k[0] == namespace]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisCacheBackend:
+    """Pickled values in a (local) Redis server, expiring through Redis TTLs."""
+
+    def __init__(self, url: str, prefix: str = "repo-cache"):
+        import redis  # optional dependency
+
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}:{key!r}"
+
+    def get(self, key: Hashable) -> Any:
+        raw = self._redis.get(self._key(key))
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._redis.set(self._key(key), pickle.dumps(value), px=max(1, int(ttl * 1000)))
+
+    def generation(self, namespace: str) -> int:
+        return int(self._redis.get(f"{self.prefix}:gen:{namespace}") or 0)
+
+    def bump(self, namespace: str) -> None:
+        self._redis.incr(f"{self.prefix}:gen:{namespace}")
+
+    def clear(self) -> None:
+        for key in self._redis.scan_iter(f"{self.prefix}:*"):
+            self._redis.delete(key)
+
+
+_backend: Any = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend():
+    """Backend selected by REPOSITORY_CACHE_BACKEND (falls back to memory)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.REPOSITORY_CACHE_BACKEND == "redis":
+                    try:
+                        _backend = RedisCacheBackend(settings.REPOSITORY_CACHE_URL)
+                    except Exception as e:
+                        logger.warning(f"Redis cache unavailable ({e}); using in-process cache")
+                if _backend is None:
+                    _backend = MemoryCacheBackend(settings.REPOSITORY_CACHE_MAX_ENTRIES)
+    return _backend
+
+
+# ── Per-collection cache ─────────────────────────────────────────
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+_stats: Dict[str, CacheStats] = {}
+
+
+class CollectionCache:
+    """Cache of one collection's reads, shared by all its repository instances."""
+
+    def __init__(self, collection: str, policy: CachePolicy, backend=None):
+        self.collection = collection
+        self.policy = policy
+        self.backend = backend or get_cache_backend()
+        self.stats = _stats.setdefault(collection, CacheStats())
+
+    def lookup(self, *key: Hashable) -> Tuple[Any, Hashable]:
+        """
+        Cached value (a private copy) or ``_MISSING``, plus the full key to
+        pass to ``store`` on a miss.
+        """
+        full_key = (self.collection, self.backend.generation(self.collection)) + key
+        value = self.backend.get(full_key)
+        if value is _MISSING:
+            self.stats.misses += 1
+            return _MISSING, full_key
+        self.stats.hits += 1
+        return copy.deepcopy(value), full_key
+
+    def store(self, full_key: Hashable, value: Any) -> None:
+        # A write that happened during the read bumped the generation: drop
+        if full_key[1] == self.backend.generation(self.collection):
+            self.backend.set(full_key, copy.deepcopy(value), self.policy.ttl_seconds)
+
+    def invalidate(self) -> None:
+        self.stats.invalidations += 1
+        self.backend.bump(self.collection)
+
+
+def collection_cache(collection: str, policy: Optional[CachePolicy]) -> Optional[CollectionCache]:
+    """
+    Cache for *collection*, or None when caching is disabled or the
+    repository declares no policy.  REPOSITORY_CACHE_TTL overrides the
+    declared TTL per collection (0 disables it).
+    """
+    if not settings.REPOSITORY_CACHE_ENABLED or policy is None:
+        return None
+    ttl = settings.REPOSITORY_CACHE_TTL.get(collection, policy.ttl_seconds)
+    if ttl <= 0:
+        return None
+    return CollectionCache(collection, CachePolicy(ttl, policy.cache_queries))
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters per collection since startup (this process)."""
+    return {name: stats.as_dict() for name, stats in _stats.items()}
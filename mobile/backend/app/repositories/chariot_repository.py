@@ -5,11 +5,14 @@ Chariot repository for Firestore operations.
 from typing import List, Optional, Dict, Any
 
 from app.repositories.base_repository import BaseRepository
+from app.repositories.cache import CachePolicy
 
 
 class ChariotRepository(BaseRepository):
     """Repository for Chariot documents."""
 
+    cache_policy = CachePolicy(ttl_seconds=60)
+
     def __init__(self):
         super().__init__("chariots")
 
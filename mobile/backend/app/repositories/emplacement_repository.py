@@ -5,11 +5,14 @@ Emplacement repository for Firestore operations.
 from typing import List, Optional, Dict, Any
 
 from app.repositories.base_repository import BaseRepository
+from app.repositories.cache import CachePolicy
 
 
 class EmplacementRepository(BaseRepository):
     """Repository for Emplacement location documents."""
 
+    cache_policy = CachePolicy(ttl_seconds=15)  # stock moves often: short TTL
+
     def __init__(self):
         super().__init__("emplacements")
 
@@ -39,12 +42,14 @@ class EmplacementRepository(BaseRepository):
             filters.append(("floor", "==", floor))
         return await self.query(filters=filters)
 
-    async def get_occupied_slots(self, floor: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get occupied storage slots."""
+    async def get_occupied_slots(
+        self, floor: Optional[int] = None, fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get occupied storage slots (only *fields* if given)."""
         filters = [("is_slot", "==", True), ("is_occupied", "==", True)]
         if floor is not None:
             filters.append(("floor", "==", floor))
-        return await self.query(filters=filters)
+        return await self.query(filters=filters, fields=fields)
 
     async def get_expedition_zones(self) -> List[Dict[str, Any]]:
         """Get all expedition zones."""
@@ -59,8 +64,9 @@ class EmplacementRepository(BaseRepository):
         floor: Optional[int] = None,
         is_slot: Optional[bool] = None,
         is_occupied: Optional[bool] = None,
+        fields: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
-        """Get locations with optional filters."""
+        """Get locations with optional filters (only *fields* if given)."""
         filters = []
         if floor is not None:
             filters.append(("floor", "==", floor))
@@ -68,4 +74,4 @@ class EmplacementRepository(BaseRepository):
             filters.append(("is_slot", "==", is_slot))
         if is_occupied is not None:
             filters.append(("is_occupied", "==", is_occupied))
-        return await self.query(filters=filters if filters else None)
+        return await self.query(filters=filters if filters else None, fields=fields)
@@ -0,0 +1,145 @@
+"""
+Load test of repository reads: the former thread-pool bridge (sync client,
+10 threads) against the async client used by BaseRepository.
+
+    python -m app.repositories.loadtest --collection products --requests 2000 --concurrency 64
+    python -m app.repositories.loadtest --simulate-ms 20 --requests 2000
+
+The first form reads real documents (Firestore or the emulator, with the
+usual credentials settings).  ``--simulate-ms`` replaces the network call by
+a fixed latency to compare the two concurrency models without a backend.
+Prints a JSON report (throughput, p50/p95 latency).
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.config.settings import settings
+from app.repositories.base_repository import BaseRepository
+
+LEGACY_WORKERS = 10
+
+
+def _summary(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2),
+    }
+
+
+async def _drive(calls: List[Callable[[], Awaitable[Any]]]) -> Dict[str, Any]:
+    latencies: List[float] = []
+
+    async def timed(call):
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(call) for call in calls))
+    return _summary(latencies, time.perf_counter() - start)
+
+
+async def run_threaded(read: Callable[[str], Any], ids: List[str]) -> Dict[str, Any]:
+    """Sync reads through a 10-thread executor (previous BaseRepository)."""
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=LEGACY_WORKERS) as executor:
+        return await _drive([
+            (lambda doc_id=doc_id: loop.run_in_executor(executor, read, doc_id))
+            for doc_id in ids
+        ])
+
+
+async def run_async(repo: BaseRepository, ids: List[str]) -> Dict[str, Any]:
+    """Async reads through BaseRepository.get_by_id."""
+    return await _drive([(lambda doc_id=doc_id: repo.get_by_id(doc_id)) for doc_id in ids])
+
+
+# ── Simulated backend ────────────────────────────────────────────
+
+class _SimulatedDoc:
+    def __init__(self, doc_id: str):
+        self.id, self.exists = doc_id, True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"sku": self.id}
+
+
+class _SimulatedRepository(BaseRepository):
+    """BaseRepository whose documents answer after a fixed latency."""
+
+    def __init__(self, latency: float):
+        super().__init__("loadtest")
+        self.latency = latency
+
+    @property
+    def _collection(self):
+        repo = self
+
+        class _Ref:
+            def __init__(self, doc_id):
+                self.doc_id = doc_id
+
+            async def get(self):
+                await asyncio.sleep(repo.latency)
+                return _SimulatedDoc(self.doc_id)
+
+        class _Collection:
+            def document(self, doc_id):
+                return _Ref(doc_id)
+
+        return _Collection()
+
+
+async def main_async(args) -> Dict[str, Any]:
+    settings.FIRESTORE_MAX_CONCURRENCY = args.concurrency
+    report: Dict[str, Any] = {
+        "concurrency": args.concurrency,
+        "legacy_threads": LEGACY_WORKERS,
+    }
+    if args.simulate_ms is not None:
+        latency = args.simulate_ms / 1000
+        ids = [f"doc-{i}" for i in range(args.requests)]
+        report["backend"] = f"simulated {args.simulate_ms} ms"
+        report["threads"] = await run_threaded(lambda _: time.sleep(latency), ids)
+        report["async"] = await run_async(_SimulatedRepository(latency), ids)
+    else:
+        from app.config.firebase import get_db, initialize_firebase
+
+        initialize_firebase()
+        collection = get_db().collection(args.collection)
+        known = [doc.id for doc in collection.limit(args.sample).stream()]
+        if not known:
+            raise SystemExit(f"No documents in '{args.collection}'")
+        ids = [known[i % len(known)] for i in range(args.requests)]
+        report["backend"] = f"firestore:{args.collection}"
+        report["threads"] = await run_threaded(lambda doc_id: collection.document(doc_id).get(), ids)
+        report["async"] = await run_async(BaseRepository(args.collection), ids)
+    report["speedup"] = round(
+        report["async"]["throughput_rps"] / report["threads"]["throughput_rps"], 2
+    )
+    return report
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--collection", default="products")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=settings.FIRESTORE_MAX_CONCURRENCY)
+    parser.add_argument("--sample", type=int, default=200, help="distinct documents read")
+    parser.add_argument("--simulate-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
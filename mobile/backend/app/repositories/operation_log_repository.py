@@ -24,13 +24,11 @@ class OperationLogRepository(BaseRepository):
 
     async def get_overrides(self) -> List[Dict[str, Any]]:
         """Get all log entries that represent overrides (have overridor_id)."""
-        all_logs = await self.get_all()
-        return [log for log in all_logs if log.get("overridor_id")]
+        return await self.query(filters=[("overridor_id", "!=", None)])
 
     async def get_validated(self) -> List[Dict[str, Any]]:
         """Get all validated log entries."""
-        all_logs = await self.get_all()
-        return [log for log in all_logs if log.get("validated_at")]
+        return await self.query(filters=[("validated_at", "!=", None)])
 
     async def get_by_type(self, op_type: OperationType) -> List[Dict[str, Any]]:
         """Get all logs for a specific operation type."""
@@ -35,14 +35,15 @@ class OperationRepository(BaseRepository):
 
     async def get_validated(self) -> List[Dict[str, Any]]:
         """Get all validated operations (validated_at is not null)."""
-        all_ops = await self.get_all()
-        return [op for op in all_ops if op.get("validated_at")]
+        return await self.query(filters=[("validated_at", "!=", None)])
 
     async def get_filtered(
         self,
         operation_type: Optional[OperationType] = None,
         employee_id: Optional[str] = None,
         status: Optional[OperationStatus] = None,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get operations with optional filters."""
         filters = []
@@ -52,4 +53,6 @@ class OperationRepository(BaseRepository):
             filters.append(("employee_id", "==", employee_id))
         if status:
             filters.append(("status", "==", status.value))
-        return await self.query(filters=filters if filters else None)
+        return await self.query(
+            filters=filters if filters else None, limit=limit, start_after=start_after
+        )
@@ -36,6 +36,20 @@ class OrderRepository(BaseRepository):
         ai_generated = await self.get_by_status(OrderStatus.AI_GENERATED)
         return pending + ai_generated
 
+    async def get_wave_candidates(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get validated preparation orders queued for a wave (wave_id still
+        null), optionally only those validated since *since*.
+        """
+        filters = [
+            ("type", "==", OrderType.PREPARATION.value),
+            ("status", "==", OrderStatus.VALIDATED.value),
+            ("wave_id", "==", None),
+        ]
+        if since:
+            filters.append(("validated_at", ">=", since))
+        return await self.query(filters=filters)
+
     async def get_overridden_orders(self) -> List[Dict[str, Any]]:
         """Get all overridden orders."""
         return await self.get_by_status(OrderStatus.OVERRIDDEN)
@@ -47,6 +61,8 @@ class OrderRepository(BaseRepository):
         status: Optional[OrderStatus] = None,
         status_filter: Optional[OrderStatus] = None,
         ai_generated_only: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get orders with optional filters."""
         filters = []
@@ -60,4 +76,6 @@ class OrderRepository(BaseRepository):
             filters.append(("status", "==", status_filter.value))
         if ai_generated_only:
             filters.append(("generated_by_ai", "==", True))
-        return await self.query(filters=filters if filters else None)
+        return await self.query(
+            filters=filters if filters else None, limit=limit, start_after=start_after
+        )
@@ -5,11 +5,14 @@ Product repository for Firestore operations.
 from typing import List, Optional, Dict, Any
 
 from app.repositories.base_repository import BaseRepository
+from app.repositories.cache import CachePolicy
 
 
 class ProductRepository(BaseRepository):
     """Repository for Product documents."""
 
+    cache_policy = CachePolicy(ttl_seconds=300)
+
     def __init__(self):
         super().__init__("products")
 
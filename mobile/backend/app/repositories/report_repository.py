@@ -25,6 +25,8 @@ class ReportRepository(BaseRepository):
         self,
         operation_id: Optional[str] = None,
         damage_only: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get reports with optional filters."""
         filters = []
@@ -32,6 +34,8 @@ class ReportRepository(BaseRepository):
             filters.append(("operation_id", "==", operation_id))
         if damage_only:
             filters.append(("physical_damage", "==", True))
-        return await self.query(filters=filters if filters else None)
+        return await self.query(
+            filters=filters if filters else None, limit=limit, start_after=start_after
+        )
 
 
@@ -62,5 +62,5 @@ class StockLedgerRepository(BaseRepository):
             ("z", "==", z),
             ("floor", "==", floor),
             ("product_id", "==", product_id),
-        ])
+        ], fields=["quantity"])
         return sum(e.get("quantity", 0) for e in entries)
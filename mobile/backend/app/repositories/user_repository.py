@@ -5,12 +5,15 @@ User repository for Firestore operations.
 from typing import List, Optional, Dict, Any
 
 from app.repositories.base_repository import BaseRepository
+from app.repositories.cache import CachePolicy
 from app.core.enums import UserRole
 
 
 class UserRepository(BaseRepository):
     """Repository for User documents."""
 
+    cache_policy = CachePolicy(ttl_seconds=300)
+
     def __init__(self):
         super().__init__("users")
 
@@ -22,13 +25,15 @@ class UserRepository(BaseRepository):
         """Get all users with a specific role."""
         return await self.query(filters=[("role", "==", role.value)])
 
-    async def get_employees(self) -> List[Dict[str, Any]]:
-        """Get all employees."""
-        return await self.query(filters=[("role", "==", UserRole.EMPLOYEE.value)])
+    async def get_employees(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get all employees (only *fields* if given)."""
+        return await self.query(filters=[("role", "==", UserRole.EMPLOYEE.value)], fields=fields)
 
-    async def get_active_employees(self) -> List[Dict[str, Any]]:
-        """Get all active employees (is_active=True)."""
-        employees = await self.get_employees()
+    async def get_active_employees(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get all active employees (is_active=True), only *fields* if given."""
+        if fields is not None:
+            fields = [*fields, "is_active"]
+        employees = await self.get_employees(fields=fields)
         return [e for e in employees if e.get("is_active", True)]
 
     async def get_filtered(
@@ -11,6 +11,7 @@ from fastapi import APIRouter, HTTPException, status
 from typing import Dict, Optional
 from pydantic import BaseModel, Field
 
+from app.ai import import_report
 from app.services.warehouse_ai_agent_service import get_ai_agent
 from app.utils.logger import setup_logger
 from app.config.firebase import is_firebase_enabled
@@ -89,7 +90,8 @@ async def ai_health_check():
                 "grid_loaded": len(agent.combined_grid) > 0,
                 "elevators": len(agent.elevators),
                 "storage_optimizer": agent.storage_optimizer is not None,
-                "decision_history_count": len(agent.decision_history)
+                "decision_history_count": len(agent.decision_history),
+                "imports": import_report(),
             }
         }
         
@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, Query
 
 from app.repositories.chariot_repository import ChariotRepository
 from app.schemas.chariot import ChariotCreate, ChariotUpdate, ChariotResponse
+from app.services.chariot_dispatcher import get_chariot_dispatcher
 from app.utils.dependencies import get_current_user, get_supervisor_user
 
 router = APIRouter()
@@ -42,6 +43,7 @@ async def create_chariot(
     """Create a new chariot. Supervisor/Admin only."""
     chariot_data = data.model_dump()
     created = await chariot_repo.create(chariot_data)
+    get_chariot_dispatcher().upsert(created)
     return ChariotResponse(**created)
 
 
@@ -54,6 +56,7 @@ async def update_chariot(
     """Update a chariot. Supervisor/Admin only."""
     update_data = data.model_dump(exclude_unset=True)
     updated = await chariot_repo.update(chariot_id, update_data)
+    get_chariot_dispatcher().upsert(updated)
     return ChariotResponse(**updated)
 
 
@@ -64,3 +67,4 @@ async def delete_chariot(
 ):
     """Delete a chariot. Supervisor/Admin only."""
     await chariot_repo.delete(chariot_id)
+    get_chariot_dispatcher().remove(chariot_id)
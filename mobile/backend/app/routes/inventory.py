@@ -127,7 +127,7 @@ async def get_stock_summary(
     _user: Dict[str, Any] = Depends(get_current_user),
 ):
     """Get aggregated stock summary per product."""
-    occupied = await emplacement_repo.get_occupied_slots()
+    occupied = await emplacement_repo.get_occupied_slots(fields=["product_id", "quantity"])
 
     # Aggregate by product_id
     summary_map: Dict[str, Dict[str, int]] = {}
@@ -12,17 +12,18 @@ import random
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
 from app.core.enums import OperationType, OperationStatus
 from app.repositories.operation_repository import OperationRepository
 from app.repositories.operation_log_repository import OperationLogRepository
 from app.repositories.product_repository import ProductRepository
 from app.repositories.emplacement_repository import EmplacementRepository
-from app.repositories.chariot_repository import ChariotRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas.operation import OperationCreate, OperationApprove, OperationResponse
+from app.services.chariot_dispatcher import get_chariot_dispatcher
 from app.utils.dependencies import get_current_user, get_supervisor_user
+from app.utils.helpers import page_of
 from app.utils.logger import logger
 
 # Lazy AI imports – gracefully degrades if modules unavailable
@@ -32,12 +33,17 @@ except Exception:
     get_storage_optimizer = None  # type: ignore[assignment]
     get_pathfinder = None  # type: ignore[assignment]
 
+try:
+    from app.ai import record_delivery
+except Exception:
+    record_delivery = None  # type: ignore[assignment]
+
 router = APIRouter()
 operation_repo = OperationRepository()
 operation_log_repo = OperationLogRepository()
 product_repo = ProductRepository()
 emplacement_repo = EmplacementRepository()
-chariot_repo = ChariotRepository()
+chariot_dispatcher = get_chariot_dispatcher()
 user_repo = UserRepository()
 
 
@@ -46,18 +52,23 @@ user_repo = UserRepository()
 
 @router.get("/", response_model=List[OperationResponse])
 async def list_operations(
+    response: Response,
     operation_type: Optional[OperationType] = Query(default=None, description="Filter by type"),
     employee_id: Optional[str] = Query(default=None, description="Filter by employee"),
     status: Optional[OperationStatus] = Query(default=None, description="Filter by status"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor of the previous page"),
+    page_size: Optional[int] = Query(default=None, ge=1, le=1000, description="Page size (default: all)"),
     _user: Dict[str, Any] = Depends(get_current_user),
 ):
-    """Get all operations with optional filters."""
+    """Get all operations with optional filters, optionally one page at a time."""
     ops = await operation_repo.get_filtered(
         operation_type=operation_type,
         employee_id=employee_id,
         status=status,
+        limit=page_size + 1 if page_size else None,
+        start_after=cursor,
     )
-    return [OperationResponse(**o) for o in ops]
+    return [OperationResponse(**o) for o in page_of(ops, page_size, response)]
 
 
 @router.get("/pending", response_model=List[OperationResponse])
@@ -202,7 +213,7 @@ async def approve_operation(
 
     For transfer/picking operations:
     - If override data provided, updates the operation fields first (logs override)
-    - Assigns a random available chariot
+    - Dispatches the free chariot nearest to the source emplacement
     - Generates AI route to destination
     - Sets status to 'in_progress'
     """
@@ -228,17 +239,21 @@ async def approve_operation(
                 "overriden_at": now,
             })
 
+    dest_emplacement_id = update_data.get("emplacement_id") or op.get("emplacement_id")
+    source_emplacement_id = update_data.get("source_emplacement_id") or op.get("source_emplacement_id")
+
     # Assign chariot for transfer/picking (not receipt/delivery)
     op_type = op.get("type")
     if op_type in (OperationType.TRANSFER.value, OperationType.PICKING.value):
         if not op.get("chariot_id") and not update_data.get("chariot_id"):
-            chariot = await _assign_random_chariot(operation_id)
+            origin = None
+            if source_emplacement_id:
+                origin = _position_of(await emplacement_repo.get_by_id(source_emplacement_id))
+            chariot = await chariot_dispatcher.dispatch(operation_id, origin)
             if chariot:
                 update_data["chariot_id"] = chariot["id"]
 
     # Generate route to destination (if AI available)
-    dest_emplacement_id = update_data.get("emplacement_id") or op.get("emplacement_id")
-    source_emplacement_id = update_data.get("source_emplacement_id") or op.get("source_emplacement_id")
     if dest_emplacement_id and source_emplacement_id:
         try:
             route = await _generate_route(source_emplacement_id, dest_emplacement_id)
@@ -333,7 +348,7 @@ async def delete_operation(
     # Release chariot if assigned
     op = await operation_repo.get_by_id_or_raise(operation_id)
     if op.get("chariot_id"):
-        await chariot_repo.update(op["chariot_id"], {"assigned_to_operation_id": None})
+        await chariot_dispatcher.release(op["chariot_id"])
     await operation_repo.delete(operation_id)
 
 
@@ -375,7 +390,9 @@ async def _on_receipt_validated(
             }]
 
             # Build current slot state from Firestore emplacements
-            all_slots = await emplacement_repo.get_filtered(is_slot=True)
+            all_slots = await emplacement_repo.get_filtered(
+                is_slot=True, fields=["floor", "x", "y", "product_id", "quantity"],
+            )
             slots_from_db = {}
             for slot in all_slots:
                 key = (slot.get('floor', 0), slot.get('x', 0), slot.get('y', 0))
@@ -449,29 +466,30 @@ async def _on_transfer_validated(op: Dict[str, Any]) -> None:
     """
     After transfer validation:
     1. Update destination emplacement stock
-    2. Release the chariot
+    2. Release the chariot (left at the destination)
     3. Increment relevant product frequencies
     """
     product_id = op.get("product_id")
     quantity = op.get("quantity", 0)
     emplacement_id = op.get("emplacement_id")
+    emplacement = None
+    if emplacement_id:
+        emplacement = await emplacement_repo.get_by_id(emplacement_id)
 
     # 1. Update destination emplacement stock
-    if emplacement_id and product_id:
-        emplacement = await emplacement_repo.get_by_id(emplacement_id)
-        if emplacement:
-            current_qty = emplacement.get("quantity", 0)
-            new_qty = current_qty + quantity
-            await emplacement_repo.update(emplacement_id, {
-                "product_id": product_id,
-                "quantity": new_qty,
-                "is_occupied": True,
-            })
+    if emplacement and product_id:
+        current_qty = emplacement.get("quantity", 0)
+        new_qty = current_qty + quantity
+        await emplacement_repo.update(emplacement_id, {
+            "product_id": product_id,
+            "quantity": new_qty,
+            "is_occupied": True,
+        })
 
     # 2. Release chariot
     chariot_id = op.get("chariot_id")
     if chariot_id:
-        await chariot_repo.update(chariot_id, {"assigned_to_operation_id": None})
+        await chariot_dispatcher.release(chariot_id, _position_of(emplacement))
 
 
 async def _on_picking_validated(
@@ -481,70 +499,92 @@ async def _on_picking_validated(
     After picking validation:
     1. Decrement source emplacement stock
     2. Increment demand_freq
-    3. Release chariot
+    3. Release chariot (left at the expedition zone)
     4. Create delivery operation
-    """
-    product_id = op.get("product_id")
-    quantity = op.get("quantity", 0)
-    source_emplacement_id = op.get("source_emplacement_id")
-
-    # 1. Decrement source emplacement
-    if source_emplacement_id and product_id:
-        emplacement = await emplacement_repo.get_by_id(source_emplacement_id)
-        if emplacement:
-            current_qty = emplacement.get("quantity", 0)
-            new_qty = max(current_qty - quantity, 0)
-            await emplacement_repo.update(source_emplacement_id, {
-                "quantity": new_qty,
-                "is_occupied": new_qty > 0,
-                "product_id": product_id if new_qty > 0 else None,
-            })
 
-    # 2. Increment demand frequency
-    if product_id:
-        await _increment_product_frequency(product_id, "demand_freq")
+    Wave operations carry several pick lines in 'picks'; each line is
+    handled like a single picking and gets its own delivery.
+    """
+    picks = op.get("picks") or [{
+        "order_id": op.get("order_id"),
+        "product_id": op.get("product_id"),
+        "quantity": op.get("quantity", 0),
+        "source_emplacement_id": op.get("source_emplacement_id"),
+    }]
+
+    for pick in picks:
+        product_id = pick.get("product_id")
+        quantity = pick.get("quantity", 0)
+        source_emplacement_id = pick.get("source_emplacement_id")
+
+        # 1. Decrement source emplacement
+        if source_emplacement_id and product_id:
+            emplacement = await emplacement_repo.get_by_id(source_emplacement_id)
+            if emplacement:
+                current_qty = emplacement.get("quantity", 0)
+                new_qty = max(current_qty - quantity, 0)
+                await emplacement_repo.update(source_emplacement_id, {
+                    "quantity": new_qty,
+                    "is_occupied": new_qty > 0,
+                    "product_id": product_id if new_qty > 0 else None,
+                })
+
+        # 2. Increment demand frequency
+        if product_id:
+            await _increment_product_frequency(product_id, "demand_freq")
 
     # 3. Release chariot
     chariot_id = op.get("chariot_id")
     if chariot_id:
-        await chariot_repo.update(chariot_id, {"assigned_to_operation_id": None})
-
-    # 4. Create delivery operation
-    active_employees = await user_repo.get_active_employees()
-    employee_id = None
-    if active_employees:
-        employee = random.choice(active_employees)
-        employee_id = employee["id"]
-
-    delivery_data = {
-        "type": OperationType.DELIVERY.value,
-        "status": OperationStatus.PENDING.value,
-        "product_id": product_id,
-        "quantity": quantity,
-        "employee_id": employee_id,
-        "order_id": op.get("order_id"),
-        "emplacement_id": None,
-        "source_emplacement_id": None,
-    }
-    created_delivery = await operation_repo.create(delivery_data)
-    await _log_operation(created_delivery["id"], "created", created_delivery)
-
-    logger.info(f"Delivery operation {created_delivery['id']} created after picking {operation_id}")
+        expedition_zones = await emplacement_repo.get_expedition_zones()
+        position = _position_of(expedition_zones[0]) if expedition_zones else None
+        await chariot_dispatcher.release(chariot_id, position)
+
+    # 4. Create delivery operation(s)
+    active_employees = await user_repo.get_active_employees(fields=[])
+
+    for pick in picks:
+        employee_id = None
+        if active_employees:
+            employee = random.choice(active_employees)
+            employee_id = employee["id"]
+
+        delivery_data = {
+            "type": OperationType.DELIVERY.value,
+            "status": OperationStatus.PENDING.value,
+            "product_id": pick.get("product_id"),
+            "quantity": pick.get("quantity", 0),
+            "employee_id": employee_id,
+            "order_id": pick.get("order_id"),
+            "emplacement_id": None,
+            "source_emplacement_id": None,
+        }
+        created_delivery = await operation_repo.create(delivery_data)
+        await _log_operation(created_delivery["id"], "created", created_delivery)
+
+        logger.info(f"Delivery operation {created_delivery['id']} created after picking {operation_id}")
 
 
 async def _on_delivery_validated(op: Dict[str, Any]) -> None:
     """
     After delivery validation:
     1. Increment delivery_freq
-    2. Release chariot if any
+    2. Record the demand in the forecasting feature store
+    3. Release chariot if any
     """
     product_id = op.get("product_id")
     if product_id:
         await _increment_product_frequency(product_id, "delivery_freq")
 
+    if product_id and record_delivery is not None:
+        try:
+            await record_delivery(product_id, op.get("quantity", 0), datetime.utcnow())
+        except Exception as e:
+            logger.warning(f"Feature store update failed for {product_id}: {e}")
+
     chariot_id = op.get("chariot_id")
     if chariot_id:
-        await chariot_repo.update(chariot_id, {"assigned_to_operation_id": None})
+        await chariot_dispatcher.release(chariot_id)
 
 
 # ── HELPER FUNCTIONS ─────────────────────────────────────────────
@@ -558,15 +598,11 @@ async def _increment_product_frequency(product_id: str, field: str) -> None:
         await product_repo.update(product_id, {field: current_value + 1.0})
 
 
-async def _assign_random_chariot(operation_id: str) -> Optional[Dict[str, Any]]:
-    """Assign a random available chariot to an operation."""
-    available = await chariot_repo.get_available()
-    if not available:
-        logger.warning(f"No available chariots for operation {operation_id}")
+def _position_of(emplacement: Optional[Dict[str, Any]]) -> Optional[tuple]:
+    """(x, y, floor) of an emplacement document, or None."""
+    if not emplacement:
         return None
-    chariot = random.choice(available)
-    await chariot_repo.update(chariot["id"], {"assigned_to_operation_id": operation_id})
-    return chariot
+    return (emplacement.get("x", 0), emplacement.get("y", 0), emplacement.get("floor", 0))
 
 
 async def _generate_route(
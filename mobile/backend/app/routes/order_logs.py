@@ -4,11 +4,12 @@ Order log routes: read-only access to order lifecycle logs.
 
 from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
 from app.repositories.order_log_repository import OrderLogRepository
 from app.schemas.order_log import OrderLogResponse
 from app.utils.dependencies import get_current_user, get_supervisor_user
+from app.utils.helpers import page_of
 
 router = APIRouter()
 order_log_repo = OrderLogRepository()
@@ -16,11 +17,14 @@ order_log_repo = OrderLogRepository()
 
 @router.get("/", response_model=List[OrderLogResponse])
 async def list_order_logs(
+    response: Response,
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor of the previous page"),
+    page_size: Optional[int] = Query(default=None, ge=1, le=1000, description="Page size (default: all)"),
     _user: Dict[str, Any] = Depends(get_supervisor_user),
 ):
-    """Get all order logs. Supervisor/Admin only."""
-    logs = await order_log_repo.get_all()
-    return [OrderLogResponse(**log) for log in logs]
+    """Get all order logs, optionally one page at a time. Supervisor/Admin only."""
+    logs = await order_log_repo.get_all(limit=page_size + 1 if page_size else None, start_after=cursor)
+    return [OrderLogResponse(**log) for log in page_of(logs, page_size, response)]
 
 
 @router.get("/order/{order_id}", response_model=List[OrderLogResponse])
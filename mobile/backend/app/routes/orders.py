@@ -7,12 +7,14 @@ Workflow:
 - AI generates 'preparation' orders via forecasting
 """
 
+import asyncio
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
+from app.config.settings import settings
 from app.core.enums import OrderType, OrderStatus, OperationType, OperationStatus
 from app.repositories.order_repository import OrderRepository
 from app.repositories.order_log_repository import OrderLogRepository
@@ -22,19 +24,27 @@ from app.repositories.user_repository import UserRepository
 from app.repositories.emplacement_repository import EmplacementRepository
 from app.schemas.order import OrderCreate, OrderResponse
 from app.schemas.order_log import OrderLogResponse
+from app.schemas.operation import OperationResponse
+from app.schemas.wave import WavePlanResponse
 from app.utils.dependencies import get_current_user, get_supervisor_user
+from app.utils.helpers import page_of
 
-# Lazy AI import – gracefully degrades if numpy/scipy missing
+# Lazy AI import – forecasting is a proxy, loaded on first request
 try:
-    from app.ai.forecasting import forecasting_engine
+    from app.ai import forecasting_engine
 except Exception:
     forecasting_engine = None
 
 try:
-    from app.ai import get_pathfinder, plan_product_route
+    from app.ai import get_pathfinder, plan_product_route, allocate_pick_lines, plan_wave
+    from app.ai.route_sequencer import one_to_many_costs, trace_path
 except Exception:
     get_pathfinder = None
     plan_product_route = None
+    allocate_pick_lines = None
+    plan_wave = None
+    one_to_many_costs = None
+    trace_path = None
 from app.utils.logger import logger
 
 router = APIRouter()
@@ -51,13 +61,18 @@ emplacement_repo = EmplacementRepository()
 
 @router.get("/", response_model=List[OrderResponse])
 async def list_orders(
+    response: Response,
     order_type: Optional[OrderType] = Query(default=None, description="Filter by order type"),
     status: Optional[OrderStatus] = Query(default=None, description="Filter by status"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor of the previous page"),
+    page_size: Optional[int] = Query(default=None, ge=1, le=1000, description="Page size (default: all)"),
     _user: Dict[str, Any] = Depends(get_current_user),
 ):
-    """Get all orders with optional filters."""
-    orders = await order_repo.get_filtered(order_type=order_type, status=status)
-    return [OrderResponse(**o) for o in orders]
+    """Get all orders with optional filters, optionally one page at a time."""
+    orders = await order_repo.get_filtered(
+        order_type=order_type, status=status, limit=page_size + 1 if page_size else None, start_after=cursor,
+    )
+    return [OrderResponse(**o) for o in page_of(orders, page_size, response)]
 
 
 @router.get("/pending", response_model=List[OrderResponse])
@@ -146,6 +161,9 @@ async def validate_order(
     - Logs to OrderLog
     - Creates a 'receipt' operation assigned to a random active employee
     - Logs the operation creation to OperationLog
+
+    For 'preparation' orders, picking operations are created right away,
+    unless wave picking is enabled (they are then batched by POST /waves).
     """
     order = await order_repo.get_by_id_or_raise(order_id)
 
@@ -154,13 +172,18 @@ async def validate_order(
         raise ConflictError("Order is already validated")
 
     now = datetime.utcnow().isoformat()
+    order_type = order.get("type")
+    deferred = order_type == OrderType.PREPARATION.value and settings.WAVE_PICKING_ENABLED
 
     # Update order status
-    updated_order = await order_repo.update(order_id, {
+    changes = {
         "status": OrderStatus.VALIDATED.value,
         "validator_id": current_user["id"],
         "validated_at": now,
-    })
+    }
+    if deferred:
+        changes["wave_id"] = None  # queued until a wave plans it
+    updated_order = await order_repo.update(order_id, changes, nullable=("wave_id",))
 
     # Log order validation
     await order_log_repo.create({
@@ -174,12 +197,14 @@ async def validate_order(
     })
 
     # Trigger receipt operation for 'command' orders
-    order_type = order.get("type")
     if order_type == OrderType.COMMAND.value:
         await _create_receipt_from_order(order, order_id, current_user)
     # Trigger picking operations for 'preparation' orders
     elif order_type == OrderType.PREPARATION.value:
-        await _create_picking_from_preparation(order, order_id, current_user)
+        if deferred:
+            logger.info(f"Preparation order {order_id} deferred to the next picking wave")
+        else:
+            await _create_picking_from_preparation(order, order_id, current_user)
 
     return OrderResponse(**updated_order)
 
@@ -206,10 +231,23 @@ async def generate_preparation_orders(
             detail="AI forecasting is not available (numpy may not be installed).",
         )
 
-    predictions = await forecasting_engine.predict_preparation_orders(
-        days=days,
-        min_demand_frequency=min_demand_freq,
-    )
+    try:
+        predictions = await forecasting_engine.predict_preparation_orders(
+            days=days,
+            min_demand_frequency=min_demand_freq,
+        )
+    except FileNotFoundError as e:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=503, detail=str(e))
+    except TimeoutError as e:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=504, detail=str(e))
+    except ImportError as e:
+        from fastapi import HTTPException
+        raise HTTPException(
+            status_code=503,
+            detail=f"AI forecasting is not available ({e}).",
+        )
 
     created_orders = []
     for pred in predictions:
@@ -238,9 +276,221 @@ async def generate_preparation_orders(
     return created_orders
 
 
+# ── WAVE PICKING ─────────────────────────────────────────────────
+
+
+@router.post("/waves", response_model=WavePlanResponse, status_code=201)
+async def create_picking_wave(
+    window_minutes: Optional[int] = Query(
+        default=settings.WAVE_WINDOW_MINUTES, ge=1,
+        description="Only plan orders validated in the last N minutes (default: every queued order)",
+    ),
+    capacity: int = Query(
+        default=settings.CHARIOT_CAPACITY, ge=1,
+        description="Units a chariot carries per tour",
+    ),
+    current_user: Dict[str, Any] = Depends(get_supervisor_user),
+):
+    """
+    Batch validated preparation orders into chariot tours. Supervisor/Admin only.
+
+    Every validated preparation order not yet part of a wave (optionally
+    only those validated in the last *window_minutes*) is allocated to stock locations; the pick lines are clustered into
+    capacity-feasible tours (capacitated vehicle routing).  One grouped
+    picking operation is created per tour, in a single batch write.
+
+    Orders that cannot be fully planned (stock shortfall or unreachable
+    location) are left out of the tours and keep no wave_id, so the next
+    wave retries them.
+    """
+    if plan_wave is None or get_pathfinder is None:
+        from fastapi import HTTPException
+        raise HTTPException(
+            status_code=503,
+            detail="AI wave planning is not available.",
+        )
+
+    now = datetime.utcnow()
+    wave_id = f"WAVE-{now.strftime('%Y%m%d%H%M%S')}"
+    since = (now - timedelta(minutes=window_minutes)).isoformat() if window_minutes else None
+
+    orders = await order_repo.get_wave_candidates(since)
+    if not orders:
+        return WavePlanResponse(wave_id=wave_id)
+
+    expedition_zones = await emplacement_repo.get_expedition_zones()
+    if not expedition_zones:
+        from app.core.exceptions import ValidationError
+        raise ValidationError("No expedition zone available for wave picking")
+    exp = expedition_zones[0]
+    depot = (exp.get("x", 0), exp.get("y", 0), exp.get("floor", 0))
+
+    product_ids = sorted({o["product_id"] for o in orders if o.get("product_id")})
+    locations = await asyncio.gather(
+        *(emplacement_repo.get_product_locations(pid) for pid in product_ids)
+    )
+    locations_by_product = dict(zip(product_ids, locations))
+
+    pathfinder = get_pathfinder()
+    pathfinder.load()
+    lines, shortfalls = allocate_pick_lines(
+        orders, locations_by_product, depot, pathfinder.grid,
+    )
+    # Only orders whose every line is planned join the wave
+    blocked = {s["order_id"] for s in shortfalls}
+    plan = plan_wave(
+        [line for line in lines if line["order_id"] not in blocked],
+        depot, pathfinder.grid, capacity,
+    )
+    unassigned = plan["unassigned"]
+    if unassigned:
+        blocked |= {line["order_id"] for line in unassigned}
+        plan = plan_wave(
+            [line for line in lines if line["order_id"] not in blocked],
+            depot, pathfinder.grid, capacity,
+        )
+    planned = [o for o in orders if o["id"] not in blocked]
+
+    active_employees = await user_repo.get_active_employees(fields=[])
+
+    ops = []
+    for tour in plan["tours"]:
+        picks = [
+            {
+                "order_id": line["order_id"],
+                "product_id": line["product_id"],
+                "quantity": line["quantity"],
+                "source_emplacement_id": line["emplacement_id"],
+            }
+            for stop in tour["stops"]
+            for line in stop["lines"]
+        ]
+        product_set = {p["product_id"] for p in picks}
+        order_set = {p["order_id"] for p in picks}
+        employee = random.choice(active_employees) if active_employees else None
+        ops.append({
+            "type": OperationType.PICKING.value,
+            "status": OperationStatus.PENDING.value,
+            "product_id": product_set.pop() if len(product_set) == 1 else None,
+            "quantity": tour["load"],
+            "employee_id": employee["id"] if employee else None,
+            "chariot_id": None,
+            "order_id": order_set.pop() if len(order_set) == 1 else None,
+            "emplacement_id": None,  # goes back to the expedition zone
+            "source_emplacement_id": picks[0]["source_emplacement_id"],
+            "suggested_route": _tour_route(pathfinder, depot, tour),
+            "wave_id": wave_id,
+            "picks": picks,
+        })
+
+    created_ops = await operation_repo.batch_create(ops) if ops else []
+
+    date = now.isoformat()
+    if created_ops:
+        await operation_log_repo.batch_create([
+            {
+                "operation_id": op["id"],
+                "action": "created",
+                "type": OperationType.PICKING.value,
+                "product_id": op.get("product_id"),
+                "quantity": op.get("quantity", 0),
+                "employee_id": op.get("employee_id"),
+                "order_id": op.get("order_id"),
+                "date": date,
+            }
+            for op in created_ops
+        ])
+    if planned:
+        await order_repo.batch_update({o["id"]: {"wave_id": wave_id} for o in planned})
+
+    logger.info(
+        f"Picking wave {wave_id}: {len(planned)}/{len(orders)} orders planned "
+        f"→ {plan['trips']} tours (was {plan['baseline_trips']} trips)"
+    )
+
+    return WavePlanResponse(
+        wave_id=wave_id,
+        order_ids=[o["id"] for o in planned],
+        operations=[OperationResponse(**op) for op in created_ops],
+        trips=plan["trips"],
+        baseline_trips=plan["baseline_trips"],
+        distance=plan["distance"],
+        baseline_distance=plan["baseline_distance"],
+        shortfalls=shortfalls,
+        unassigned=[
+            {k: v for k, v in line.items() if k != "location"}
+            for line in unassigned
+        ],
+    )
+
+
 # ── HELPER FUNCTIONS ─────────────────────────────────────────────
 
 
+def _tour_route(pathfinder, depot: tuple, tour: Dict[str, Any]) -> Optional[list]:
+    """Chain pathfinder legs depot → stops → depot into one route."""
+    waypoints = [depot] + [stop["location"] for stop in tour["stops"]] + [depot]
+    route: list = []
+    try:
+        for start, goal in zip(waypoints, waypoints[1:]):
+            if start == goal:
+                continue
+            result = pathfinder.find_path(start, goal)
+            if not result:
+                return None
+            route.extend(result["path"][1:] if route else result["path"])
+    except Exception as e:
+        logger.warning(f"Wave route generation failed: {e}")
+        return None
+    return route
+
+
+def _rank_pick_locations(
+    expedition_zones: List[Dict[str, Any]],
+    locations: List[Dict[str, Any]],
+) -> List[tuple]:
+    """
+    Order stocked locations by walking cost from the nearest expedition zone.
+
+    Runs one one-to-many search per zone (usually a single one) instead of an
+    A* per location; routes are traced from the same search.  Unreachable
+    locations come last, ties go to the fullest.  Falls back to fullest-first
+    without routes when the grid is unavailable.
+
+    Returns:
+        List of (location, route) pairs.
+    """
+    stocked = [loc for loc in locations if loc.get("quantity", 0) > 0]
+    stocked.sort(key=lambda loc: loc.get("quantity", 0), reverse=True)
+    if get_pathfinder is None or one_to_many_costs is None or not expedition_zones:
+        return [(loc, None) for loc in stocked]
+
+    def _key(e: Dict[str, Any]) -> tuple:
+        return (e.get("x", 0), e.get("y", 0), e.get("floor", 0))
+
+    best: Dict[tuple, tuple] = {}  # location → (cost, parents)
+    try:
+        pathfinder = get_pathfinder()
+        pathfinder.load()
+        targets = {_key(loc) for loc in stocked}
+        for zone in expedition_zones:
+            parents: Dict[tuple, Optional[tuple]] = {}
+            costs = one_to_many_costs(_key(zone), targets, pathfinder.grid, parents)
+            for target, cost in costs.items():
+                if cost < best.get(target, (float("inf"),))[0]:
+                    best[target] = (cost, parents)
+    except Exception as e:
+        logger.warning(f"Picking route AI failed: {e}")
+        return [(loc, None) for loc in stocked]
+
+    # Stable sort keeps fullest-first among equal costs
+    stocked.sort(key=lambda loc: best.get(_key(loc), (float("inf"),))[0])
+    return [
+        (loc, trace_path(best[_key(loc)][1], _key(loc)) if _key(loc) in best else None)
+        for loc in stocked
+    ]
+
+
 async def _create_receipt_from_order(
     order: Dict[str, Any],
     order_id: str,
@@ -254,7 +504,7 @@ async def _create_receipt_from_order(
     - Logs creation to OperationLog
     """
     # Pick a random active employee
-    active_employees = await user_repo.get_active_employees()
+    active_employees = await user_repo.get_active_employees(fields=[])
     employee_id = None
     if active_employees:
         employee = random.choice(active_employees)
@@ -303,8 +553,10 @@ async def _create_picking_from_preparation(
     """
     Create picking operation(s) triggered by preparation order validation.
 
-    Uses AI picking optimizer to find the best source emplacements for the product
-    and creates one picking operation per source location.
+    Stock locations of the product are ranked by walking cost from the
+    expedition zone (one one-to-many search gives every cost and route),
+    closest first, and one picking operation is created per location used,
+    in a single batch write.
     """
     product_id = order.get("product_id")
     quantity = order.get("quantity", 0)
@@ -313,14 +565,17 @@ async def _create_picking_from_preparation(
         logger.warning(f"Preparation order {order_id} has no product/quantity")
         return
 
-    # Find all emplacements that hold this product
-    product_locations = await emplacement_repo.get_product_locations(product_id)
+    # Find all emplacements that hold this product (zones/employees fetched alongside)
+    product_locations, expedition_zones, active_employees = await asyncio.gather(
+        emplacement_repo.get_product_locations(product_id),
+        emplacement_repo.get_expedition_zones(),
+        user_repo.get_active_employees(fields=[]),
+    )
     if not product_locations:
         logger.warning(f"No stock found for product {product_id} on any emplacement")
         return
 
     # Pick a random active employee for the picking operations
-    active_employees = await user_repo.get_active_employees()
     employee_id = None
     if active_employees:
         employee = random.choice(active_employees)
@@ -329,36 +584,14 @@ async def _create_picking_from_preparation(
     now = datetime.utcnow().isoformat()
     remaining = quantity
 
-    # Sort by quantity descending (pick from fullest first)
-    product_locations.sort(key=lambda loc: loc.get("quantity", 0), reverse=True)
-
-    for loc in product_locations:
+    ops = []
+    for loc, suggested_route in _rank_pick_locations(expedition_zones, product_locations):
         if remaining <= 0:
             break
-        loc_qty = loc.get("quantity", 0)
-        if loc_qty <= 0:
-            continue
-
-        pick_qty = min(remaining, loc_qty)
+        pick_qty = min(remaining, loc.get("quantity", 0))
         remaining -= pick_qty
 
-        # Try AI route (expedition zone → source slot)
-        suggested_route = None
-        try:
-            if get_pathfinder is not None:
-                expedition_zones = await emplacement_repo.get_expedition_zones()
-                if expedition_zones:
-                    exp = expedition_zones[0]
-                    pathfinder = get_pathfinder()
-                    start = (exp.get("x", 0), exp.get("y", 0), exp.get("floor", 0))
-                    goal = (loc.get("x", 0), loc.get("y", 0), loc.get("floor", 0))
-                    result = pathfinder.find_path(start, goal)
-                    if result:
-                        suggested_route = result.get("path")
-        except Exception as e:
-            logger.warning(f"Picking route AI failed: {e}")
-
-        op_data = {
+        ops.append({
             "type": OperationType.PICKING.value,
             "status": OperationStatus.PENDING.value,
             "product_id": product_id,
@@ -369,23 +602,29 @@ async def _create_picking_from_preparation(
             "emplacement_id": None,  # no destination (goes to expedition zone)
             "source_emplacement_id": loc.get("id"),
             "suggested_route": suggested_route,
-        }
-        created_op = await operation_repo.create(op_data)
-
-        await operation_log_repo.create({
-            "operation_id": created_op["id"],
-            "action": "created",
-            "type": OperationType.PICKING.value,
-            "product_id": product_id,
-            "quantity": pick_qty,
-            "employee_id": employee_id,
-            "order_id": order_id,
-            "date": now,
         })
 
+    created_ops = await operation_repo.batch_create(ops) if ops else []
+    if created_ops:
+        await operation_log_repo.batch_create([
+            {
+                "operation_id": created_op["id"],
+                "action": "created",
+                "type": OperationType.PICKING.value,
+                "product_id": product_id,
+                "quantity": created_op["quantity"],
+                "employee_id": employee_id,
+                "order_id": order_id,
+                "date": now,
+            }
+            for created_op in created_ops
+        ])
+
+    for created_op in created_ops:
         logger.info(
             f"Picking operation {created_op['id']} created for preparation order {order_id}: "
-            f"{pick_qty}x {product_id} from emplacement {loc.get('id')}"
+            f"{created_op['quantity']}x {product_id} from emplacement "
+            f"{created_op['source_emplacement_id']}"
         )
 
     if remaining > 0:
@@ -2,13 +2,15 @@
 Report routes: CRUD for operation anomaly reports and statistics.
 """
 
+import asyncio
 from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
 from app.repositories.report_repository import ReportRepository
 from app.schemas.report import ReportCreate, ReportResponse
 from app.utils.dependencies import get_supervisor_user, get_current_user
+from app.utils.helpers import page_of
 
 router = APIRouter()
 report_repo = ReportRepository()
@@ -16,16 +18,21 @@ report_repo = ReportRepository()
 
 @router.get("/", response_model=List[ReportResponse])
 async def list_reports(
+    response: Response,
     operation_id: Optional[str] = Query(default=None, description="Filter by operation"),
     damage_only: bool = Query(default=False, description="Only reports with physical damage"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor of the previous page"),
+    page_size: Optional[int] = Query(default=None, ge=1, le=1000, description="Page size (default: all)"),
     _supervisor: Dict[str, Any] = Depends(get_supervisor_user),
 ):
-    """Get all reports with optional filters. Supervisor/Admin only."""
+    """Get all reports with optional filters, optionally one page at a time. Supervisor/Admin only."""
     reports = await report_repo.get_filtered(
         operation_id=operation_id,
         damage_only=damage_only,
+        limit=page_size + 1 if page_size else None,
+        start_after=cursor,
     )
-    return [ReportResponse(**r) for r in reports]
+    return [ReportResponse(**r) for r in page_of(reports, page_size, response)]
 
 
 @router.get("/{report_id}", response_model=ReportResponse)
@@ -77,15 +84,21 @@ async def get_report_statistics(
     Get summary statistics for all reports. Supervisor/Admin only.
 
     Returns counts of total reports, damage reports, missing quantities, etc.
+    Computed with server-side aggregation queries (no report is read).
     """
-    all_reports = await report_repo.get_all()
-
-    total = len(all_reports)
-    damage_count = sum(1 for r in all_reports if r.get("physical_damage", False))
-    total_missing = sum(r.get("missing_quantity", 0) for r in all_reports)
-    total_extra = sum(r.get("extra_quality", 0) for r in all_reports)
-    with_missing = sum(1 for r in all_reports if r.get("missing_quantity", 0) > 0)
-    with_extra = sum(1 for r in all_reports if r.get("extra_quality", 0) > 0)
+    totals, damage_count, with_missing, with_extra = await asyncio.gather(
+        report_repo.aggregate({
+            "total": ("count",),
+            "missing": ("sum", "missing_quantity"),
+            "extra": ("sum", "extra_quality"),
+        }),
+        report_repo.count([("physical_damage", "==", True)]),
+        report_repo.count([("missing_quantity", ">", 0)]),
+        report_repo.count([("extra_quality", ">", 0)]),
+    )
+    total = totals["total"]
+    total_missing = totals["missing"]
+    total_extra = totals["extra"]
 
     return {
         "total_reports": total,
@@ -161,17 +161,12 @@ async def get_updates(
         "stock_ledger": ledger_repo,
     }
 
+    # Every write sets updated_at (>= created_at): filter server-side and
+    # read page by page instead of loading whole collections
+    filters = [("updated_at", ">", since)] if since else None
     for entity_name, repo in repos_map.items():
         try:
-            all_records = await repo.get_all()
-            if since:
-                records = [
-                    r for r in all_records
-                    if r.get("updated_at", "") > since or r.get("created_at", "") > since
-                ]
-            else:
-                records = all_records
-            result[entity_name] = records
+            result[entity_name] = [r async for r in repo.stream(filters)]
         except Exception as e:
             logger.error(f"Error fetching {entity_name} updates: {e}")
             result[entity_name] = []
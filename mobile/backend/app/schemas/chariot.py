@@ -14,6 +14,9 @@ class ChariotCreate(BaseModel):
 class ChariotUpdate(BaseModel):
     """Schema for updating a chariot."""
     is_active: Optional[bool] = None
+    last_x: Optional[int] = None
+    last_y: Optional[int] = None
+    last_floor: Optional[int] = None
 
 
 class ChariotResponse(BaseModel):
@@ -21,6 +24,9 @@ class ChariotResponse(BaseModel):
     id: str
     is_active: bool
     assigned_to_operation_id: Optional[str] = None
+    last_x: Optional[int] = None
+    last_y: Optional[int] = None
+    last_floor: Optional[int] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
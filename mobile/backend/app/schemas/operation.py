@@ -42,6 +42,8 @@ class OperationResponse(BaseModel):
     emplacement_id: Optional[str] = None
     source_emplacement_id: Optional[str] = None
     suggested_route: Optional[list] = None
+    wave_id: Optional[str] = None
+    picks: Optional[list] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
@@ -54,6 +54,7 @@ class OrderResponse(BaseModel):
     override_reason: Optional[str] = None
     completed_at: Optional[str] = None
     completed_by: Optional[str] = None
+    wave_id: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
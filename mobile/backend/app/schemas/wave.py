@@ -0,0 +1,21 @@
+"""
+Wave picking schemas for request/response validation.
+"""
+
+from typing import List
+from pydantic import BaseModel, Field
+
+from app.schemas.operation import OperationResponse
+
+
+class WavePlanResponse(BaseModel):
+    """Schema for a planned picking wave."""
+    wave_id: str
+    order_ids: List[str] = Field(default_factory=list)
+    operations: List[OperationResponse] = Field(default_factory=list)
+    trips: int = 0
+    baseline_trips: int = 0
+    distance: float = 0.0
+    baseline_distance: float = 0.0
+    shortfalls: List[dict] = Field(default_factory=list)
+    unassigned: List[dict] = Field(default_factory=list)
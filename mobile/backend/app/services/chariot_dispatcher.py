@@ -0,0 +1,175 @@
+"""
+Chariot dispatching by proximity.
+
+Keeps an in-memory index of the active fleet (refreshed from Firestore every
+CHARIOT_INDEX_TTL_SECONDS and kept in sync by the chariot routes) so that an
+approval no longer scans the whole collection.  The free chariot closest to
+the operation's source emplacement, by walking distance on the warehouse
+grid, is dispatched; chariots without a known position are used last.
+
+The index may be stale (other workers dispatch too), so a chariot is only
+claimed by a conditional update requiring it to be still free and active;
+on conflict it leaves the index and the next nearest one is tried.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config.settings import settings
+from app.core.exceptions import NotFoundError
+from app.repositories.chariot_repository import ChariotRepository
+from app.utils.logger import logger
+
+# Lazy AI imports – falls back to id order if the grid is unavailable
+try:
+    from app.ai import get_pathfinder
+    from app.ai.route_sequencer import one_to_many_costs
+except Exception:
+    get_pathfinder = None  # type: ignore[assignment]
+    one_to_many_costs = None  # type: ignore[assignment]
+
+Position = Tuple[int, int, int]
+
+
+def chariot_position(chariot: Dict[str, Any]) -> Optional[Position]:
+    """Last known (x, y, floor) of a chariot, or None if never recorded."""
+    if chariot.get("last_x") is None or chariot.get("last_y") is None:
+        return None
+    return (chariot["last_x"], chariot["last_y"], chariot.get("last_floor") or 0)
+
+
+class ChariotDispatcher:
+    """Assigns and releases chariots, tracking their last known position."""
+
+    def __init__(self, repo: Optional[ChariotRepository] = None):
+        self.repo = repo or ChariotRepository()
+        self._chariots: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    # ── index maintenance ────────────────────────────────────────
+
+    async def _ensure_fresh(self) -> None:
+        ttl = settings.CHARIOT_INDEX_TTL_SECONDS
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+            return
+        active = await self.repo.get_active_chariots()
+        self._chariots = {c["id"]: dict(c) for c in active}
+        self._loaded_at = time.monotonic()
+        logger.info(f"Chariot index refreshed: {len(self._chariots)} active chariots")
+
+    def upsert(self, chariot: Dict[str, Any]) -> None:
+        """Record a created/updated chariot (inactive ones leave the index)."""
+        if chariot.get("is_active", True):
+            self._chariots[chariot["id"]] = dict(chariot)
+        else:
+            self._chariots.pop(chariot["id"], None)
+
+    def remove(self, chariot_id: str) -> None:
+        """Drop a deleted chariot from the index."""
+        self._chariots.pop(chariot_id, None)
+
+    def invalidate(self) -> None:
+        """Force a reload from Firestore on the next dispatch."""
+        self._loaded_at = None
+
+    # ── dispatch / release ───────────────────────────────────────
+
+    @staticmethod
+    def _grid() -> Optional[Dict[Position, dict]]:
+        if get_pathfinder is None:
+            return None
+        try:
+            pathfinder = get_pathfinder()
+            pathfinder.load()
+            return pathfinder.grid or None
+        except Exception as e:
+            logger.warning(f"Chariot dispatch grid unavailable: {e}")
+            return None
+
+    def _by_distance(self, free: list, origin: Optional[Position]) -> list:
+        """Free chariots, nearest to *origin* first."""
+        costs: Dict[Position, float] = {}
+        positions = {chariot_position(c) for c in free} - {None}
+        if origin is not None and positions and one_to_many_costs is not None:
+            grid = self._grid()
+            if grid:
+                costs = one_to_many_costs(origin, positions, grid)
+        return sorted(
+            free,
+            key=lambda c: (costs.get(chariot_position(c), math.inf), c["id"]),
+        )
+
+    async def _claim(self, chariot_id: str, operation_id: str) -> Optional[Dict[str, Any]]:
+        """Assign a chariot if it is still free and active in Firestore."""
+        try:
+            return await self.repo.update_if(
+                chariot_id,
+                {"assigned_to_operation_id": operation_id},
+                expected={"assigned_to_operation_id": None, "is_active": True},
+            )
+        except NotFoundError:
+            return None
+
+    async def dispatch(
+        self, operation_id: str, origin: Optional[Position] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Assign the free chariot nearest to *origin* to an operation.
+
+        Args:
+            operation_id: Operation receiving the chariot.
+            origin: (x, y, floor) of the operation's source emplacement.
+
+        Returns:
+            The assigned chariot, or None if none is free.
+        """
+        async with self._lock:
+            await self._ensure_fresh()
+            free = [
+                c for c in self._chariots.values()
+                if not c.get("assigned_to_operation_id")
+            ]
+            for candidate in self._by_distance(free, origin):
+                chariot = await self._claim(candidate["id"], operation_id)
+                if chariot is None:
+                    # Taken, deactivated or deleted elsewhere since the last refresh
+                    logger.info(f"Chariot {candidate['id']} no longer free, trying the next one")
+                    self._chariots.pop(candidate["id"], None)
+                    continue
+                self._chariots[chariot["id"]] = chariot
+                logger.info(
+                    f"Chariot {chariot['id']} dispatched to operation {operation_id} "
+                    f"(at {chariot_position(chariot)}, origin {origin})"
+                )
+                return dict(chariot)
+
+            logger.warning(f"No available chariots for operation {operation_id}")
+            return None
+
+    async def release(
+        self, chariot_id: str, position: Optional[Position] = None
+    ) -> None:
+        """
+        Free a chariot, recording where it was left if *position* is known.
+        """
+        data: Dict[str, Any] = {"assigned_to_operation_id": None}
+        if position is not None:
+            data.update({"last_x": position[0], "last_y": position[1], "last_floor": position[2]})
+        await self.repo.update(chariot_id, data, nullable=("assigned_to_operation_id",))
+        async with self._lock:
+            if chariot_id in self._chariots:
+                self._chariots[chariot_id].update(data)
+
+
+# Singleton
+_dispatcher: Optional[ChariotDispatcher] = None
+
+
+def get_chariot_dispatcher() -> ChariotDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = ChariotDispatcher()
+    return _dispatcher
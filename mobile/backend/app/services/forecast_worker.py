@@ -0,0 +1,238 @@
+"""
+Long-lived forecasting worker process.
+
+The Hurdle pipeline runs in a separate process that imports pandas and
+scikit-learn once and keeps the trained model and the prepared history in
+memory between requests. The API sends requests through a multiprocessing
+queue and gets the orders back as records, with no interpreter start-up and
+no temporary CSV round trip.
+
+A worker that does not answer within FORECAST_TIMEOUT_SECONDS (start-up or
+request) is terminated; the next request starts a fresh one.
+"""
+
+import asyncio
+import atexit
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config.settings import settings
+from app.utils.logger import logger
+
+
+# ── worker process side ──────────────────────────────────────────
+
+
+def _worker_main(
+    requests, responses, model_path: str, retrain_policy: str, cache_dir: str,
+    model_name: str, backend: str, lean: bool,
+) -> None:
+    """Warm up, then serve forecast requests until a None message arrives."""
+    import pandas as pd
+    from app.ai.forecasting import fill_missing_dates, generate_orders_hurdle
+    from app.ai.forecasting.data_loader import load_history
+    from app.ai.forecasting.model_store import load_model
+    from app.ai.forecasting.models import make_model_factory
+
+    factory = make_model_factory(model_name, backend)
+    load_model(model_path)  # keep the artefact in the in-process cache
+    responses.put(("ready", None, os.getpid()))
+
+    history: Dict[str, tuple] = {}  # input path → (mtime, filled history)
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        request_id, input_path, frequency_days = message
+        try:
+            mtime = os.path.getmtime(input_path)
+            cached = history.get(input_path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, fill_missing_dates(load_history(input_path, cache_dir)))
+                history[input_path] = cached
+
+            orders = generate_orders_hurdle(
+                cached[1], model_path=model_path, retrain_policy=retrain_policy,
+                model_factory=factory, lean=lean,
+            )
+            frequency = {}
+            if frequency_days:
+                daily = cached[1]
+                recent = daily[daily["date"] > daily["date"].max() - pd.Timedelta(days=frequency_days)]
+                frequency = (
+                    (recent["quantity"] > 0)
+                    .groupby(recent["product_id"].astype(str)).sum() / frequency_days
+                ).to_dict()
+            records = [
+                {
+                    "product_id": str(row["product_id"]),
+                    "quantity": int(row["quantity"]),
+                    "order_date": row["order_date"].strftime("%Y-%m-%d"),
+                    "status": row["status"],
+                    "source": row["source"],
+                    **({"demand_frequency": float(frequency.get(str(row["product_id"]), 0.0))}
+                       if frequency_days else {}),
+                }
+                for row in orders.to_dict("records")
+            ]
+            responses.put(("ok", request_id, records))
+        except Exception as e:
+            responses.put(("error", request_id, f"{type(e).__name__}: {e}"))
+
+
+# ── API side ─────────────────────────────────────────────────────
+
+
+class ForecastWorker:
+    """Handle on the forecasting process; requests are served one at a time."""
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        retrain_policy: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        lean: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.model_path = model_path or settings.FORECAST_MODEL_PATH
+        self.retrain_policy = retrain_policy or settings.FORECAST_RETRAIN_POLICY
+        self.cache_dir = cache_dir or settings.FORECAST_CACHE_DIR
+        self.model_name = model_name or settings.FORECAST_MODEL
+        self.backend = backend or settings.FORECAST_BACKEND
+        self.lean = settings.FORECAST_LEAN_MEMORY if lean is None else lean
+        self.timeout = timeout or settings.FORECAST_TIMEOUT_SECONDS
+        self._ctx = mp.get_context("spawn")
+        self._process = None
+        self._requests = None
+        self._responses = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        atexit.register(self.stop)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _receive(self) -> Any:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._terminate()
+                raise TimeoutError(f"Forecast timeout (>{self.timeout:.0f} s), worker restarted")
+            try:
+                status, _, payload = self._responses.get(timeout=min(1.0, remaining))
+            except queue.Empty:
+                if not self.alive:
+                    self._process = None
+                    raise RuntimeError("Forecast worker exited unexpectedly")
+                continue
+            if status == "error":
+                raise RuntimeError(payload)
+            return payload
+
+    def _terminate(self) -> None:
+        # Its queues go with it: a late answer can never be read
+        self._process.terminate()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.kill()
+        self._process = None
+        logger.warning(f"Forecast worker terminated after {self.timeout:.0f} s without answer")
+
+    def _start(self) -> None:
+        if self.alive:
+            return
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                self._requests, self._responses,
+                self.model_path, self.retrain_policy, self.cache_dir,
+                self.model_name, self.backend, self.lean,
+            ),
+            name="forecast-worker",
+            # Not a daemon: scikit-learn falls back to n_jobs=1 in daemonic processes
+            daemon=False,
+        )
+        self._process.start()
+        pid = self._receive()
+        logger.info(f"Forecast worker ready (pid {pid})")
+
+    def start(self) -> None:
+        """Start the worker and wait until imports and model are loaded."""
+        with self._lock:
+            self._start()
+
+    def stop(self) -> None:
+        """Ask the worker to exit and wait for it."""
+        with self._lock:
+            if not self.alive:
+                return
+            self._requests.put(None)
+            self._process.join(timeout=10)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+            logger.info("Forecast worker stopped")
+
+    def _forecast(
+        self, input_path: str, frequency_days: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._start()
+            request_id = next(self._ids)
+            self._requests.put((request_id, input_path, frequency_days))
+            return self._receive()
+
+    async def warm_up(self) -> None:
+        """Start the worker without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.start)
+
+    async def forecast(
+        self, input_path: str, frequency_days: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Forecast next-day preparation orders from a demand history file.
+
+        Args:
+            input_path: Demand history (CSV or DataPack workbook).
+            frequency_days: If set, each record also carries
+                'demand_frequency', the share of the last N days on which
+                the product was in demand.
+
+        Returns:
+            Order records with 'product_id', 'quantity', 'order_date',
+            'status' and 'source'.
+
+        Raises:
+            TimeoutError if no answer within FORECAST_TIMEOUT_SECONDS.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._forecast, str(input_path), frequency_days
+        )
+
+
+# Singleton
+_worker: Optional[ForecastWorker] = None
+
+
+def get_forecast_worker() -> ForecastWorker:
+    global _worker
+    if _worker is None:
+        _worker = ForecastWorker()
+    return _worker
+
+
+def shutdown_forecast_worker() -> None:
+    """Stop the worker if it was ever started (application shutdown)."""
+    if _worker is not None:
+        _worker.stop()
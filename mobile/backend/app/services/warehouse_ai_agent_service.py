@@ -7,8 +7,6 @@ Place in: app/services/warehouse_ai_agent_service.py
 Fixed: Correct paths for grid files and forecast script
 """
 
-import subprocess
-import csv
 import json
 import os
 from datetime import datetime, timedelta
@@ -17,6 +15,7 @@ from pathlib import Path
 
 # Import AI modules
 from app.ai.storage_optimizer import StorageOptimizer
+from app.services.forecast_worker import get_forecast_worker
 
 class WarehouseAIAgent:
     """
@@ -37,7 +36,6 @@ class WarehouseAIAgent:
         # Define file paths
         self.grid_storage_path = self.backend_root / "gridItem.json"
         self.grid_ground_path = self.backend_root / "grid0.json"
-        self.forecast_script_path = self.backend_root / "run_forecast.py"
         self.forecast_input_path = self.backend_root / "historique_demande.csv"
         
         print(f"   Backend root: {self.backend_root}")
@@ -195,19 +193,15 @@ class WarehouseAIAgent:
     async def run_daily_forecast(self, target_date: Optional[str] = None) -> Dict:
         """
         Run daily demand forecasting using YOUR Hurdle Model
+
+        The model runs in the long-lived forecast worker process, which keeps
+        its imports, the demand history and the trained model in memory.
         """
         if not target_date:
             target_date = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
         
         print(f"🤖 Running forecast for {target_date}...")
         
-        # Check if forecast script exists
-        if not self.forecast_script_path.exists():
-            raise FileNotFoundError(
-                f"Forecast script not found at: {self.forecast_script_path}\n"
-                f"Please place run_forecast.py in the backend root directory"
-            )
-        
         # Check if input file exists
         if not self.forecast_input_path.exists():
             raise FileNotFoundError(
@@ -215,77 +209,38 @@ class WarehouseAIAgent:
                 f"Please place historique_demande.csv in the backend root directory"
             )
         
-        # Prepare paths
-        temp_input_path = self.backend_root / "temp_forecast_input.csv"
-        output_path = self.backend_root / f"forecast_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv"
-        
-        # Copy input file
-        import shutil
-        shutil.copy(str(self.forecast_input_path), str(temp_input_path))
+        try:
+            orders = await get_forecast_worker().forecast(str(self.forecast_input_path))
+        except Exception as e:
+            raise Exception(f"Forecasting failed: {str(e)}")
         
-        # Run forecast script
-        cmd = [
-            "python",
-            str(self.forecast_script_path),
-            str(temp_input_path),
-            str(output_path)
+        predictions = [
+            {
+                'product_id': row['product_id'],
+                'predicted_quantity': row['quantity'],
+                'order_date': row['order_date'],
+                'confidence': 0.8,
+                'source': row['source'],
+                'status': row.get('status', 'to_validate')
+            }
+            for row in orders
         ]
         
-        print(f"   Running: {' '.join(cmd)}")
+        decision = {
+            'forecast_id': f"FORECAST-{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            'target_date': target_date,
+            'method': 'Hurdle_RandomForest',
+            'predictions': predictions,
+            'total_predicted_quantity': sum(p['predicted_quantity'] for p in predictions),
+            'ai_generated': True,
+            'timestamp': datetime.now().isoformat()
+        }
         
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                cwd=str(self.backend_root)  # Run in backend root directory
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"Forecast script failed:\nSTDOUT: {result.stdout}\nSTDERR: {result.stderr}")
-            
-            # Read results
-            if not output_path.exists():
-                raise Exception(f"Forecast output file not created at: {output_path}")
-            
-            predictions = []
-            with open(output_path, newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    predictions.append({
-                        'product_id': str(row['product_id']),
-                        'predicted_quantity': int(row['quantity']),
-                        'order_date': row['order_date'],
-                        'confidence': 0.8,
-                        'source': row['source'],
-                        'status': row.get('status', 'to_validate')
-                    })
-            
-            decision = {
-                'forecast_id': f"FORECAST-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                'target_date': target_date,
-                'method': 'Hurdle_RandomForest',
-                'predictions': predictions,
-                'total_predicted_quantity': sum(p['predicted_quantity'] for p in predictions),
-                'ai_generated': True,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            self.decision_history.append(decision)
-            
-            # Clean up temp files
-            if temp_input_path.exists():
-                temp_input_path.unlink()
-            
-            print(f"   ✅ Forecast complete: {len(predictions)} products predicted")
-            
-            return decision
-            
-        except subprocess.TimeoutExpired:
-            raise Exception("Forecast timeout (>5 minutes)")
-        except Exception as e:
-            raise Exception(f"Forecasting failed: {str(e)}")
+        self.decision_history.append(decision)
+        
+        print(f"   ✅ Forecast complete: {len(predictions)} products predicted")
+        
+        return decision
     
     # ============= HELPER METHODS =============
     
@@ -3,7 +3,7 @@ Helper utilities: distance calculators, formatting, etc.
 """
 
 import math
-from typing import Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def euclidean_distance(
@@ -94,3 +94,19 @@ def format_datetime(dt) -> str:
     if isinstance(dt, str):
         return dt
     return dt.isoformat()
+
+
+def page_of(
+    items: List[Dict[str, Any]], page_size: Optional[int], response
+) -> List[Dict[str, Any]]:
+    """
+    Trim documents fetched with limit=page_size + 1 to one page.
+
+    When more documents remain, the ID of the page's last document is set
+    as the ``X-Next-Cursor`` response header; clients pass it back as
+    ``cursor`` to get the next page.
+    """
+    if page_size is not None and len(items) > page_size:
+        items = items[:page_size]
+        response.headers["X-Next-Cursor"] = items[-1]["id"]
+    return items
@@ -3,6 +3,9 @@ Warehouse Management System - FastAPI Backend
 Main application entry point.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,9 +27,35 @@ from app.routes import (
     sync,
     ai_agent,
 )
+from app.services.forecast_worker import get_forecast_worker, shutdown_forecast_worker
 from app.utils.logger import logger
 
 
+def _warm_up_ai() -> None:
+    """Load the deferred AI modules and build the agent before the first request."""
+    from app.ai import warm_up
+    from app.services.warehouse_ai_agent_service import get_ai_agent
+
+    get_ai_agent()
+    warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services."""
+    if settings.FORECAST_WORKER_PRELOAD:
+        asyncio.create_task(get_forecast_worker().warm_up())
+    if settings.AI_WARMUP:
+        asyncio.create_task(asyncio.to_thread(_warm_up_ai))
+    yield
+    shutdown_forecast_worker()
+    try:
+        from app.ai.forecasting.feature_store import save_feature_store
+        save_feature_store()
+    except Exception as e:
+        logger.warning(f"Feature store not saved: {e}")
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(
@@ -35,6 +64,7 @@ def create_app() -> FastAPI:
         description="Warehouse Management System with AI Optimization",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # CORS middleware
@@ -70,6 +100,7 @@ def create_app() -> FastAPI:
     async def root():
         """Health check endpoint."""
         from app.config.firebase import is_firebase_enabled
+        from app.repositories.cache import cache_stats
         
         firebase_status = "connected" if is_firebase_enabled() else "disabled (development mode)"
         
@@ -78,7 +109,9 @@ def create_app() -> FastAPI:
             "app": settings.APP_NAME, 
             "version": settings.APP_VERSION,
             "firebase": firebase_status,
-            "mode": "production" if is_firebase_enabled() else "development"
+            "database": settings.DATABASE_BACKEND,
+            "mode": "production" if is_firebase_enabled() else "development",
+            "repository_cache": cache_stats() if settings.REPOSITORY_CACHE_ENABLED else "disabled",
         }
 
     logger.info(f"Application '{settings.APP_NAME}' v{settings.APP_VERSION} initialized.")
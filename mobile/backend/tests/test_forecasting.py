@@ -0,0 +1,88 @@
+"""
+Tests for the saved forecasting model (model_store + generate).
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ai.forecasting.benchmark import synthetic_demand
+from app.ai.forecasting.generate import forecast_horizon, generate_orders_hurdle
+from app.ai.forecasting.models import make_model_factory
+from app.ai.forecasting.preprocessing import fill_missing_dates
+from app.services.forecast_worker import ForecastWorker
+
+
+class RecordingModel:
+    """fit/predict stand-in that records the product_enc it is given."""
+
+    seen = []
+
+    def fit(self, X, y):
+        return self
+
+    def predict(self, X):
+        RecordingModel.seen.append(X["product_enc"].tolist())
+        return np.ones(len(X))
+
+
+def _history(products, days=40):
+    dates = pd.date_range("2026-01-01", periods=days, freq="D")
+    return pd.DataFrame({
+        "date": np.repeat(dates, len(products)),
+        "product_id": np.tile(products, days),
+        "quantity": np.arange(days * len(products)) % 5,
+    })
+
+
+class TestSavedModelReuse:
+    def test_reused_model_keeps_product_codes_after_new_product(self, tmp_path):
+        model_path = str(tmp_path / "hurdle.joblib")
+        trained = _history(["P2", "P3", "P4"])
+
+        generate_orders_hurdle(trained, model_path=model_path, model_factory=RecordingModel)
+        assert RecordingModel.seen[-1] == [0, 1, 2]
+
+        # "P1" sorts first: a fresh factorize would shift every code by one
+        daily = pd.concat([trained, _history(["P1"])], ignore_index=True)
+        RecordingModel.seen.clear()
+        orders = generate_orders_hurdle(daily, model_path=model_path, model_factory=RecordingModel)
+
+        assert len(RecordingModel.seen) == 1  # reused, not retrained
+        assert RecordingModel.seen[0] == [-1, 0, 1, 2]
+        assert sorted(orders["product_id"]) == ["P1", "P2", "P3", "P4"]
+
+        RecordingModel.seen.clear()
+        forecast_horizon(daily, horizon=2, model_path=model_path, model_factory=RecordingModel)
+        assert RecordingModel.seen == [[-1, 0, 1, 2], [-1, 0, 1, 2]]
+
+
+class TestLeanMode:
+    def test_lean_forest_matches_standard(self):
+        daily = fill_missing_dates(synthetic_demand(20, 120))
+        for kind in ("hurdle", "tiered"):
+            factory = make_model_factory(kind, "forest")
+            lean = generate_orders_hurdle(daily, model_factory=factory, lean=True)
+            standard = generate_orders_hurdle(daily, model_factory=factory)
+            assert len(lean) > 0
+            assert lean[["product_id", "quantity"]].equals(standard[["product_id", "quantity"]])
+
+
+class TestForecastWorker:
+    def test_stuck_worker_times_out_and_is_terminated(self):
+        worker = ForecastWorker(timeout=1)
+        # A live process that never answers
+        stuck = worker._ctx.Process(target=time.sleep, args=(60,), daemon=True)
+        stuck.start()
+        worker._process, worker._requests, worker._responses = stuck, worker._ctx.Queue(), worker._ctx.Queue()
+
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            worker._forecast("history.csv")
+        assert time.monotonic() - start < 10
+        assert worker._process is None
+        stuck.join(timeout=5)
+        assert not stuck.is_alive()
+        assert not worker._lock.locked()
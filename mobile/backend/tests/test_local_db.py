@@ -0,0 +1,189 @@
+"""
+Tests for BaseRepository on the local SQLite backend (DATABASE_BACKEND="memory"),
+plus stream() cursors checked against the Firestore query builder.
+"""
+
+import asyncio
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from app.config import firebase
+from app.config.local_db import LocalDocument
+from app.config.settings import settings
+from app.repositories.base_repository import BaseRepository
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    """Repository on a fresh in-memory database."""
+    monkeypatch.setattr(settings, "DATABASE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "REPOSITORY_CACHE_ENABLED", False)
+    monkeypatch.setattr(firebase, "_local_db", None)
+    return BaseRepository("stock")
+
+
+def _seed(repo, docs):
+    async def seed():
+        for doc_id, data in docs.items():
+            await repo.create_with_id(doc_id, dict(data))
+    asyncio.run(seed())
+
+
+class TestQueries:
+    def test_create_query_and_aggregate(self, repo):
+        _seed(repo, {
+            "a": {"kind": "bolt", "qty": 5, "seq": 1},
+            "b": {"kind": "bolt", "qty": 7, "seq": 2, "note": None},
+            "c": {"kind": "nut", "qty": 2.5, "seq": 3, "note": "x"},
+            "d": {"kind": "nut", "qty": "n/a", "seq": 4},
+        })
+
+        async def run():
+            assert (await repo.get_by_id("a"))["qty"] == 5
+            bolts = await repo.query(filters=[("kind", "==", "bolt")], order_by="seq")
+            assert [d["id"] for d in bolts] == ["a", "b"]
+            desc = await repo.query(filters=[("seq", ">=", 2)], order_by="seq", direction="DESCENDING")
+            assert [d["id"] for d in desc] == ["d", "c", "b"]
+            assert {d["id"] for d in await repo.query(filters=[("kind", "in", ["nut"])])} == {"c", "d"}
+            # Missing and null fields both match == None
+            assert {d["id"] for d in await repo.query(filters=[("note", "==", None)])} == {"a", "b", "d"}
+            assert [d["id"] for d in await repo.query(filters=[("note", "!=", None)])] == ["c"]
+            # Ordering excludes documents without the field
+            assert [d["id"] for d in await repo.query(order_by="note")] == ["c"]
+
+            assert await repo.count() == 4
+            assert await repo.count([("kind", "==", "nut")]) == 2
+            assert await repo.sum("qty") == 14.5  # non-numeric values ignored
+            assert await repo.avg("qty", [("kind", "==", "bolt")]) == 6
+            assert await repo.avg("qty", [("kind", "==", "washer")]) is None
+
+        asyncio.run(run())
+
+    def test_paged_query_returns_every_document_once(self, repo):
+        docs = {f"doc-{i:02d}": {"kind": "bolt" if i % 4 else "nut", "rank": i % 5} for i in range(30)}
+        docs["doc-unranked"] = {"kind": "bolt"}
+        _seed(repo, docs)
+        filters = [("kind", "==", "bolt")]
+
+        async def run():
+            full = await repo.query(filters=filters, order_by="rank", direction="DESCENDING")
+            pages, cursor = [], None
+            while True:
+                page = await repo.query(
+                    filters=filters, order_by="rank", direction="DESCENDING",
+                    limit=4, start_after=cursor,
+                )
+                pages.extend(page)
+                if len(page) < 4:
+                    break
+                cursor = page[-1]["id"]
+            streamed = [d async for d in repo.stream(
+                filters=filters, order_by="rank", direction="DESCENDING", page_size=3,
+            )]
+            return full, pages, streamed
+
+        full, pages, streamed = asyncio.run(run())
+        expected = sorted(
+            (doc_id for doc_id, d in docs.items() if d["kind"] == "bolt" and "rank" in d),
+            key=lambda doc_id: (-docs[doc_id]["rank"], doc_id),
+        )
+        assert [d["id"] for d in full] == expected
+        assert [d["id"] for d in pages] == expected
+        assert [d["id"] for d in streamed] == expected
+
+    def test_invalid_cursor(self, repo):
+        from app.core.exceptions import ValidationError
+
+        with pytest.raises(ValidationError):
+            asyncio.run(repo.query(start_after="missing"))
+
+    def test_projection(self, repo):
+        _seed(repo, {
+            "a": {"kind": "bolt", "qty": 5, "tags": ["x"]},
+            "b": {"kind": "nut", "active": True},
+        })
+        docs = asyncio.run(repo.query(fields=["qty", "tags", "active"]))
+        assert docs == [
+            {"qty": 5, "tags": ["x"], "id": "a"},
+            {"active": True, "id": "b"},
+        ]
+        assert asyncio.run(repo.get_all(fields=[])) == [{"id": "a"}, {"id": "b"}]
+
+
+class TestWrites:
+    def test_update_if_loses_race(self, repo, monkeypatch):
+        _seed(repo, {"chariot-1": {"assigned_to_operation_id": None}})
+        original = LocalDocument.update
+
+        async def racing_update(self, data, option=None):
+            # Another worker claims the chariot between our read and our write
+            self._collection._update(self.id, {"assigned_to_operation_id": "op-other"})
+            await original(self, data, option)
+
+        monkeypatch.setattr(LocalDocument, "update", racing_update)
+        claimed = asyncio.run(repo.update_if(
+            "chariot-1", {"assigned_to_operation_id": "op-1"},
+            expected={"assigned_to_operation_id": None},
+        ))
+        monkeypatch.setattr(LocalDocument, "update", original)
+
+        assert claimed is None
+        assert asyncio.run(repo.get_by_id("chariot-1"))["assigned_to_operation_id"] == "op-other"
+        # The condition no longer holds: refused without writing
+        assert asyncio.run(repo.update_if(
+            "chariot-1", {"assigned_to_operation_id": "op-1"},
+            expected={"assigned_to_operation_id": None},
+        )) is None
+
+    def test_update_if_wins_when_unchanged(self, repo):
+        _seed(repo, {"chariot-1": {}})
+        claimed = asyncio.run(repo.update_if(
+            "chariot-1", {"assigned_to_operation_id": "op-1"},
+            expected={"assigned_to_operation_id": None},
+        ))
+        assert claimed["assigned_to_operation_id"] == "op-1"
+        assert asyncio.run(repo.get_by_id("chariot-1"))["assigned_to_operation_id"] == "op-1"
+
+    def test_failed_batch_is_rolled_back(self, repo):
+        _seed(repo, {"a": {"qty": 1}})
+        with pytest.raises(NotFound):
+            asyncio.run(repo.batch_update({"a": {"qty": 2}, "missing": {"qty": 3}}))
+        assert asyncio.run(repo.get_by_id("a"))["qty"] == 1
+
+
+class TestFirestoreCursors:
+    """stream() pages through the real Firestore query builder (no network)."""
+
+    def test_projected_pages_keep_inequality_fields(self, monkeypatch):
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud.firestore import AsyncClient
+        from google.cloud.firestore_v1.async_query import AsyncQuery
+        from google.cloud.firestore_v1.base_document import DocumentSnapshot
+
+        collection = AsyncClient(project="test", credentials=AnonymousCredentials()).collection("stock")
+        rows = [{"seq": 100 + i, "qty": i} for i in range(5)]
+
+        async def fake_stream(query, *args, **kwargs):
+            query._to_protobuf()  # builds the cursor, as the real call does
+            fields = [f.field_path for f in query._projection.fields]
+            start = 0
+            if query._start_at is not None:
+                start = query._start_at[0].to_dict()["seq"] - 100 + 1
+            for i, row in enumerate(rows[start:start + query._limit], start):
+                yield DocumentSnapshot(
+                    collection.document(f"doc-{i}"), {f: row[f] for f in fields},
+                    True, None, None, None,
+                )
+
+        monkeypatch.setattr(AsyncQuery, "stream", fake_stream)
+        monkeypatch.setattr(BaseRepository, "_collection", property(lambda self: collection))
+        repo = BaseRepository("stock")
+
+        async def run():
+            return [d async for d in repo.stream(
+                filters=[("seq", ">=", 100)], fields=["qty"], page_size=2,
+            )]
+
+        docs = asyncio.run(run())
+        assert [d["qty"] for d in docs] == [0, 1, 2, 3, 4]
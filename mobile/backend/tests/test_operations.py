@@ -68,6 +68,18 @@ class TestListOperations:
         response = client.get("/api/operations/?status=pending", headers=AUTH_HEADER)
         assert response.status_code == 200
 
+    @patch("app.routes.operations.operation_repo")
+    def test_list_operations_paginated(self, mock_repo, client):
+        mock_repo.get_filtered = AsyncMock(return_value=[
+            {**MOCK_OPERATION, "id": f"op-00{i}"} for i in range(1, 4)
+        ])
+        response = client.get("/api/operations/?page_size=2", headers=AUTH_HEADER)
+        assert response.status_code == 200
+        assert [o["id"] for o in response.json()] == ["op-001", "op-002"]
+        assert response.headers["X-Next-Cursor"] == "op-002"
+        kwargs = mock_repo.get_filtered.call_args.kwargs
+        assert kwargs["limit"] == 3 and kwargs["start_after"] is None
+
 
 class TestPendingOperations:
     """Tests for GET /api/operations/pending"""
@@ -193,11 +205,11 @@ class TestApproveOperation:
     """Tests for PUT /api/operations/{operation_id}/approve"""
 
     @patch("app.routes.operations.operation_log_repo")
-    @patch("app.routes.operations.chariot_repo")
+    @patch("app.routes.operations.chariot_dispatcher")
     @patch("app.routes.operations.emplacement_repo")
     @patch("app.routes.operations.operation_repo")
     def test_approve_transfer(
-        self, mock_op_repo, mock_emp_repo, mock_chariot_repo,
+        self, mock_op_repo, mock_emp_repo, mock_dispatcher,
         mock_log_repo, client,
     ):
         transfer_op = {
@@ -213,8 +225,7 @@ class TestApproveOperation:
             "chariot_id": "chariot-001",
         }
         mock_op_repo.update = AsyncMock(return_value=approved)
-        mock_chariot_repo.get_available = AsyncMock(return_value=[MOCK_CHARIOT])
-        mock_chariot_repo.update = AsyncMock(return_value={})
+        mock_dispatcher.dispatch = AsyncMock(return_value=MOCK_CHARIOT)
         mock_emp_repo.get_by_id = AsyncMock(return_value={
             "id": "emp-001", "x": 5, "y": 10, "floor": 1,
         })
@@ -229,6 +240,8 @@ class TestApproveOperation:
             response = client.put("/api/operations/op-001/approve", headers=AUTH_HEADER)
             assert response.status_code == 200
             assert response.json()["status"] == "in_progress"
+        # Chariot is dispatched towards the source emplacement
+        mock_dispatcher.dispatch.assert_called_once_with("op-001", (5, 10, 1))
 
     @patch("app.routes.operations.operation_repo")
     def test_approve_not_pending(self, mock_op_repo, client):
@@ -300,10 +313,10 @@ class TestValidateOperation:
 
     @patch("app.routes.operations.operation_log_repo")
     @patch("app.routes.operations.emplacement_repo")
-    @patch("app.routes.operations.chariot_repo")
+    @patch("app.routes.operations.chariot_dispatcher")
     @patch("app.routes.operations.operation_repo")
     def test_validate_transfer_updates_stock(
-        self, mock_op_repo, mock_chariot_repo, mock_emp_repo,
+        self, mock_op_repo, mock_dispatcher, mock_emp_repo,
         mock_log_repo, client,
     ):
         """Validating a transfer should update destination emplacement stock."""
@@ -319,9 +332,10 @@ class TestValidateOperation:
         mock_op_repo.update = AsyncMock(return_value=validated)
         mock_emp_repo.get_by_id = AsyncMock(return_value={
             "id": "emp-001", "quantity": 0, "product_id": None,
+            "x": 12, "y": 14, "floor": 0,
         })
         mock_emp_repo.update = AsyncMock(return_value={})
-        mock_chariot_repo.update = AsyncMock(return_value={})
+        mock_dispatcher.release = AsyncMock(return_value=None)
         mock_log_repo.create = AsyncMock(return_value={})
 
         response = client.put("/api/operations/op-001/validate", headers=AUTH_HEADER)
@@ -331,8 +345,8 @@ class TestValidateOperation:
         emp_update_args = mock_emp_repo.update.call_args[0][1]
         assert emp_update_args["quantity"] == 100
         assert emp_update_args["is_occupied"] is True
-        # Chariot should be released
-        mock_chariot_repo.update.assert_called_once()
+        # Chariot should be released where it unloaded
+        mock_dispatcher.release.assert_called_once_with("chariot-001", (12, 14, 0))
 
     @patch("app.routes.operations.operation_repo")
     def test_validate_already_validated(self, mock_op_repo, client):
@@ -345,21 +359,73 @@ class TestValidateOperation:
 class TestDeleteOperation:
     """Tests for DELETE /api/operations/{operation_id}"""
 
-    @patch("app.routes.operations.chariot_repo")
+    @patch("app.routes.operations.chariot_dispatcher")
     @patch("app.routes.operations.operation_repo")
-    def test_delete_operation(self, mock_repo, mock_chariot_repo, client):
+    def test_delete_operation(self, mock_repo, mock_dispatcher, client):
         mock_repo.get_by_id_or_raise = AsyncMock(return_value=MOCK_OPERATION)
         mock_repo.delete = AsyncMock(return_value=True)
         response = client.delete("/api/operations/op-001", headers=AUTH_HEADER)
         assert response.status_code == 204
 
-    @patch("app.routes.operations.chariot_repo")
+    @patch("app.routes.operations.chariot_dispatcher")
     @patch("app.routes.operations.operation_repo")
-    def test_delete_operation_releases_chariot(self, mock_repo, mock_chariot_repo, client):
+    def test_delete_operation_releases_chariot(self, mock_repo, mock_dispatcher, client):
         op_with_chariot = {**MOCK_OPERATION, "chariot_id": "chariot-001"}
         mock_repo.get_by_id_or_raise = AsyncMock(return_value=op_with_chariot)
         mock_repo.delete = AsyncMock(return_value=True)
-        mock_chariot_repo.update = AsyncMock(return_value={})
+        mock_dispatcher.release = AsyncMock(return_value=None)
         response = client.delete("/api/operations/op-001", headers=AUTH_HEADER)
         assert response.status_code == 204
-        mock_chariot_repo.update.assert_called_once()
+        mock_dispatcher.release.assert_called_once()
+
+
+class TestChariotDispatch:
+    """Proximity dispatch through the chariot index."""
+
+    def test_dispatch_picks_nearest_free_chariot(self):
+        import asyncio
+        from app.services.chariot_dispatcher import ChariotDispatcher
+
+        repo = MagicMock()
+        repo.get_active_chariots = AsyncMock(return_value=[
+            {"id": "chariot-far", "is_active": True, "last_x": 9, "last_y": 36, "last_floor": 0},
+            {"id": "chariot-near", "is_active": True, "last_x": 12, "last_y": 16, "last_floor": 0},
+            {"id": "chariot-busy", "is_active": True, "last_x": 12, "last_y": 14, "last_floor": 0,
+             "assigned_to_operation_id": "op-other"},
+            {"id": "chariot-unknown", "is_active": True},
+        ])
+        repo.update_if = AsyncMock(side_effect=lambda doc_id, data, expected: {"id": doc_id, **data})
+        dispatcher = ChariotDispatcher(repo)
+
+        chariot = asyncio.run(dispatcher.dispatch("op-001", (12, 14, 0)))
+        assert chariot["id"] == "chariot-near"
+        repo.update_if.assert_called_once_with(
+            "chariot-near", {"assigned_to_operation_id": "op-001"},
+            expected={"assigned_to_operation_id": None, "is_active": True},
+        )
+
+        # Index is reused: the next dispatch skips the assigned chariot without a reload
+        chariot = asyncio.run(dispatcher.dispatch("op-002", (12, 14, 0)))
+        assert chariot["id"] == "chariot-far"
+        repo.get_active_chariots.assert_called_once()
+
+    def test_dispatch_skips_chariot_claimed_by_another_worker(self):
+        import asyncio
+        from app.services.chariot_dispatcher import ChariotDispatcher
+
+        repo = MagicMock()
+        repo.get_active_chariots = AsyncMock(return_value=[
+            {"id": "chariot-far", "is_active": True, "last_x": 9, "last_y": 36, "last_floor": 0},
+            {"id": "chariot-near", "is_active": True, "last_x": 12, "last_y": 16, "last_floor": 0},
+        ])
+        # chariot-near was assigned by another worker since the index was loaded
+        repo.update_if = AsyncMock(side_effect=lambda doc_id, data, expected: (
+            None if doc_id == "chariot-near" else {"id": doc_id, **data}
+        ))
+        dispatcher = ChariotDispatcher(repo)
+
+        chariot = asyncio.run(dispatcher.dispatch("op-001", (12, 14, 0)))
+        assert chariot["id"] == "chariot-far"
+        assert [c.args[0] for c in repo.update_if.call_args_list] == ["chariot-near", "chariot-far"]
+        assert asyncio.run(dispatcher.dispatch("op-002", (12, 14, 0))) is None
+        assert repo.update_if.call_count == 2
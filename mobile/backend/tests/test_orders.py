@@ -162,6 +162,64 @@ class TestValidateOrder:
         # Should have created a receipt operation
         mock_op_repo.create.assert_called_once()
 
+    @patch("app.routes.orders.operation_log_repo")
+    @patch("app.routes.orders.operation_repo")
+    @patch("app.routes.orders.user_repo")
+    @patch("app.routes.orders.emplacement_repo")
+    @patch("app.routes.orders.order_log_repo")
+    @patch("app.routes.orders.order_repo")
+    def test_validate_preparation_picks_closest_first(
+        self, mock_order_repo, mock_log_repo, mock_empl_repo, mock_user_repo,
+        mock_op_repo, mock_op_log_repo, client,
+    ):
+        prep = {**MOCK_ORDER, "type": "preparation"}
+        mock_order_repo.get_by_id_or_raise = AsyncMock(return_value=prep)
+        mock_order_repo.update = AsyncMock(return_value={**MOCK_VALIDATED_ORDER, "type": "preparation"})
+        mock_log_repo.create = AsyncMock(return_value={})
+        mock_empl_repo.get_expedition_zones = AsyncMock(return_value=[
+            {"id": "exp-1", "x": 9, "y": 36, "floor": 0},
+        ])
+        mock_empl_repo.get_product_locations = AsyncMock(return_value=[
+            {"id": "empl-far", "x": 12, "y": 14, "floor": 0, "quantity": 20},
+            {"id": "empl-near", "x": 12, "y": 26, "floor": 0, "quantity": 6},
+        ])
+        mock_user_repo.get_active_employees = AsyncMock(return_value=[])
+        mock_op_repo.batch_create = AsyncMock(side_effect=lambda items: [
+            {**item, "id": f"op-{i}"} for i, item in enumerate(items)
+        ])
+        mock_op_log_repo.batch_create = AsyncMock(return_value=[])
+
+        response = client.put("/api/orders/order-001/validate", headers=AUTH_HEADER)
+        assert response.status_code == 200
+        # Closest slot is emptied first, the rest comes from the fuller one
+        ops = mock_op_repo.batch_create.call_args[0][0]
+        assert [(o["source_emplacement_id"], o["quantity"]) for o in ops] == [
+            ("empl-near", 6), ("empl-far", 4),
+        ]
+        assert ops[0]["suggested_route"][0] == (9, 36, 0)
+        assert ops[0]["suggested_route"][-1] == (12, 26, 0)
+        mock_empl_repo.get_expedition_zones.assert_called_once()
+
+    @patch("app.routes.orders.settings.WAVE_PICKING_ENABLED", True)
+    @patch("app.routes.orders.operation_repo")
+    @patch("app.routes.orders.order_log_repo")
+    @patch("app.routes.orders.order_repo")
+    def test_validate_preparation_queued_for_wave(
+        self, mock_order_repo, mock_log_repo, mock_op_repo, client,
+    ):
+        order = {**MOCK_ORDER, "type": "preparation"}
+        mock_order_repo.get_by_id_or_raise = AsyncMock(return_value=order)
+        mock_order_repo.update = AsyncMock(return_value={**MOCK_VALIDATED_ORDER, "type": "preparation"})
+        mock_log_repo.create = AsyncMock(return_value={})
+        mock_op_repo.create = AsyncMock()
+
+        response = client.put("/api/orders/order-001/validate", headers=AUTH_HEADER)
+        assert response.status_code == 200
+        _, changes = mock_order_repo.update.call_args.args
+        assert "wave_id" in changes and changes["wave_id"] is None
+        assert "wave_id" in mock_order_repo.update.call_args.kwargs["nullable"]
+        mock_op_repo.create.assert_not_called()
+
     @patch("app.routes.orders.order_repo")
     def test_validate_already_validated(self, mock_repo, client):
         mock_repo.get_by_id_or_raise = AsyncMock(return_value=MOCK_VALIDATED_ORDER)
@@ -203,6 +261,120 @@ class TestGeneratePreparationOrders:
         assert response.status_code == 200
         assert response.json() == []
 
+    @patch("app.routes.orders.forecasting_engine")
+    def test_generate_preparation_no_history(self, mock_engine, client):
+        mock_engine.predict_preparation_orders = AsyncMock(
+            side_effect=FileNotFoundError("Demand history not found at ./historique_demande.csv"),
+        )
+        response = client.post(
+            "/api/orders/generate-preparation",
+            headers=AUTH_HEADER,
+        )
+        assert response.status_code == 503
+
+    @patch("app.routes.orders.forecasting_engine")
+    def test_generate_preparation_timeout(self, mock_engine, client):
+        mock_engine.predict_preparation_orders = AsyncMock(
+            side_effect=TimeoutError("Forecast timeout (>300 s), worker restarted"),
+        )
+        response = client.post(
+            "/api/orders/generate-preparation",
+            headers=AUTH_HEADER,
+        )
+        assert response.status_code == 504
+
+
+class TestPickingWave:
+    """Tests for POST /api/orders/waves"""
+
+    @patch("app.routes.orders.order_repo")
+    def test_wave_no_candidates(self, mock_repo, client):
+        mock_repo.get_wave_candidates = AsyncMock(return_value=[])
+        response = client.post("/api/orders/waves", headers=AUTH_HEADER)
+        assert response.status_code == 201
+        assert response.json()["operations"] == []
+        assert response.json()["trips"] == 0
+
+    @patch("app.routes.orders.operation_log_repo")
+    @patch("app.routes.orders.operation_repo")
+    @patch("app.routes.orders.user_repo")
+    @patch("app.routes.orders.emplacement_repo")
+    @patch("app.routes.orders.order_repo")
+    def test_wave_groups_orders_into_one_tour(
+        self, mock_order_repo, mock_empl_repo, mock_user_repo,
+        mock_op_repo, mock_op_log_repo, client,
+    ):
+        orders = [
+            {**MOCK_VALIDATED_ORDER, "id": "order-001", "type": "preparation", "quantity": 5},
+            {**MOCK_VALIDATED_ORDER, "id": "order-002", "type": "preparation",
+             "product_id": "prod-002", "quantity": 3},
+        ]
+        mock_order_repo.get_wave_candidates = AsyncMock(return_value=orders)
+        mock_order_repo.batch_update = AsyncMock(return_value=2)
+        mock_empl_repo.get_expedition_zones = AsyncMock(return_value=[
+            {"id": "exp-1", "x": 9, "y": 36, "floor": 0},
+        ])
+        mock_empl_repo.get_product_locations = AsyncMock(side_effect=lambda pid: [
+            {"id": f"empl-{pid}", "x": 12, "y": 14 if pid == "prod-001" else 26,
+             "floor": 0, "quantity": 20, "product_id": pid},
+        ])
+        mock_user_repo.get_active_employees = AsyncMock(return_value=[
+            {"id": "employee-001", "role": "employee", "is_active": True},
+        ])
+        mock_op_repo.batch_create = AsyncMock(side_effect=lambda items: [
+            {**item, "id": f"op-{i}"} for i, item in enumerate(items)
+        ])
+        mock_op_log_repo.batch_create = AsyncMock(return_value=[])
+
+        response = client.post("/api/orders/waves?capacity=50", headers=AUTH_HEADER)
+        assert response.status_code == 201
+        body = response.json()
+        assert body["trips"] == 1
+        assert body["baseline_trips"] == 2
+        assert body["operations"][0]["quantity"] == 8
+        assert len(body["operations"][0]["picks"]) == 2
+        mock_op_repo.batch_create.assert_called_once()
+        mock_order_repo.batch_update.assert_called_once()
+
+    @patch("app.routes.orders.operation_log_repo")
+    @patch("app.routes.orders.operation_repo")
+    @patch("app.routes.orders.user_repo")
+    @patch("app.routes.orders.emplacement_repo")
+    @patch("app.routes.orders.order_repo")
+    def test_wave_leaves_shortfall_orders_untagged(
+        self, mock_order_repo, mock_empl_repo, mock_user_repo,
+        mock_op_repo, mock_op_log_repo, client,
+    ):
+        orders = [
+            {**MOCK_VALIDATED_ORDER, "id": "order-001", "type": "preparation", "quantity": 5},
+            {**MOCK_VALIDATED_ORDER, "id": "order-002", "type": "preparation",
+             "product_id": "prod-002", "quantity": 30},
+        ]
+        mock_order_repo.get_wave_candidates = AsyncMock(return_value=orders)
+        mock_order_repo.batch_update = AsyncMock(return_value=1)
+        mock_empl_repo.get_expedition_zones = AsyncMock(return_value=[
+            {"id": "exp-1", "x": 9, "y": 36, "floor": 0},
+        ])
+        mock_empl_repo.get_product_locations = AsyncMock(side_effect=lambda pid: [
+            {"id": f"empl-{pid}", "x": 12, "y": 14 if pid == "prod-001" else 26,
+             "floor": 0, "quantity": 20, "product_id": pid},
+        ])
+        mock_user_repo.get_active_employees = AsyncMock(return_value=[])
+        mock_op_repo.batch_create = AsyncMock(side_effect=lambda items: [
+            {**item, "id": f"op-{i}"} for i, item in enumerate(items)
+        ])
+        mock_op_log_repo.batch_create = AsyncMock(return_value=[])
+
+        response = client.post("/api/orders/waves?capacity=50", headers=AUTH_HEADER)
+        assert response.status_code == 201
+        body = response.json()
+        assert body["order_ids"] == ["order-001"]
+        assert body["shortfalls"][0]["order_id"] == "order-002"
+        assert {p["order_id"] for op in body["operations"] for p in op["picks"]} == {"order-001"}
+        mock_order_repo.batch_update.assert_called_once_with(
+            {"order-001": {"wave_id": body["wave_id"]}}
+        )
+
 
 class TestDeleteOrder:
     """Tests for DELETE /api/orders/{order_id}"""
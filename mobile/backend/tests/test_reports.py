@@ -114,10 +114,9 @@ class TestReportStatistics:
 
     @patch("app.routes.reports.report_repo")
     def test_summary(self, mock_repo, client):
-        mock_repo.get_all = AsyncMock(return_value=[
-            MOCK_REPORT,
-            {**MOCK_REPORT, "id": "report-002", "physical_damage": False, "missing_quantity": 0, "extra_quality": 3},
-        ])
+        mock_repo.aggregate = AsyncMock(return_value={"total": 2, "missing": 5, "extra": 3})
+        # damage, with missing, with extra
+        mock_repo.count = AsyncMock(side_effect=[1, 1, 1])
         response = client.get("/api/reports/statistics/summary", headers=AUTH_HEADER)
         assert response.status_code == 200
         data = response.json()
@@ -0,0 +1,121 @@
+"""
+Tests for the repository read-through cache (MemoryCacheBackend) on the
+local SQLite backend.
+"""
+
+import asyncio
+
+import pytest
+
+from app.config import firebase
+from app.config.settings import settings
+from app.repositories import cache
+from app.repositories.base_repository import BaseRepository
+from app.repositories.cache import _MISSING, CachePolicy, MemoryCacheBackend
+
+
+class CachedRepository(BaseRepository):
+    cache_policy = CachePolicy(ttl_seconds=60)
+
+    def __init__(self):
+        super().__init__("products")
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    """Cached repository on a fresh in-memory database and cache."""
+    monkeypatch.setattr(settings, "DATABASE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "REPOSITORY_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "REPOSITORY_CACHE_TTL", {})
+    monkeypatch.setattr(firebase, "_local_db", None)
+    monkeypatch.setattr(cache, "_backend", MemoryCacheBackend())
+    monkeypatch.setattr(cache, "_stats", {})
+    repo = CachedRepository()
+    asyncio.run(repo.create_with_id("a", {"sku": "A", "qty": 1}))
+    return repo
+
+
+def _write_behind_cache(doc_id, data):
+    """Change a document without going through any repository."""
+    firebase.get_async_db().collection("products")._update(doc_id, data)
+
+
+class TestReadThrough:
+    def test_hit_after_miss(self, repo):
+        first = asyncio.run(repo.get_by_id("a"))
+        _write_behind_cache("a", {"qty": 99})
+        second = asyncio.run(repo.get_by_id("a"))
+
+        assert first["qty"] == second["qty"] == 1  # served from cache
+        assert repo.cache.stats.misses == 1
+        assert repo.cache.stats.hits == 1
+
+        asyncio.run(repo.query(filters=[("sku", "==", "A")]))
+        asyncio.run(repo.query(filters=[("sku", "==", "A")]))
+        assert repo.cache.stats.hits == 2
+
+    def test_values_are_copied_in_and_out(self, repo):
+        doc = asyncio.run(repo.get_by_id("a"))
+        doc["qty"] = 42
+        cached = asyncio.run(repo.get_by_id("a"))
+        cached["tags"] = ["x"]
+        assert asyncio.run(repo.get_by_id("a")) == {**doc, "qty": 1}
+
+    def test_cache_disabled(self, repo, monkeypatch):
+        monkeypatch.setattr(settings, "REPOSITORY_CACHE_TTL", {"products": 0})
+        repo = CachedRepository()
+        asyncio.run(repo.get_by_id("a"))
+        _write_behind_cache("a", {"qty": 99})
+        assert asyncio.run(repo.get_by_id("a"))["qty"] == 99
+        assert repo.cache is None
+
+
+class TestInvalidation:
+    def test_update_invalidates(self, repo):
+        asyncio.run(repo.get_by_id("a"))
+        asyncio.run(repo.update("a", {"qty": 2}))
+        assert asyncio.run(repo.get_by_id("a"))["qty"] == 2
+        assert repo.cache.stats.invalidations == 2  # create_with_id, update
+
+    def test_create_invalidates_queries(self, repo):
+        assert len(asyncio.run(repo.get_all())) == 1
+        asyncio.run(repo.create({"sku": "B", "qty": 3}))
+        assert len(asyncio.run(repo.get_all())) == 2
+
+    def test_write_through_another_instance_invalidates(self, repo):
+        asyncio.run(repo.get_by_id("a"))
+        asyncio.run(CachedRepository().update("a", {"qty": 5}))
+        assert asyncio.run(repo.get_by_id("a"))["qty"] == 5
+
+    def test_read_racing_a_write_is_not_stored(self, repo):
+        other = CachedRepository()
+
+        async def stale_read():
+            doc = await repo._run(lambda: repo._collection.document("a").get())
+            await other.update("a", {"qty": 7})  # lands while the read is in flight
+            return {**doc.to_dict(), "id": "a"}
+
+        assert asyncio.run(repo._cached(("id", "a"), stale_read))["qty"] == 1
+        assert not any(value["qty"] == 1 for _, value in cache._backend._entries.values())
+        assert asyncio.run(repo.get_by_id("a"))["qty"] == 7
+
+    def test_store_after_generation_change_is_dropped(self, repo):
+        value, key = repo.cache.lookup("id", "z")
+        assert value is _MISSING
+        repo.cache.invalidate()
+        repo.cache.store(key, {"id": "z"})
+        assert key not in cache._backend._entries
+        assert repo.cache.lookup("id", "z")[0] is _MISSING
+
+
+class TestMemoryBackend:
+    def test_ttl_and_lru(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set(("c", 0, "a"), 1, ttl=60)
+        backend.set(("c", 0, "b"), 2, ttl=60)
+        backend.get(("c", 0, "a"))
+        backend.set(("c", 0, "c"), 3, ttl=60)  # evicts the least recently used
+        assert backend.get(("c", 0, "b")) is _MISSING
+        assert backend.get(("c", 0, "a")) == 1
+        backend.set(("c", 0, "d"), 4, ttl=-1)
+        assert backend.get(("c", 0, "d")) is _MISSING
@@ -25,6 +25,11 @@ MOCK_OPERATION = {
     "created_at": "2026-01-01T00:00:00",
 }
 
+async def _stream(records):
+    for record in records:
+        yield record
+
+
 MOCK_LEDGER = {
     "id": "ledger-001",
     "product_id": "prod-001",
@@ -146,10 +151,10 @@ class TestFullSync:
         # Operations: one new
         mock_op.find_one = AsyncMock(return_value=None)
         mock_op.create = AsyncMock(return_value=MOCK_OPERATION)
-        mock_op.get_all = AsyncMock(return_value=[MOCK_OPERATION])
+        mock_op.stream = lambda *args, **kwargs: _stream([MOCK_OPERATION])
 
         # Movements: none
-        mock_ledger.get_all = AsyncMock(return_value=[])
+        mock_ledger.stream = lambda *args, **kwargs: _stream([])
 
         response = client.post(
             "/api/sync/full-sync",